@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Header, Request
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from datetime import timedelta, datetime
+from datetime import timedelta, datetime, timezone
 from jose import jwt, JWTError
 from typing import List
 import logging
@@ -9,16 +10,20 @@ from app.db.schemas.auth import LoginResponse
 from app.db import models
 from app.db.schemas.user import UserCreate, UserOut, Token
 from app.core.security import (
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
     create_access_token,
     get_current_user,
     get_db,
+    role_required,
+    password_pool,
     SECRET_KEY,
     ALGORITHM
 )
 from app.core.logging_config import get_logger
 from app.core.security import authenticate_user
+from app.core.principal_cache import principal_cache
+from app.core.revocation import revocation_registry, revoke_token, token_jti
 from app.db.schemas.auth import LoginRequest, LoginResponse
 from app.db.models import User
 logger = get_logger(__name__)
@@ -27,8 +32,21 @@ router = APIRouter()
 # =============================
 # LOGIN / TOKEN
 # =============================
+def _user_by_email(db: Session, email: str):
+    return db.query(models.user.User).filter(
+        models.user.User.email == email
+    ).first()
+
+
+def _save(db: Session, obj):
+    db.add(obj)
+    db.commit()
+    db.refresh(obj)
+    return obj
+
+
 @router.post("/token", response_model=Token, summary="Iniciar sesión")
-def login_user(
+async def login_user(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
@@ -40,9 +58,7 @@ def login_user(
     ip_address = request.client.host
     
     # Buscar usuario
-    user = db.query(models.user.User).filter(
-        models.user.User.email == email
-    ).first()
+    user = await run_in_threadpool(_user_by_email, db, email)
     
     if not user:
         logger.warning(f"⚠️ Login fallido - Usuario no existe: {email} (IP: {ip_address})")
@@ -52,7 +68,7 @@ def login_user(
         )
     
     # Verificar contraseña
-    if not verify_password(password, user.password_hash):
+    if not await verify_password_async(password, user.password_hash):
         logger.warning(f"⚠️ Login fallido - Contraseña incorrecta: {email} (IP: {ip_address})")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -98,20 +114,19 @@ def logout(
     
     token = authorization.split(" ")[1] if " " in authorization else authorization
     
-    # Extraer tiempo de expiración
+    # Extraer jti y tiempo de expiración
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        exp_ts = payload.get("exp")
-        expires_at = datetime.utcfromtimestamp(exp_ts) if exp_ts else None
-    except Exception:
-        expires_at = None
+    except JWTError:
+        payload = {}
+    exp_ts = payload.get("exp")
+    expires_at = datetime.fromtimestamp(exp_ts, tz=timezone.utc) if exp_ts else None
+    jti = token_jti(payload, token)
     
     # Registrar token revocado
     try:
-        from app.db.models.revoked_token import RevokedToken
-        revoked = RevokedToken(token=token, expires_at=expires_at)
-        db.add(revoked)
-        db.commit()
+        revoke_token(db, jti, expires_at)
+        principal_cache.invalidate_token(jti)
         
         logger.info(f"✅ Token revocado para: {current_user.email}")
         
@@ -135,13 +150,11 @@ def me(current_user: User = Depends(get_current_user)):
 # REGISTRO DE USUARIO
 # =============================
 @router.post("/register", response_model=UserOut)
-def register_user(payload: UserCreate, db: Session = Depends(get_db)):
+async def register_user(payload: UserCreate, db: Session = Depends(get_db)):
     """Registra un nuevo usuario"""
     
     # Validar que el email no esté registrado
-    existing = db.query(models.user.User).filter(
-        models.user.User.email == payload.email
-    ).first()
+    existing = await run_in_threadpool(_user_by_email, db, payload.email)
     
     if existing:
         logger.warning(f"❌ Intento de registro con email duplicado: {payload.email}")
@@ -161,19 +174,25 @@ def register_user(payload: UserCreate, db: Session = Depends(get_db)):
     user = models.user.User(
         email=payload.email,
         name=payload.name,
-        password_hash=get_password_hash(payload.password),
+        password_hash=await get_password_hash_async(payload.password),
         role=payload.role
     )
     
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    user = await run_in_threadpool(_save, db, user)
     
     logger.info(f"✅ Usuario registrado: {user.email} (Rol: {user.role})")
     
     return user
 
 
+# =============================
+# MÉTRICAS DEL POOL DE CONTRASEÑAS
+# =============================
+@router.get("/password-pool/stats")
+def password_pool_stats(current_user = Depends(role_required("ADMIN"))):
+    return password_pool.stats()
+
+
 # =============================
 # VERIFICAR TOKEN
 # =============================
@@ -197,8 +216,9 @@ def verify_token(token: str, db: Session = Depends(get_db)):
         
         # Verificar si está revocado
         from app.db.models.revoked_token import RevokedToken
-        revoked = db.query(RevokedToken).filter(
-            RevokedToken.token == token
+        jti = token_jti(payload, token)
+        revoked = revocation_registry.is_revoked(jti) or db.query(RevokedToken.id).filter(
+            RevokedToken.jti == jti
         ).first()
         
         if revoked:
@@ -1,13 +1,15 @@
 # backend/app/api/v1/cash_flow.py
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from datetime import datetime, date, timedelta
+from sqlalchemy import func, and_, case
+from datetime import datetime, timedelta
 from typing import Optional, List
 
 from app.db.base import get_db
 from app.core.security import role_required
+from app.core.dates import date_filters, store_today
 from app.db import models
+from app.services.document_number_service import next_document_code
 from app.db.schemas.cash_flow import (
     ExpenseCreate,
     ExpenseOut,
@@ -20,11 +22,7 @@ from app.db.schemas.cash_flow import (
 router = APIRouter(prefix="/cash-flow", tags=["💰 Flujo de Caja"])
 
 def generate_expense_code(db: Session) -> str:
-    today = date.today().strftime("%Y%m%d")
-    count = db.query(func.count(models.expense.Expense.id)).filter(
-        func.date(models.expense.Expense.created_at) == date.today()
-    ).scalar() or 0
-    return f"EGRESO-{today}-{count+1:03d}"
+    return next_document_code(db, "EGRESO", width=3, day=store_today())
 
 def create_cash_movement_from_expense(db, expense, user):
     movement = models.cash_movement.CashMovement(
@@ -52,24 +50,30 @@ def cash_flow_summary(
     start = datetime.strptime(start_date, "%Y-%m-%d").date()
     end = datetime.strptime(end_date, "%Y-%m-%d").date()
 
-    movements = db.query(models.cash_movement.CashMovement).filter(
+    CashMovement = models.cash_movement.CashMovement
+    is_ingreso = CashMovement.type == models.cash_movement.MovementType.INGRESO
+    is_egreso = CashMovement.type == models.cash_movement.MovementType.EGRESO
+
+    # Un solo agregado en SQL (no se cargan los movimientos)
+    totals = db.query(
+        func.coalesce(func.sum(case((is_ingreso, CashMovement.amount_usd), else_=0)), 0).label("ingresos"),
+        func.coalesce(func.sum(case((is_egreso, CashMovement.amount_usd), else_=0)), 0).label("egresos"),
+        func.count(case((is_ingreso, 1))).label("count_ingresos"),
+        func.count(case((is_egreso, 1))).label("count_egresos"),
+    ).filter(
         and_(
-            models.cash_movement.CashMovement.status ==
+            CashMovement.status ==
             models.cash_movement.MovementStatus.CONFIRMADO,
-            func.date(models.cash_movement.CashMovement.accounting_date) >= start,
-            func.date(models.cash_movement.CashMovement.accounting_date) <= end,
+            *date_filters(CashMovement.accounting_date, start, end),
         )
-    ).all()
-
-    ingresos = sum(m.amount_usd for m in movements if m.type == "INGRESO")
-    egresos = sum(m.amount_usd for m in movements if m.type == "EGRESO")
+    ).one()
 
     return {
         "period_start": start,
         "period_end": end,
-        "total_ingresos": ingresos,
-        "total_egresos": egresos,
-        "saldo_neto": ingresos - egresos,
-        "count_ingresos": len([m for m in movements if m.type == "INGRESO"]),
-        "count_egresos": len([m for m in movements if m.type == "EGRESO"]),
+        "total_ingresos": totals.ingresos,
+        "total_egresos": totals.egresos,
+        "saldo_neto": totals.ingresos - totals.egresos,
+        "count_ingresos": totals.count_ingresos,
+        "count_egresos": totals.count_egresos,
     }
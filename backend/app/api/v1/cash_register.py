@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from datetime import datetime
+from decimal import Decimal
 
 from app.db.base import get_db
 from app.core.security import role_required
@@ -12,6 +13,7 @@ from app.db.schemas.cash_register import (
     CashRegisterResponse
 )
 from app.services.cash_register_service import calculate_system_amount
+from app.services.cash_balance_service import register_balances, reconcile_register
 
 router = APIRouter(prefix="/cash-register", tags=["💼 Caja"])
 
@@ -54,12 +56,13 @@ def close_cash_register(
     cash = db.query(models.cash_register.CashRegister).filter(
         models.cash_register.CashRegister.status == "OPEN",
         models.cash_register.CashRegister.opened_by_user_id == user.id
-    ).first()
+    ).with_for_update().first()
 
     if not cash:
         raise HTTPException(400, "No hay caja abierta")
 
-    system_amount = calculate_system_amount(db, cash.id)
+    # Saldos acumulados: no se recorren los movimientos del turno
+    system_amount = Decimal(str(calculate_system_amount(db, cash.id)))
     difference = payload.counted_amount - system_amount
 
     cash.status = "CLOSED"
@@ -88,6 +91,8 @@ def cash_register_status(
     if not cash:
         return None
 
+    balances = register_balances(db, cash.id)
+
     return {
         "id": cash.id,
         "opening_amount_usd": float(cash.opening_amount),
@@ -99,4 +104,23 @@ def cash_register_status(
         "closed_by_user_id": cash.closed_by_user_id,
         "opened_at": cash.opened_at,
         "closed_at": cash.closed_at,
-    }
\ No newline at end of file
+        # Saldo esperado en vivo (ingresos - egresos del turno)
+        "system_amount_usd": balances["saldo"],
+        "ingresos_usd": balances["ingresos"],
+        "egresos_usd": balances["egresos"],
+        "by_method": balances["by_method"],
+    }
+
+
+@router.post("/{cash_register_id}/reconcile")
+def reconcile_cash_register(
+    cash_register_id: int,
+    db: Session = Depends(get_db),
+    _=Depends(role_required("ADMIN"))
+):
+    """Verifica los saldos acumulados contra los movimientos y los corrige si difieren"""
+    cash = db.get(models.cash_register.CashRegister, cash_register_id)
+    if not cash:
+        raise HTTPException(404, "Caja no encontrada")
+
+    return reconcile_register(db, cash_register_id)
\ No newline at end of file
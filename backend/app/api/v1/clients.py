@@ -1,27 +1,38 @@
 # backend/app/api/v1/clients.py - VERSIÓN MEJORADA CON VENTAS
-from fastapi import APIRouter, Depends, HTTPException, Body
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Response
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from app.db.base import SessionLocal
+from app.db.base import get_db
 from app.db.schemas.client import ClientCreate, ClientOut
-from app.db.schemas.pos import SaleOut, SaleDetailOut, PaymentOut, PaymentCreate
+from app.db.schemas.pos import SaleOut, PaymentCreate
 from app.db import models
 from app.core.security import role_required
+from app.core.pagination import keyset_page, set_next_cursor
+from app.services.stock_service import increment_stock, sale_quantities
+from app.services.sales_rollup_service import apply_sale_change, sale_snapshot
+from app.services.sale_projection_service import sale_rows_query, project_sales
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 
 @router.get("/", response_model=List[ClientOut])
-def list_clients(db: Session = Depends(get_db)):
-    return db.query(models.client.Client).all()
+def list_clients(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
+    db: Session = Depends(get_db)
+):
+    """Listar clientes. Con `limit`/`cursor` pagina por id (cabecera X-Next-Cursor)."""
+    clients, next_cursor = keyset_page(
+        db.query(models.client.Client),
+        [models.client.Client.id],
+        cursor,
+        limit,
+        descending=False,
+    )
+    set_next_cursor(response, next_cursor)
+    return clients
 
 
 @router.get("/{client_id}", response_model=ClientOut)
@@ -94,10 +105,11 @@ def delete_client(client_id: int, db: Session = Depends(get_db)):
 @router.get("/{client_id}/sales", response_model=List[SaleOut])
 def get_client_sales(
     client_id: int,
+    limit: int = Query(100, ge=1, le=500),
     db: Session = Depends(get_db),
     current_user=Depends(role_required("CAJERO", "ADMIN"))
 ):
-    """Obtener todas las ventas de un cliente"""
+    """Obtener las ventas de un cliente (más recientes primero)"""
     client = db.query(models.client.Client).filter(
         models.client.Client.id == client_id
     ).first()
@@ -105,57 +117,13 @@ def get_client_sales(
     if not client:
         raise HTTPException(status_code=404, detail="Cliente no encontrado")
     
-    sales = db.query(models.sale.Sale).filter(
+    rows = sale_rows_query(db).filter(
         models.sale.Sale.client_id == client_id
     ).order_by(
         models.sale.Sale.created_at.desc()
-    ).all()
-    
-    results = []
-    for sale in sales:
-        details_out = [
-            SaleDetailOut(
-                id=d.id,
-                product_id=d.product_id,
-                product_name=d.product.name,
-                quantity=d.quantity,
-                price_usd=d.price_usd,
-                subtotal_usd=d.subtotal_usd
-            )
-            for d in sale.details
-        ]
-        
-        payments_out = [
-            PaymentOut(
-                id=p.id,
-                method=p.method,
-                amount_usd=p.amount_usd,
-                reference=p.reference,
-                created_at=p.created_at
-            )
-            for p in sale.payments
-        ]
-        
-        results.append(SaleOut(
-            id=sale.id,
-            code=sale.code,
-            client_id=sale.client_id,
-            client_name=client.name,
-            client_phone=client.phone,
-            seller_id=sale.seller_id,
-            subtotal_usd=sale.subtotal_usd,
-            discount_usd=sale.discount_usd,
-            total_usd=sale.total_usd,
-            paid_usd=sale.paid_usd,
-            balance_usd=sale.balance_usd,
-            payment_method=sale.payment_method,
-            status=sale.status,
-            details=details_out,
-            payments=payments_out,
-            created_at=sale.created_at
-        ))
-    
-    return results
+    ).limit(limit).all()
+    
+    return project_sales(db, rows)
 
 
 @router.post("/{client_id}/sales/{sale_id}/pay")
@@ -171,7 +139,7 @@ def pay_client_sale(
     sale = db.query(models.sale.Sale).filter(
         models.sale.Sale.id == sale_id,
         models.sale.Sale.client_id == client_id
-    ).first()
+    ).with_for_update().first()
     
     if not sale:
         raise HTTPException(
@@ -184,6 +152,8 @@ def pay_client_sale(
     
     if sale.status == "PAGADO":
         raise HTTPException(status_code=400, detail="Esta venta ya está completamente pagada")
+
+    before = sale_snapshot(sale)
     
     # Validar monto
     total_new_payments = sum(round(p.amount_usd, 2) for p in payments)
@@ -215,6 +185,7 @@ def pay_client_sale(
         sale.status = "PAGADO"
     elif sale.paid_usd > 0:
         sale.status = "CREDITO"
+    apply_sale_change(db, before, sale_snapshot(sale))
     
     # ✅ Actualizar balance del cliente
     client = db.query(models.client.Client).filter(
@@ -246,7 +217,7 @@ def annul_client_sale(
     sale = db.query(models.sale.Sale).filter(
         models.sale.Sale.id == sale_id,
         models.sale.Sale.client_id == client_id
-    ).first()
+    ).with_for_update().first()
     
     if not sale:
         raise HTTPException(
@@ -257,13 +228,10 @@ def annul_client_sale(
     if sale.status == "ANULADO":
         raise HTTPException(status_code=400, detail="Venta ya anulada")
     
-    # Restaurar stock
-    for detail in sale.details:
-        product = db.query(models.product.Product).filter(
-            models.product.Product.id == detail.product_id
-        ).first()
-        if product:
-            product.stock += detail.quantity
+    before = sale_snapshot(sale)
+    
+    # Restaurar stock (un solo UPDATE para todas las líneas)
+    increment_stock(db, sale_quantities(db, sale.id))
     
     # ✅ Ajustar balance del cliente
     client = db.query(models.client.Client).filter(
@@ -282,6 +250,7 @@ def annul_client_sale(
     # Marcar como anulada
     sale.status = "ANULADO"
     sale.balance_usd = 0.0
+    apply_sale_change(db, before, sale_snapshot(sale))
     
     db.commit()
     
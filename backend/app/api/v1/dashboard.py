@@ -1,19 +1,29 @@
 # backend/app/api/v1/dashboard.py - VERSIÓN CORREGIDA
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, case
 from datetime import date, timedelta
-from app.core.security import get_db, role_required
+from app.core.security import role_required
 from app.db import models
 from app.db.models import Sale, CashMovement, MovementType
+from app.db.routing import get_read_db, get_read_async_db
+from app.core.response_cache import response_cache
+from app.core.dates import store_today
 
 
 router = APIRouter()
 
+# Tablas de las que depende cada respuesta cacheada
+SUMMARY_TABLES = ("daily_sales_rollup", "products", "clients")
+RECENT_SALES_TABLES = ("sales", "clients")
+CLIENTS_DEBT_TABLES = ("clients", "sales")
+
 
 @router.get("/dashboard/summary")
-def get_dashboard_summary(
-    db: Session = Depends(get_db),
+async def get_dashboard_summary(
+    request: Request,
+    db: AsyncSession = Depends(get_read_async_db),
     current_user=Depends(role_required("ADMIN"))
 ):
     """
@@ -21,38 +31,37 @@ def get_dashboard_summary(
     Excluye correctamente ventas anuladas (ANULADO).
     No registra montos de ventas anuladas en los totales.
     """
-    today = date.today()
+    today = store_today()
+    # El día va en la clave: "hoy" y "ayer" cambian a medianoche de la tienda
+    key = await response_cache.akey(
+        "dashboard:summary", SUMMARY_TABLES, current_user, request, extra=(today,)
+    )
+    return await response_cache.aget_or_set(key, lambda s: _dashboard_summary(s, today), db)
+
+
+def _dashboard_summary(db: Session, today: date) -> dict:
     yesterday = today - timedelta(days=1)
     this_month_start = date(today.year, today.month, 1)
-    
-    # Ventas del día (EXCLUIR ANULADAS)
-    today_sales = db.query(
-        func.count(models.sale.Sale.id).label('count'),
-        func.sum(models.sale.Sale.total_usd).label('total'),
-        func.sum(models.sale.Sale.paid_usd).label('paid'),
-        func.sum(models.sale.Sale.balance_usd).label('pending')
-    ).filter(
-        func.date(models.sale.Sale.created_at) == today,
-        models.sale.Sale.status != "ANULADO"  # ✅ Excluir anuladas
-    ).first()
-    
-    # Ventas de ayer (EXCLUIR ANULADAS)
-    yesterday_sales = db.query(
-        func.sum(models.sale.Sale.total_usd).label('total')
-    ).filter(
-        func.date(models.sale.Sale.created_at) == yesterday,
-        models.sale.Sale.status != "ANULADO"  # ✅ Excluir anuladas
-    ).first()
-    
-    # Ventas del mes (EXCLUIR ANULADAS)
-    month_sales = db.query(
-        func.count(models.sale.Sale.id).label('count'),
-        func.sum(models.sale.Sale.total_usd).label('total')
+    Rollup = models.daily_sales_rollup.DailySalesRollup
+
+    def on(condition, column):
+        return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+    # Hoy, ayer y mes desde daily_sales_rollup (una fila por día/estado/vendedor,
+    # EXCLUYENDO ANULADAS)
+    totals = db.query(
+        on(Rollup.day == today, Rollup.sales_count).label('today_count'),
+        on(Rollup.day == today, Rollup.total_usd).label('today_total'),
+        on(Rollup.day == today, Rollup.paid_usd).label('today_paid'),
+        on(Rollup.day == today, Rollup.balance_usd).label('today_pending'),
+        on(Rollup.day == yesterday, Rollup.total_usd).label('yesterday_total'),
+        on(Rollup.day >= this_month_start, Rollup.sales_count).label('month_count'),
+        on(Rollup.day >= this_month_start, Rollup.total_usd).label('month_total'),
     ).filter(
-        func.date(models.sale.Sale.created_at) >= this_month_start,
-        models.sale.Sale.status != "ANULADO"  # ✅ Excluir anuladas
-    ).first()
-    
+        Rollup.day >= min(yesterday, this_month_start),
+        Rollup.status != "ANULADO"  # ✅ Excluir anuladas
+    ).one()
+
     # Productos con bajo stock (activos)
     low_stock_count = db.query(func.count(models.product.Product.id)).filter(
         models.product.Product.stock <= models.product.Product.min_stock,
@@ -66,48 +75,53 @@ def get_dashboard_summary(
     ).scalar()
     
     # Ventas pendientes de pago (EXCLUIR ANULADAS)
-    pending_sales = db.query(func.count(models.sale.Sale.id)).filter(
-        models.sale.Sale.status.in_(["PENDIENTE", "CREDITO"]),
-        models.sale.Sale.status != "ANULADO"  # ✅ Extra validación
+    pending_sales = db.query(func.coalesce(func.sum(Rollup.sales_count), 0)).filter(
+        Rollup.status.in_(["PENDIENTE", "CREDITO"])
     ).scalar()
     
     # Calcular variación diaria
-    today_total = today_sales.total or 0.0
-    yesterday_total = yesterday_sales.total or 0.0
+    today_total = totals.today_total or 0.0
+    yesterday_total = totals.yesterday_total or 0.0
     daily_change = 0.0
     if yesterday_total > 0:
         daily_change = round(((today_total - yesterday_total) / yesterday_total) * 100, 2)
     
     return {
         "today": {
-            "sales_count": today_sales.count or 0,
+            "sales_count": int(totals.today_count or 0),
             "total_usd": round(today_total, 2),
-            "paid_usd": round(today_sales.paid or 0.0, 2),
-            "pending_usd": round(today_sales.pending or 0.0, 2),
+            "paid_usd": round(totals.today_paid or 0.0, 2),
+            "pending_usd": round(totals.today_pending or 0.0, 2),
             "daily_change_percent": daily_change
         },
         "month": {
-            "sales_count": month_sales.count or 0,
-            "total_usd": round(month_sales.total or 0.0, 2)
+            "sales_count": int(totals.month_count or 0),
+            "total_usd": round(totals.month_total or 0.0, 2)
         },
         "alerts": {
             "low_stock_products": low_stock_count or 0,
             "clients_with_debt": clients_with_debt or 0,
-            "pending_sales": pending_sales or 0
+            "pending_sales": int(pending_sales or 0)
         }
     }
 
 
 @router.get("/dashboard/recent-sales")
 def get_recent_sales(
+    request: Request,
     limit: int = 10,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(role_required("CAJERO", "ADMIN"))
 ):
     """
     ✅ CORREGIDO: Últimas ventas realizadas.
     Excluye ventas anuladas (ANULADO) del listado.
     """
+    key = response_cache.key("dashboard:recent-sales", RECENT_SALES_TABLES, current_user, request)
+    return response_cache.get_or_set(key, lambda s: _recent_sales(s, limit), db)
+
+
+def _recent_sales(db: Session, limit: int) -> list:
     sales = db.query(models.sale.Sale).filter(
         models.sale.Sale.status != "ANULADO"  # ✅ Excluir anuladas
     ).order_by(
@@ -130,14 +144,20 @@ def get_recent_sales(
 
 @router.get("/dashboard/clients-with-debt")
 def get_clients_with_debt(
+    request: Request,
     limit: int = 20,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(role_required("CAJERO", "ADMIN"))
 ):
     """
     ✅ NUEVO: Obtener clientes con deuda pendiente
     Útil para ver quiénes deben dinero.
     """
+    key = response_cache.key("dashboard:clients-with-debt", CLIENTS_DEBT_TABLES, current_user, request)
+    return response_cache.get_or_set(key, lambda s: _clients_with_debt(s, limit), db)
+
+
+def _clients_with_debt(db: Session, limit: int) -> list:
     clients = db.query(
         models.client.Client.id,
         models.client.Client.name,
@@ -175,7 +195,7 @@ def get_clients_with_debt(
 
 @router.get("/dashboard/executive")
 def executive_dashboard(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(role_required("ADMIN"))
 ):
     total_sales = db.query(func.coalesce(func.sum(Sale.total_amount), 0)).scalar()
@@ -193,4 +213,12 @@ def executive_dashboard(
         "ingresos": float(ingresos),
         "egresos": float(egresos),
         "saldo_neto": float(ingresos - egresos)
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/dashboard/cache/stats")
+def response_cache_stats(
+    current_user=Depends(role_required("ADMIN"))
+):
+    """Aciertos, fallos e invalidaciones de la caché de dashboard/reportes"""
+    return response_cache.stats()
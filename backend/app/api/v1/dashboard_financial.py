@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
 from datetime import date
 
-from app.db.base import get_db
+from app.db.routing import get_read_db
 from app.core.security import role_required
+from app.core.response_cache import response_cache
+from app.core.dates import store_today
 from app.db.schemas.dashboard import (
     FinancialDashboard,
     CashStatus,
@@ -18,17 +20,26 @@ from app.services.dashboard_service import (
 
 router = APIRouter(prefix="/dashboard/financial")
 
+FINANCIAL_TABLES = ("cash_movements",)
+
 
 @router.get("", response_model=FinancialDashboard)
 def financial_dashboard(
+    request: Request,
     days: int = Query(7, ge=1, le=30),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(role_required("ADMIN", "CAJERO"))
 ):
+    # El mes en curso y la evolución diaria dependen del día de la tienda
+    today = store_today()
+    key = response_cache.key("dashboard:financial", FINANCIAL_TABLES, current_user, request, extra=(today,))
+    return response_cache.get_or_set(key, lambda s: _financial_dashboard(s, days, today), db)
+
+
+def _financial_dashboard(db: Session, days: int, today: date) -> dict:
     ingresos, egresos = get_cash_status(db)
     saldo = ingresos - egresos
 
-    today = date.today()
     start = today.replace(day=1)
 
     by_method = get_by_payment_method(db, start, today)
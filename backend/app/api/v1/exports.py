@@ -1,23 +1,31 @@
 # Backend/app/api/v1/export.py
-from fastapi import APIRouter, Depends
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime, date
-from typing import Optional
-import uuid
+from datetime import datetime, date, timezone
+from typing import Literal, Optional
 import os
 
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font, PatternFill
-
-from app.db.base import get_db
+from app.db.routing import get_read_db
 from app.core.security import role_required
-from app.db import models
+from app.db.schemas.export import ExportJobCreate, ExportJobOut
+from app.services.export_jobs import export_jobs, job_params, result_path
+from app.services.export_datasets import (
+    FORMATS as STREAM_FORMATS,
+    export_watermark,
+    get_dataset,
+    stream_dataset,
+)
+from app.services.parquet_export import export_parquet_zip, parquet_available
+from app.services.export_service import (
+    CSV_MEDIA_TYPE,
+    PDF_MEDIA_TYPE,
+    XLSX_MEDIA_TYPE,
+    export_financial_excel,
+    export_financial_pdf,
+    remove_file,
+)
 
 
 router = APIRouter(prefix="/exports", tags=["📤 Exportaciones"])
@@ -27,125 +35,179 @@ def parse_date(value: Optional[str]) -> Optional[date]:
         return None
     return datetime.strptime(value, "%Y-%m-%d").date()
 
-def get_financial_summary(db, start: date | None, end: date | None):
-    sales = db.query(models.sale.Sale).filter(models.sale.Sale.status != "ANULADO")
-    expenses = db.query(models.expense.Expense)
-
-    if start:
-        sales = sales.filter(func.date(models.sale.Sale.created_at) >= start)
-        expenses = expenses.filter(func.date(models.expense.Expense.created_at) >= start)
-
-    if end:
-        sales = sales.filter(func.date(models.sale.Sale.created_at) <= end)
-        expenses = expenses.filter(func.date(models.expense.Expense.created_at) <= end)
-
-    income = sales.with_entities(func.sum(models.sale.Sale.total_usd)).scalar() or 0
-    expense = expenses.with_entities(func.sum(models.expense.Expense.amount_usd)).scalar() or 0
-
-    return {
-        "income": round(income, 2),
-        "expense": round(expense, 2),
-        "balance": round(income - expense, 2),
-        "sales_count": sales.count(),
-        "expenses_count": expenses.count(),
-    }
-
 
 @router.get("/excel")
 def export_excel(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    db: Session = Depends(get_db),
+    detail: bool = Query(True, description="Incluir hojas de ventas, gastos y movimientos de caja"),
+    db: Session = Depends(get_read_db),
     _=Depends(role_required("ADMIN")),
 ):
     start = parse_date(start_date)
     end = parse_date(end_date)
 
-    summary = get_financial_summary(db, start, end)
-
-    file_path = f"/mnt/data/financial_{uuid.uuid4()}.xlsx"
-    wb = Workbook()
-
-    ws = wb.active
-    ws.title = "Resumen"
-
-    ws.append(["Concepto", "Valor (USD)"])
-    rows = [
-        ["Ingresos", summary["income"]],
-        ["Egresos", summary["expense"]],
-        ["Balance", summary["balance"]],
-        ["Ventas", summary["sales_count"]],
-        ["Gastos", summary["expenses_count"]],
-    ]
-
-    for row in rows:
-        ws.append(row)
-
-    header = PatternFill("solid", fgColor="4F81BD")
-    for cell in ws[1]:
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.fill = header
-        cell.alignment = Alignment(horizontal="center")
-
-    ws.column_dimensions["A"].width = 30
-    ws.column_dimensions["B"].width = 20
-
-    wb.save(file_path)
+    # Escritura en streaming a un temporal que se borra tras enviarlo
+    file_path = export_financial_excel(db, start, end, detail)
 
     return FileResponse(
         file_path,
         filename="Reporte_Financiero.xlsx",
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        media_type=XLSX_MEDIA_TYPE,
+        background=BackgroundTask(remove_file, file_path),
     )
 
 @router.get("/pdf")
 def export_pdf(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     _=Depends(role_required("ADMIN")),
 ):
     start = parse_date(start_date)
     end = parse_date(end_date)
 
-    summary = get_financial_summary(db, start, end)
+    file_path = export_financial_pdf(db, start, end)
+
+    return FileResponse(
+        file_path,
+        filename="Reporte_Financiero.pdf",
+        media_type=PDF_MEDIA_TYPE,
+        background=BackgroundTask(remove_file, file_path),
+    )
+
+
+# ============================================================
+# JOBS EN SEGUNDO PLANO
+# ============================================================
+MEDIA_TYPES = {"xlsx": XLSX_MEDIA_TYPE, "pdf": PDF_MEDIA_TYPE, "csv": CSV_MEDIA_TYPE}
+
+
+def _job_or_404(job_id: str) -> dict:
+    job = export_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Exportación no encontrada o vencida")
+    return job
+
+
+@router.post("/jobs", response_model=ExportJobOut, status_code=202)
+def create_export_job(
+    payload: ExportJobCreate,
+    _=Depends(role_required("ADMIN")),
+):
+    params = job_params(
+        payload.format,
+        payload.start_date,
+        payload.end_date,
+        detail=payload.detail,
+        dataset=payload.dataset,
+    )
+    job, cached = export_jobs.submit(params, force=payload.force)
+    return {**job, "cached": cached}
+
+
+@router.get("/jobs/{job_id}", response_model=ExportJobOut)
+def get_export_job(job_id: str, _=Depends(role_required("ADMIN"))):
+    return _job_or_404(job_id)
+
+
+@router.get("/jobs/{job_id}/download")
+def download_export_job(job_id: str, _=Depends(role_required("ADMIN"))):
+    job = _job_or_404(job_id)
+
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"La exportación aún no está lista ({job['status']})")
+
+    path = result_path(job)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Exportación no encontrada o vencida")
+
+    fmt = job["params"]["format"]
+    name = job["params"].get("dataset", "Reporte_Financiero") if fmt == "csv" else "Reporte_Financiero"
+
+    # El archivo se conserva hasta que vence (otros pedidos iguales lo reutilizan)
+    return FileResponse(path, filename=f"{name}.{fmt}", media_type=MEDIA_TYPES[fmt])
+
+
+# ============================================================
+# EXTRACCIONES CRUDAS EN STREAMING (CSV / NDJSON)
+# ============================================================
+@router.get("/stream/{dataset}")
+def stream_export(
+    dataset: str,
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    updated_since: Optional[datetime] = Query(
+        None, description="Solo filas creadas/modificadas desde este instante (ISO 8601)"
+    ),
+    db: Session = Depends(get_read_db),
+    _=Depends(role_required("ADMIN")),
+):
+    """
+    Exporta un dataset completo en una sola pasada. La cabecera
+    X-Export-Watermark trae el `updated_since` para la próxima extracción.
+    """
+    source = get_dataset(dataset)
+    if not source:
+        raise HTTPException(status_code=404, detail=f"Dataset no encontrado: {dataset}")
+
+    if updated_since is not None and updated_since.tzinfo is None:
+        updated_since = updated_since.replace(tzinfo=timezone.utc)
+
+    watermark = export_watermark(db)
+    media_type, _ = STREAM_FORMATS[format]
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+
+    return StreamingResponse(
+        stream_dataset(source, format, parse_date(start_date), parse_date(end_date), updated_since),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{dataset}_{stamp}.{format}"',
+            "X-Export-Watermark": watermark.isoformat(),
+        },
+    )
 
-    file_path = f"/mnt/data/financial_{uuid.uuid4()}.pdf"
-    doc = SimpleDocTemplate(file_path, pagesize=A4)
 
-    styles = getSampleStyleSheet()
-    elements = []
+# ============================================================
+# PARQUET (ANALÍTICA)
+# ============================================================
+PARQUET_DATASETS = ("sales", "sale_details", "payments", "cash_movements")
 
-    logo_path = "/mnt/data/logo.png"
-    if os.path.exists(logo_path):
-        elements.append(Image(logo_path, width=120, height=50))
 
-    elements.append(Paragraph("Reporte Financiero", styles["Title"]))
-    elements.append(Paragraph(
-        f"Período: {start or 'Inicio'} → {end or 'Hoy'}",
-        styles["Normal"]
-    ))
+@router.get("/parquet/{dataset}")
+def export_parquet(
+    dataset: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    updated_since: Optional[datetime] = Query(
+        None, description="Modo incremental: solo filas creadas/modificadas desde este instante"
+    ),
+    db: Session = Depends(get_read_db),
+    _=Depends(role_required("ADMIN")),
+):
+    """
+    Dataset en Parquet particionado por mes (.zip con month=AAAA-MM/part-0.parquet).
+    La cabecera X-Export-Watermark trae el `updated_since` para la próxima corrida.
+    """
+    if not parquet_available():
+        raise HTTPException(status_code=501, detail="Exportación Parquet no disponible: falta instalar pyarrow")
 
-    table_data = [
-        ["Concepto", "Monto (USD)"],
-        ["Ingresos", summary["income"]],
-        ["Egresos", summary["expense"]],
-        ["Balance", summary["balance"]],
-    ]
+    source = get_dataset(dataset) if dataset in PARQUET_DATASETS else None
+    if not source:
+        raise HTTPException(status_code=404, detail=f"Dataset no encontrado: {dataset}")
 
-    table = Table(table_data)
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#4F81BD")),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-        ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-    ]))
+    if updated_since is not None and updated_since.tzinfo is None:
+        updated_since = updated_since.replace(tzinfo=timezone.utc)
 
-    elements.append(table)
-    doc.build(elements)
+    watermark = export_watermark(db)
+    zip_path = export_parquet_zip(source, parse_date(start_date), parse_date(end_date), updated_since)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
 
     return FileResponse(
-        file_path,
-        filename="Reporte_Financiero.pdf",
-        media_type="application/pdf",
+        zip_path,
+        filename=f"{dataset}_{stamp}.parquet.zip",
+        media_type="application/zip",
+        headers={"X-Export-Watermark": watermark.isoformat()},
+        background=BackgroundTask(remove_file, zip_path),
     )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from datetime import datetime
@@ -6,6 +6,7 @@ from datetime import datetime
 from app.db.base import get_db
 from app.db.schemas.movement import MovementOut
 from app.crud.movement import get_movements
+from app.core.pagination import set_next_cursor
 from app.core.security import get_current_user
 from app.db.models.movement import MovementType
 from app.db.models.user import User
@@ -19,11 +20,13 @@ router = APIRouter()
     summary="Obtener movimientos del sistema",
 )
 def list_movements(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
 
     type: Optional[MovementType] = Query(None),
     user_id: Optional[int] = Query(None),
@@ -36,6 +39,7 @@ def list_movements(
     Registro unificado de movimientos del sistema.
     - Respeta sucursal del usuario
     - Filtros opcionales por tipo, usuario y fechas
+    - Paginación por cursor (cabecera X-Next-Cursor)
     """
 
     # 🔒 Seguridad por sucursal
@@ -43,7 +47,7 @@ def list_movements(
         branch_id if current_user.is_admin else current_user.branch_id
     )
 
-    return get_movements(
+    movements, next_cursor = get_movements(
         db=db,
         skip=skip,
         limit=limit,
@@ -52,4 +56,8 @@ def list_movements(
         branch_id=effective_branch_id,
         date_from=date_from,
         date_to=date_to,
+        cursor=cursor,
     )
+    set_next_cursor(response, next_cursor)
+
+    return movements
@@ -5,35 +5,41 @@
 2. Al anular venta → crea reversos contables
 3. Al pagar venta → registra nuevos movimientos de caja
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Query, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from datetime import date
 from app.core.security import get_db, role_required
+from app.core.dates import store_today
 from app.db import models
 from app.db.schemas.pos import (
-    SaleCreate, SaleOut, SaleDetailOut, PaymentCreate, PaymentOut, PaymentMethod,
+    SaleCreate, SaleOut, PaymentCreate, PaymentMethod,
 )
 from app.core.security import (
     get_current_user,
     get_db,
 )
 from app.services.cash_flow_service import CashFlowService  # ✅ NUEVO
-from sqlalchemy import func
 from app.db.schemas.payment import PaymentCreate, PaymentResponse
 from app.services.payment_service import process_sale_payments
 from app.db.models.sale import Sale
 from app.services.sales_service import create_sale_service 
+from app.services.stock_service import increment_stock, sale_quantities
+from app.services.sales_rollup_service import apply_sale_change, sale_snapshot
+from app.services.document_number_service import next_document_code
+from app.core.pagination import keyset_page, set_next_cursor
+from app.db.async_base import get_async_db
+from app.services.sale_projection_service import (
+    sale_rows_query,
+    project_sales,
+    get_sale_out,
+)
 
 router = APIRouter()
 
 
 def generate_sale_code(db: Session):
-    today = date.today().strftime("%Y%m%d")
-    count = db.query(func.count(models.sale.Sale.id)).filter(
-        func.date(models.sale.Sale.created_at) == date.today()
-    ).scalar() or 0
-    return f"VENTA-{today}-{count+1:03d}"
+    return next_document_code(db, "VENTA", width=3, day=store_today())
 
 
 def summarize_payment_method(payments: List[PaymentCreate]) -> str:
@@ -48,13 +54,20 @@ def summarize_payment_method(payments: List[PaymentCreate]) -> str:
     return "MIXTO"
 
 
+def _checkout(db: Session, payload: SaleCreate, current_user) -> SaleOut:
+    sale = create_sale_service(db, payload, current_user)
+    # La venta se insertó con INSERT masivos: details/payments no están
+    # cargados y no se pueden cargar en diferido fuera de run_sync
+    return get_sale_out(db, sale.id)
+
+
 @router.post("/sales", response_model=SaleOut, status_code=201)
-def create_sale(
+async def create_sale(
     payload: SaleCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(role_required("CAJERO", "ADMIN"))
 ):
-    return create_sale_service(db, payload, current_user)
+    return await db.run_sync(_checkout, payload, current_user)
 
 
 @router.put("/sales/{sale_id}/annul", status_code=status.HTTP_200_OK)
@@ -66,20 +79,20 @@ def annul_sale(
     """
     ✅ ACTUALIZADO: Anular venta y crear reversos contables
     """
-    sale = db.query(models.sale.Sale).filter(models.sale.Sale.id == sale_id).first()
+    # Bloquear la venta: la foto `before` del rollup debe ser la vigente
+    sale = db.query(models.sale.Sale).filter(
+        models.sale.Sale.id == sale_id
+    ).with_for_update().first()
     if not sale:
         raise HTTPException(status_code=404, detail="Venta no encontrada")
 
     if sale.status == "ANULADO":
         raise HTTPException(status_code=400, detail="Venta ya anulada")
 
-    # Restaurar stock
-    for detail in sale.details:
-        product = db.query(models.product.Product).filter(
-            models.product.Product.id == detail.product_id
-        ).first()
-        if product:
-            product.stock += detail.quantity
+    before = sale_snapshot(sale)
+
+    # Restaurar stock (un solo UPDATE para todas las líneas)
+    increment_stock(db, sale_quantities(db, sale.id))
 
     # Ajustar balance del cliente
     if sale.client_id:
@@ -103,6 +116,7 @@ def annul_sale(
     # Marcar anulada
     sale.status = "ANULADO"
     sale.balance_usd = 0.0
+    apply_sale_change(db, before, sale_snapshot(sale))
 
     db.commit()
 
@@ -123,7 +137,7 @@ def add_payments_to_sale(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user),
 ):
-    sale = db.query(Sale).filter(Sale.id == sale_id).first()
+    sale = db.query(Sale).filter(Sale.id == sale_id).with_for_update().first()
 
     if not sale:
         raise HTTPException(
@@ -148,7 +162,9 @@ def pay_sale(
     db: Session = Depends(get_db),
     current_user=Depends(role_required("CAJERO", "ADMIN"))
 ):
-    sale = db.query(models.sale.Sale).filter(models.sale.Sale.id == sale_id).first()
+    sale = db.query(models.sale.Sale).filter(
+        models.sale.Sale.id == sale_id
+    ).with_for_update().first()
 
     if not sale:
         raise HTTPException(404, "Venta no encontrada")
@@ -156,6 +172,8 @@ def pay_sale(
     if sale.status in ["ANULADO", "PAGADO"]:
         raise HTTPException(400, "No se puede pagar esta venta")
 
+    before = sale_snapshot(sale)
+
     cash_register = db.query(models.cash_register.CashRegister).filter(
         models.cash_register.CashRegister.status == "OPEN",
         models.cash_register.CashRegister.opened_by_user_id == current_user.id
@@ -208,6 +226,7 @@ def pay_sale(
     sale.paid_usd = round(sale.paid_usd + total_new, 2)
     sale.balance_usd = round(sale.total_usd - sale.paid_usd, 2)
     sale.status = "PAGADO" if sale.balance_usd == 0 else "PENDIENTE"
+    apply_sale_change(db, before, sale_snapshot(sale))
 
     db.commit()
 
@@ -224,120 +243,52 @@ def pay_sale(
 # ============================
 
 @router.get("/sales/{sale_id}", response_model=SaleOut)
-def get_sale(
+async def get_sale(
     sale_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(role_required("CAJERO", "ADMIN"))
 ):
     """Obtener venta por ID"""
-    sale = db.query(models.sale.Sale).filter(
-        models.sale.Sale.id == sale_id
-    ).first()
+    sale = await db.run_sync(get_sale_out, sale_id)
 
     if not sale:
         raise HTTPException(status_code=404, detail="Venta no encontrada")
 
-    details_out = [
-        SaleDetailOut(
-            id=d.id,
-            product_id=d.product_id,
-            product_name=d.product.name,
-            quantity=d.quantity,
-            price_usd=d.price_usd,
-            subtotal_usd=d.subtotal_usd
-        )
-        for d in sale.details
-    ]
-
-    payments_out = [
-        PaymentOut(
-            id=p.id,
-            method=p.method,
-            amount_usd=p.amount_usd,
-            reference=p.reference,
-            created_at=p.created_at
-        )
-        for p in sale.payments
-    ]
-
-    return SaleOut(
-        id=sale.id,
-        code=sale.code,
-        client_id=sale.client_id,
-        client_name=sale.client.name if sale.client else None,
-        client_phone=sale.client.phone if sale.client else None,
-        seller_id=sale.seller_id,
-        subtotal_usd=sale.subtotal_usd,
-        total_usd=sale.total_usd,
-        paid_usd=sale.paid_usd,
-        balance_usd=sale.balance_usd,
-        payment_method=sale.payment_method,
-        status=sale.status,
-        details=details_out,
-        payments=payments_out,
-        created_at=sale.created_at
+    return sale
+
+
+def _list_sales_page(db: Session, status: Optional[str], cursor: Optional[str], limit: int, skip: int):
+    query = sale_rows_query(db)
+
+    if status:
+        query = query.filter(models.sale.Sale.status == status.upper())
+
+    rows, next_cursor = keyset_page(
+        query,
+        [models.sale.Sale.created_at, models.sale.Sale.id],
+        cursor,
+        limit,
+        offset=skip,
     )
+    return project_sales(db, rows), next_cursor
 
 
 @router.get("/sales", response_model=List[SaleOut])
-def list_sales(
+async def list_sales(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
     status: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(role_required("CAJERO", "ADMIN"))
 ):
-    """Listar ventas"""
-    query = db.query(models.sale.Sale)
-
-    if status:
-        query = query.filter(models.sale.Sale.status == status.upper())
-
-    sales = query.order_by(
-        models.sale.Sale.created_at.desc()
-    ).offset(skip).limit(limit).all()
-
-    results = []
-    for sale in sales:
-        details_out = [
-            SaleDetailOut(
-                id=d.id,
-                product_id=d.product_id,
-                product_name=d.product.name,
-                quantity=d.quantity,
-                price_usd=d.price_usd,
-                subtotal_usd=d.subtotal_usd
-            )
-            for d in sale.details
-        ]
-
-        payments_out = [
-            PaymentOut(
-                id=p.id,
-                method=p.method,
-                amount_usd=p.amount_usd,
-                reference=p.reference,
-                created_at=p.created_at
-            )
-            for p in sale.payments
-        ]
-
-        results.append(SaleOut(
-            id=sale.id,
-            code=sale.code,
-            client_id=sale.client_id,
-            client_name=sale.client.name if sale.client else None,
-            client_phone=sale.client.phone if sale.client else None,
-            seller_id=sale.seller_id,
-            subtotal_usd=sale.subtotal_usd,
-            total_usd=sale.total_usd,
-            paid_usd=sale.paid_usd,
-            balance_usd=sale.balance_usd,
-            payment_method=sale.payment_method,
-            status=sale.status,
-            details=details_out,
-            payments=payments_out,
-            created_at=sale.created_at
-        ))
+    """
+    Listar ventas (más recientes primero).
+    Paginación por cursor: enviar `cursor` con la cabecera X-Next-Cursor
+    de la respuesta anterior. `skip` se mantiene por compatibilidad.
+    """
+    sales, next_cursor = await db.run_sync(_list_sales_page, status, cursor, limit, skip)
+    set_next_cursor(response, next_cursor)
 
-    return results
\ No newline at end of file
+    return sales
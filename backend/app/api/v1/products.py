@@ -1,12 +1,16 @@
 # backend/app/api/v1/products.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import update
+from typing import List, Optional
 from app.db import models
 from app.db.schemas.products import ProductCreate, ProductOut, ProductUpdate
 from app.core.security import get_db, role_required
 from app.services.movement_service import create_movement
 from app.db.models.movement import MovementType
+from app.core.pagination import keyset_page, set_next_cursor
+from app.services.product_search_index import product_search_index
+from app.services.barcode_cache import barcode_cache
 
 router = APIRouter()
 
@@ -46,6 +50,8 @@ def create_product(
     db.add(product)
     db.commit()
     db.refresh(product)
+    product_search_index.upsert(product)
+    barcode_cache.invalidate(product.id, product.code)
 
     if product.stock > 0:
         create_movement(
@@ -65,18 +71,30 @@ def create_product(
     "/",
     response_model=List[ProductOut],
     summary="Listar productos activos",
-    description="Devuelve todos los productos activos del inventario. Se puede incluir inactivos con `active_only=false`."
+    description=(
+        "Devuelve todos los productos activos del inventario. Se puede incluir inactivos con `active_only=false`. "
+        "Con `limit` pagina por cursor: la siguiente página se pide con la cabecera `X-Next-Cursor`."
+    )
 )
 def list_products(
+    response: Response,
     db: Session = Depends(get_db),
     current_user=Depends(role_required("ADMIN", "CAJERO", "INVENTARIO")),
     active_only: bool = Query(True, description="Filtrar solo productos activos"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Tamaño de página (paginación por cursor)"),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
 ):
     query = db.query(models.product.Product)
     if active_only:
         query = query.filter(models.product.Product.is_active == True)
 
-    products = query.order_by(models.product.Product.id.desc()).all()
+    products, next_cursor = keyset_page(
+        query,
+        [models.product.Product.id],
+        cursor,
+        limit,
+    )
+    set_next_cursor(response, next_cursor)
 
     # Recalcular margen real para cada producto antes de devolverlo
     for p in products:
@@ -128,6 +146,7 @@ def update_product(
 
     old_price = product.sale_price
     old_margin = product.profit_margin
+    old_code = product.code
 
     update_data = payload.dict(exclude_unset=True)
 
@@ -145,6 +164,8 @@ def update_product(
 
     db.commit()
     db.refresh(product)
+    product_search_index.upsert(product)
+    barcode_cache.invalidate(product.id, old_code)
 
     if product.sale_price != old_price:
         create_movement(
@@ -204,16 +225,21 @@ def restock_product(
     db: Session = Depends(get_db),
     current_user=Depends(role_required("ADMIN", "INVENTARIO")),
 ):
-    product = db.query(models.product.Product).filter(
-        models.product.Product.id == product_id
+    # UPDATE ... SET stock = stock + :amount RETURNING * (sin leer antes)
+    product = db.scalars(
+        update(models.product.Product)
+        .where(models.product.Product.id == product_id)
+        .values(stock=models.product.Product.stock + amount)
+        .returning(models.product.Product)
+        .execution_options(populate_existing=True)
     ).first()
 
     if not product:
         raise HTTPException(404, "Producto no encontrado")
 
-    product.stock += amount
     db.commit()
-    db.refresh(product)
+    product_search_index.upsert(product)
+    barcode_cache.update_stock({product.id: product.stock})
 
     create_movement(
         db=db,
@@ -248,6 +274,8 @@ def delete_product(
 
     product.is_active = False
     db.commit()
+    product_search_index.remove(product_id)
+    barcode_cache.invalidate(product_id, product.code)
     return None
 
 # 📊 Resumen general del inventario
@@ -1,14 +1,18 @@
 # Backend/app/api/v1/reports.py
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from datetime import datetime, date
 from typing import Optional
 
 from app.db.base import get_db
+from app.db.routing import get_read_db
 from app.core.security import get_current_user, role_required
+from app.core.response_cache import response_cache
+from app.core.dates import date_filters
 from app.db import models
 from app.db.schemas.financial_report import CashFlowReport
+from app.services.sales_rollup_service import apply_sale_change, sale_snapshot
 from app.services.financial_report_service import (
     get_cash_flow_report,
     cash_summary,
@@ -18,6 +22,9 @@ from app.services.financial_report_service import (
 
 router = APIRouter(prefix="/reports", tags=["📊 Reportes"])
 
+# Tablas de las que dependen los reportes cacheados
+REPORT_TABLES = ("sales", "payments", "cash_movements", "expenses")
+
 def parse_date(value: Optional[str]) -> Optional[date]:
     if not value:
         return None
@@ -25,24 +32,25 @@ def parse_date(value: Optional[str]) -> Optional[date]:
 
 @router.get("/summary")
 def financial_summary(
+    request: Request,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    db: Session = Depends(get_db),
-    _=Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_user),
 ):
+    key = response_cache.key("reports:summary", REPORT_TABLES, current_user, request)
+    return response_cache.get_or_set(key, lambda s: _financial_summary(s, start_date, end_date), db)
+
+
+def _financial_summary(db: Session, start_date: Optional[str], end_date: Optional[str]) -> dict:
     start = parse_date(start_date)
     end = parse_date(end_date)
 
     sales = db.query(models.sale.Sale).filter(models.sale.Sale.status != "ANULADO")
     expenses = db.query(models.expense.Expense)
 
-    if start:
-        sales = sales.filter(func.date(models.sale.Sale.created_at) >= start)
-        expenses = expenses.filter(func.date(models.expense.Expense.created_at) >= start)
-
-    if end:
-        sales = sales.filter(func.date(models.sale.Sale.created_at) <= end)
-        expenses = expenses.filter(func.date(models.expense.Expense.created_at) <= end)
+    sales = sales.filter(*date_filters(models.sale.Sale.created_at, start, end))
+    expenses = expenses.filter(*date_filters(models.expense.Expense.created_at, start, end))
 
     income = sales.with_entities(func.sum(models.sale.Sale.total_usd)).scalar() or 0
     expense = expenses.with_entities(func.sum(models.expense.Expense.amount_usd)).scalar() or 0
@@ -57,45 +65,59 @@ def financial_summary(
 
 @router.get("/cash-flow", response_model=CashFlowReport)
 def cash_flow_report(
+    request: Request,
     start_date: date = Query(...),
     end_date: date = Query(...),
-    db: Session = Depends(get_db),
-    _=Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_user),
 ):
-    data = get_cash_flow_report(db, start_date, end_date)
-    return {"period": f"{start_date} → {end_date}", **data}
+    def compute(session: Session):
+        data = get_cash_flow_report(session, start_date, end_date)
+        return {"period": f"{start_date} → {end_date}", **data}
+
+    key = response_cache.key("reports:cash-flow", REPORT_TABLES, current_user, request)
+    return response_cache.get_or_set(key, compute, db)
 
 @router.get("/cash-summary")
 def cash_summary_report(
+    request: Request,
     from_date: date = Query(...),
     to_date: date = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    income, expense = cash_summary(db, from_date, to_date)
-    return {
-        "income": income or 0,
-        "expense": expense or 0,
-        "net": (income or 0) - (expense or 0),
-    }
+    def compute(session: Session):
+        income, expense = cash_summary(session, from_date, to_date)
+        return {
+            "income": income or 0,
+            "expense": expense or 0,
+            "net": (income or 0) - (expense or 0),
+        }
+
+    key = response_cache.key("reports:cash-summary", REPORT_TABLES, request=request)
+    return response_cache.get_or_set(key, compute, db)
 
 @router.get("/cash-by-method")
 def cash_by_payment_method(
+    request: Request,
     from_date: date = Query(...),
     to_date: date = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    return [
+    key = response_cache.key("reports:cash-by-method", REPORT_TABLES, request=request)
+    return response_cache.get_or_set(key, lambda s: [
         {"method": method, "total": total}
-        for method, total in cash_by_method(db, from_date, to_date)
-    ]
+        for method, total in cash_by_method(s, from_date, to_date)
+    ], db)
 
 @router.get("/cash-movements")
 def cash_movements_report(
+    request: Request,
     from_date: date = Query(...),
     to_date: date = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
-    return cash_movements(db, from_date, to_date)
+    key = response_cache.key("reports:cash-movements", REPORT_TABLES, request=request)
+    return response_cache.get_or_set(key, lambda s: cash_movements(s, from_date, to_date), db)
 
 @router.post("/sales/{sale_id}/cancel")
 def cancel_sale(
@@ -103,7 +125,9 @@ def cancel_sale(
     db: Session = Depends(get_db),
     _=Depends(role_required("ADMIN")),
 ):
-    sale = db.query(models.sale.Sale).get(sale_id)
+    sale = db.query(models.sale.Sale).filter(
+        models.sale.Sale.id == sale_id
+    ).with_for_update().first()
 
     if not sale:
         raise HTTPException(status_code=404, detail="Venta no encontrada")
@@ -111,7 +135,9 @@ def cancel_sale(
     if sale.status == "ANULADO":
         return {"message": "La venta ya estaba anulada"}
 
+    before = sale_snapshot(sale)
     sale.status = "ANULADO"
+    apply_sale_change(db, before, sale_snapshot(sale))
     db.commit()
 
     return {"message": "Venta anulada correctamente", "sale_id": sale_id}
@@ -1,12 +1,20 @@
 # backend/app/api/v1/search.py
 from fastapi import APIRouter, Depends, Query, HTTPException
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Any, Dict
 
-from app.core.security import get_db, role_required
+from app.core.security import role_required
 from app.db import models
+from app.core.config import settings
+from app.db.routing import get_read_db, get_read_async_db
+from app.db.async_base import AsyncSessionLocal, get_async_db
 from app.db.schemas.products import ProductOut
+from app.db.schemas.client import ClientOut
+from app.services.product_search_index import product_search_index, product_payload
+from app.services.barcode_cache import barcode_cache
+from app.services.search_service import search_products_db, search_clients_db
 import logging
 
 router = APIRouter()
@@ -31,16 +39,29 @@ def orm_to_dict(obj: Any) -> Dict[str, Any]:
 # ============================================================
 # 🔍 RUTA DE BÚSQUEDA — DEBE IR *ANTES* DE /products/{id}
 # ============================================================
+def _recent_products(db: Session, limit: int) -> List[Dict[str, Any]]:
+    products = (
+        db.query(models.product.Product)
+        .filter(models.product.Product.is_active == True)
+        .order_by(models.product.Product.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [product_payload(p) for p in products]
+
+
 @router.get("/products/search", response_model=List[ProductOut])
-def search_products(
+async def search_products(
     q: Optional[str] = Query(None, min_length=1, description="Término: código, nombre o categoría"),
     limit: int = Query(20, ge=1, le=50),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_async_db),
     current_user=Depends(role_required("CAJERO", "ADMIN", "INVENTARIO"))
 ):
     """
     Búsqueda rápida para el POS.
-    Compatible con ProductOut.
+    Con SEARCH_BACKEND=memory se responde desde el índice en memoria (sin
+    consultar PostgreSQL por cada tecla); con SEARCH_BACKEND=postgres usa
+    los índices pg_trgm / tsvector. Compatible con ProductOut.
     """
     try:
         # Normalizar q
@@ -49,53 +70,25 @@ def search_products(
             if q == "":
                 q = None
 
+        if settings.SEARCH_BACKEND == "postgres":
+            # Sin query → productos recientes
+            if not q:
+                return await db.run_sync(_recent_products, limit)
+
+            return await db.run_sync(search_products_db, q, limit)
+
+        # La recarga por marca de agua lee del primario: una réplica atrasada
+        # dejaría el índice con precios viejos o saltaría filas
+        async with AsyncSessionLocal() as primary:
+            await primary.run_sync(product_search_index.ensure_fresh)
+
         # Sin query → productos recientes
         if not q:
-            products = (
-                db.query(models.product.Product)
-                .filter(models.product.Product.is_active == True)
-                .order_by(models.product.Product.id.desc())
-                .limit(limit)
-                .all()
-            )
-        else:
-            search_term = f"%{q}%"
-            products = (
-                db.query(models.product.Product)
-                .filter(
-                    models.product.Product.is_active == True,
-                    or_(
-                        models.product.Product.code.ilike(search_term),
-                        models.product.Product.name.ilike(search_term),
-                        models.product.Product.category.ilike(search_term),
-                    )
-                )
-                .limit(limit)
-                .all()
-            )
-
-        # Formar respuesta compatible con ProductOut
-        results = []
-        for p in products:
-            row = orm_to_dict(p)
-
-            # Calcular profit margin
-            try:
-                cost_price = row.get("cost_price")
-                sale_price = row.get("sale_price")
-
-                if sale_price and cost_price and sale_price > 0:
-                    row["profit_margin"] = round((1 - (cost_price / sale_price)) * 100, 2)
-                else:
-                    row["profit_margin"] = None
-
-            except Exception as e:
-                logger.debug(f"No se pudo calcular profit_margin para ID={row.get('id')}: {e}")
-                row["profit_margin"] = None
-
-            results.append(row)
-
-        return results
+            return await run_in_threadpool(product_search_index.recent, limit)
+
+        # El índice es Python puro (lock, reconstrucción de claves, pasada por
+        # subcadenas): corre en el threadpool para no bloquear el event loop
+        return await run_in_threadpool(product_search_index.search, q, limit)
 
     except HTTPException:
         raise
@@ -105,38 +98,71 @@ def search_products(
 
 
 # ============================================================
-# 🔍 BÚSQUEDA POR CÓDIGO DE BARRAS
+# 🔍 BÚSQUEDA DE CLIENTES (pg_trgm + tsvector)
 # ============================================================
-@router.get("/products/barcode/{barcode}", response_model=ProductOut)
-def get_product_by_barcode(
-    barcode: str,
-    db: Session = Depends(get_db),
-    current_user=Depends(role_required("CAJERO", "ADMIN", "INVENTARIO"))
+@router.get("/clients/search", response_model=List[ClientOut])
+def search_clients(
+    q: str = Query(..., min_length=1, description="Término: nombre, documento o teléfono"),
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+    current_user=Depends(role_required("CAJERO", "ADMIN"))
 ):
-    if not barcode.strip():
-        raise HTTPException(status_code=400, detail="El código de barras no puede estar vacío")
+    """Búsqueda de clientes ordenada por relevancia"""
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="El término de búsqueda no puede estar vacío")
+
+    return search_clients_db(db, q, limit)
+
 
-    product = (
+# ============================================================
+# 🔍 BÚSQUEDA POR CÓDIGO DE BARRAS
+# ============================================================
+def _active_product_by_code(db: Session, code: str):
+    return (
         db.query(models.product.Product)
         .filter(
-            models.product.Product.code == barcode.strip(),
+            models.product.Product.code == code,
             models.product.Product.is_active == True
         )
         .first()
     )
 
+
+@router.get("/products/barcode/{barcode}", response_model=ProductOut)
+async def get_product_by_barcode(
+    barcode: str,
+    # Primario: un fallo rellena la caché (BARCODE_CACHE_TTL_SECONDS) y tras
+    # update_product una réplica atrasada la llenaría con el precio anterior
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(role_required("CAJERO", "ADMIN", "INVENTARIO"))
+):
+    code = barcode.strip()
+    if not code:
+        raise HTTPException(status_code=400, detail="El código de barras no puede estar vacío")
+
+    cached = barcode_cache.get(code)
+    if cached is not None:
+        return cached
+
+    product = await db.run_sync(_active_product_by_code, code)
+
     if not product:
         raise HTTPException(status_code=404, detail=f"Producto '{barcode}' no encontrado")
 
-    row = orm_to_dict(product)
+    row = product_payload(product)
+    barcode_cache.put(row)
+    return row
 
-    sale = row.get("sale_price")
-    cost = row.get("cost_price")
-    row["profit_margin"] = (
-        round((1 - (cost / sale)) * 100, 2) if sale and cost and sale > 0 else None
-    )
 
-    return row
+# ============================================================
+# 📊 ESTADÍSTICAS DE LA CACHÉ DE ESCANEO
+# ============================================================
+@router.get("/products/barcode-cache/stats")
+def barcode_cache_stats(
+    current_user=Depends(role_required("ADMIN"))
+):
+    return barcode_cache.stats()
 
 
 # ============================================================
@@ -146,7 +172,7 @@ def get_product_by_barcode(
 def get_products_by_category(
     category: str,
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(role_required("CAJERO", "ADMIN", "INVENTARIO"))
 ):
     products = (
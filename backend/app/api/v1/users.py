@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional
 from app.db import models
 from app.db.schemas.user import  UserOut
 from app.core.security import (
-    get_password_hash,
+    get_password_hash_async,
     get_current_user,
     get_db
 )
 from app.core.logging_config import get_logger
 from app.core.security import role_required
+from app.core.pagination import keyset_page, set_next_cursor
+from app.core.principal_cache import principal_cache
 
 
 logger = get_logger(__name__)
@@ -18,16 +21,30 @@ router = APIRouter(prefix="/users", tags=["Users"])
 
 @router.get("/")
 def list_users(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     user = Depends(role_required("ADMIN"))
 ):
-    return db.query(models.user.User).all()
+    users, next_cursor = keyset_page(
+        db.query(models.user.User),
+        [models.user.User.id],
+        cursor,
+        limit,
+        descending=False,
+    )
+    set_next_cursor(response, next_cursor)
+    return users
 
 # =============================
 # ADMIN: LISTAR USUARIOS
 # =============================
 @router.get("/users", response_model=List[UserOut])
 def list_users(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
     current_user: models.user.User = Depends(get_current_user)
 ):
@@ -40,7 +57,14 @@ def list_users(
             detail="Solo administradores pueden ver usuarios"
         )
     
-    users = db.query(models.user.User).all()
+    users, next_cursor = keyset_page(
+        db.query(models.user.User),
+        [models.user.User.id],
+        cursor,
+        limit,
+        descending=False,
+    )
+    set_next_cursor(response, next_cursor)
     logger.info(f"📋 Listado de usuarios solicitado por {current_user.email}")
     
     return users
@@ -76,6 +100,7 @@ def delete_user(
     
     db.delete(user)
     db.commit()
+    principal_cache.invalidate_user(user_id)
     
     logger.warning(f"🗑️ Usuario eliminado: {user.email} por {current_user.email}")
     
@@ -86,7 +111,7 @@ def delete_user(
 # ADMIN: CAMBIAR CONTRASEÑA
 # =============================
 @router.put("/users/{user_id}/password")
-def update_user_password(
+async def update_user_password(
     user_id: int,
     password_data: dict,
     db: Session = Depends(get_db),
@@ -97,9 +122,11 @@ def update_user_password(
     if current_user.role != "ADMIN":
         raise HTTPException(status_code=403, detail="Solo administradores")
     
-    user = db.query(models.user.User).filter(
-        models.user.User.id == user_id
-    ).first()
+    user = await run_in_threadpool(
+        lambda: db.query(models.user.User).filter(
+            models.user.User.id == user_id
+        ).first()
+    )
     
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
@@ -112,8 +139,9 @@ def update_user_password(
             detail="Contraseña debe tener mínimo 6 caracteres"
         )
     
-    user.password_hash = get_password_hash(new_password)
-    db.commit()
+    user.password_hash = await get_password_hash_async(new_password)
+    await run_in_threadpool(db.commit)
+    principal_cache.invalidate_user(user_id)
     
     logger.info(f"🔑 Contraseña actualizada para {user.email} por {current_user.email}")
     
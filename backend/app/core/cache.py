@@ -0,0 +1,109 @@
+# backend/app/core/cache.py
+"""
+Caché LRU en memoria con TTL opcional y contadores de aciertos/fallos.
+
+    cache = LRUCache(max_entries=5000, ttl_seconds=300)
+    value = cache.get(key)
+    if value is None:
+        value = cargar()
+        cache.set(key, value)
+
+Es por proceso (cada worker tiene la suya) y segura entre hilos.
+
+`on_evict(key, value)` se llama, fuera del lock, por cada entrada que sale
+sola de la caché (desalojo LRU o TTL vencido), no por `pop` ni `clear`.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: Optional[float] = None,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = item
+            if not expires_at or expires_at > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+
+            del self._data[key]
+            self.misses += 1
+
+        if self.on_evict:
+            self.on_evict(key, value)
+        return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else 0.0
+        evicted = []
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                old_key, (_, old_value) = self._data.popitem(last=False)
+                evicted.append((old_key, old_value))
+                self.evictions += 1
+
+        if self.on_evict:
+            for old_key, old_value in evicted:
+                self.on_evict(old_key, old_value)
+
+    def update(self, key: Hashable, fn: Callable[[Any], Any]) -> bool:
+        """Reemplaza el valor en sitio (sin tocar TTL ni orden LRU)"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return False
+            self._data[key] = (item[0], fn(item[1]))
+            return True
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.pop(key, None)
+            return item[1] if item else None
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+            }
@@ -8,7 +8,17 @@ class Settings(BaseSettings):
     DB_POOL_SIZE: int = 10
     DB_MAX_OVERFLOW: int = 20
     DB_POOL_PRE_PING: bool = True
+    DB_POOL_TIMEOUT: int = 30           # segundos esperando conexión libre
+    DB_POOL_RECYCLE: int = 1800         # segundos de vida de una conexión
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # 0 = sin límite
+    DB_APPLICATION_NAME: str = "pos-backend"
     DB_ECHO: bool = False
+
+    # Réplicas de lectura (dashboard, reportes, exportaciones, búsqueda)
+    DB_REPLICA_URLS: str = ""           # DSNs separados por coma
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_LAG_CHECK_SECONDS: int = 10
+    DB_REPLICA_CONNECT_TIMEOUT_SECONDS: int = 3
     
     # Seguridad
     SECRET_KEY: str
@@ -25,6 +35,73 @@ class Settings(BaseSettings):
     
     # Caché
     CACHE_TTL: int = 3600
+
+    # Caché de respuestas (dashboard / reportes): "memory" | "redis"
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+    RESPONSE_CACHE_LOCAL_TTL: int = 30  # backend memory: otros workers no invalidan
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Correlativos de documentos (VTA-, VENTA-, EGRESO-)
+    # Cantidad de números que cada worker reserva por viaje a la BD
+    DOC_SEQUENCE_BLOCK_SIZE: int = 1
+    # Pool propio de los contadores (ver document_number_service)
+    DOC_SEQUENCE_POOL_SIZE: int = 2
+
+    # Idempotencia (cabecera Idempotency-Key en cobros POS)
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_MAX_ENTRIES: int = 10000
+
+    # Búsqueda de productos
+    # "memory": índice en memoria por worker | "postgres": pg_trgm + tsvector
+    SEARCH_BACKEND: str = "memory"
+    SEARCH_INDEX_REFRESH_SECONDS: int = 60
+    # Margen que se resta a la marca de agua del índice (transacciones largas)
+    SEARCH_INDEX_WATERMARK_OVERLAP_SECONDS: int = 300
+
+    # Caché del usuario autenticado por token (por worker, 0 = desactivada)
+    AUTH_CACHE_TTL_SECONDS: int = 30
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+
+    # Hilos dedicados a bcrypt (hash/verificación de contraseñas)
+    PASSWORD_HASH_WORKERS: int = 2
+
+    # Revocación de tokens (logout): sincronización y limpieza de vencidos
+    REVOCATION_SYNC_SECONDS: int = 30
+    REVOCATION_SWEEP_SECONDS: int = 3600
+
+    # Caché de lecturas de código de barras (por worker)
+    BARCODE_CACHE_MAX_ENTRIES: int = 5000
+    BARCODE_CACHE_TTL_SECONDS: int = 300
+
+    # Verificación de saldos acumulados de caja contra los movimientos (0 = desactivada)
+    CASH_BALANCE_RECONCILE_SECONDS: int = 900
+
+    # Exportaciones: carpeta de temporales ("" = tmp del sistema) y filas por lote
+    EXPORT_DIR: str = ""
+    EXPORT_BATCH_SIZE: int = 1000
+    # Jobs de exportación en segundo plano (pool de procesos)
+    EXPORT_JOB_WORKERS: int = 2
+    EXPORT_JOB_MAX_PENDING: int = 20
+    EXPORT_JOB_TTL_SECONDS: int = 3600
+    # Extracciones incrementales: margen que se resta a la marca de agua devuelta
+    EXPORT_WATERMARK_OVERLAP_SECONDS: int = 300
+    # Exportación Parquet (requiere pyarrow): snappy | zstd | gzip | none
+    PARQUET_COMPRESSION: str = "zstd"
+    # Filas por row group (cada mes acumula hasta este tamaño antes de escribir)
+    PARQUET_ROW_GROUP_SIZE: int = 100000
+
+    # Auditoría (movements): escritura en lote desde un hilo en segundo plano
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_QUEUE_MAX: int = 10000
+    # Espera máxima del productor con la cola llena antes de ir al respaldo
+    AUDIT_ENQUEUE_TIMEOUT_SECONDS: float = 0.05
+    AUDIT_FALLBACK_PATH: str = "logs/audit_fallback.jsonl"
+
+    # Zona horaria de la tienda: define qué es "un día" en reportes y correlativos
+    STORE_TIMEZONE: str = "America/Caracas"
     
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -0,0 +1,78 @@
+# backend/app/core/dates.py
+"""
+Rangos de fechas de negocio.
+
+Los reportes reciben días ("2026-01-31") pero las columnas guardan
+timestamps. Filtrar con `func.date(col) BETWEEN a AND b` obliga a
+calcular la fecha fila por fila (no usa índices) y además usa la zona
+horaria de la sesión de PostgreSQL. Aquí cada día se convierte en un
+rango semiabierto de timestamps en la zona de la tienda:
+
+    desde 2026-01-01 hasta 2026-01-31
+    -> col >= 2026-01-01 00:00-04:00 AND col < 2026-02-01 00:00-04:00
+
+que PostgreSQL resuelve con un range scan sobre el índice de la columna.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func
+
+from app.core.config import settings
+
+
+@lru_cache(maxsize=1)
+def store_tz() -> ZoneInfo:
+    return ZoneInfo(settings.STORE_TIMEZONE)
+
+
+def store_now() -> datetime:
+    return datetime.now(store_tz())
+
+
+def store_today() -> date:
+    """Fecha de hoy en la tienda (no la del servidor ni UTC)"""
+    return store_now().date()
+
+
+def business_day(moment: Optional[datetime]) -> date:
+    """Día de negocio de un timestamp (los naive se asumen UTC)"""
+    if moment is None:
+        return store_today()
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(store_tz()).date()
+
+
+def day_start(day: date) -> datetime:
+    """Medianoche local del día, con zona horaria"""
+    return datetime.combine(day, time.min, tzinfo=store_tz())
+
+
+def day_range(start: date, end: Optional[date] = None) -> Tuple[datetime, datetime]:
+    """[inicio de `start`, inicio del día siguiente a `end`)"""
+    end = end or start
+    return day_start(start), day_start(end + timedelta(days=1))
+
+
+def date_filters(column, start: Optional[date] = None, end: Optional[date] = None) -> List:
+    """
+    Condiciones sargables para `column` entre dos días inclusive.
+    Cualquiera de los extremos puede omitirse.
+    """
+    filters = []
+    if start:
+        filters.append(column >= day_start(start))
+    if end:
+        filters.append(column < day_start(end + timedelta(days=1)))
+    return filters
+
+
+def local_date(column):
+    """
+    Día de negocio de una columna timestamptz en SQL (para GROUP BY).
+    Para filtrar usar `date_filters`, que sí aprovecha índices.
+    """
+    return func.date(func.timezone(settings.STORE_TIMEZONE, column))
@@ -0,0 +1,244 @@
+# backend/app/core/idempotency.py
+"""
+Soporte de cabecera `Idempotency-Key` para endpoints de cobro.
+
+Las terminales POS reintentan las peticiones cuando el Wi-Fi falla. Si la
+petición trae `Idempotency-Key`, la primera ejecución guarda la respuesta;
+los reintentos con la misma clave y el mismo cuerpo reciben la respuesta
+guardada sin volver a ejecutar el checkout.
+
+Se implementa como middleware ASGI puro para poder leer el cuerpo y
+capturar la respuesta exacta (status, content-type y body).
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Pattern, Tuple
+
+from app.core.config import settings
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+MAX_KEY_LENGTH = 255
+
+DEFAULT_PATHS = (
+    r"^/api/v1/pos/sales$",
+    r"^/api/v1/pos/sales/\d+/pay$",
+    r"^/api/v1/pos/\d+/payments$",
+)
+
+
+@dataclass
+class _Entry:
+    fingerprint: bytes
+    expires_at: float
+    status: Optional[int] = None                 # None = en proceso
+    headers: List[Tuple[bytes, bytes]] = field(default_factory=list)
+    body: bytes = b""
+
+
+class IdempotencyStore:
+    """
+    Almacén en memoria de respuestas por clave, con TTL y tamaño máximo.
+    Claves y huellas se guardan como digest SHA-256 (32 bytes).
+    """
+
+    NEW = "new"
+    REPLAY = "replay"
+    CONFLICT = "conflict"
+    IN_PROGRESS = "in_progress"
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self, now: float) -> None:
+        # Las entradas más antiguas están al inicio
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[key]
+
+    def begin(self, key: bytes, fingerprint: bytes) -> Tuple[str, Optional[_Entry]]:
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self._entries[key] = _Entry(fingerprint=fingerprint, expires_at=now + self.ttl_seconds)
+                self.misses += 1
+                return self.NEW, None
+
+            if entry.fingerprint != fingerprint:
+                return self.CONFLICT, None
+
+            if entry.status is None:
+                return self.IN_PROGRESS, None
+
+            self.hits += 1
+            return self.REPLAY, entry
+
+    def complete(self, key: bytes, status: int, headers: List[Tuple[bytes, bytes]], body: bytes) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.status = status
+                entry.headers = headers
+                entry.body = body
+
+    def abandon(self, key: bytes) -> None:
+        """Libera la clave para que el cliente pueda reintentar"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+idempotency_store = IdempotencyStore(
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+)
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value
+    return None
+
+
+class IdempotencyMiddleware:
+    def __init__(
+        self,
+        app,
+        store: Optional[IdempotencyStore] = None,
+        paths: Iterable[str] = DEFAULT_PATHS,
+    ):
+        self.app = app
+        self.store = store or idempotency_store
+        self.paths: List[Pattern] = [re.compile(p) for p in paths]
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not any(p.match(scope["path"]) for p in self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        raw_key = _header(scope, IDEMPOTENCY_HEADER)
+        if not raw_key:
+            await self.app(scope, receive, send)
+            return
+
+        if len(raw_key) > MAX_KEY_LENGTH:
+            await self._send_json(send, 400, {"detail": "Idempotency-Key demasiado larga"})
+            return
+
+        # Leer el cuerpo completo para calcular la huella
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                await self.app(scope, receive, send)
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+
+        # La clave es por usuario (token) para que dos cajas no colisionen
+        auth = _header(scope, b"authorization") or b""
+        key = hashlib.sha256(auth + b"\0" + raw_key).digest()
+        fingerprint = hashlib.sha256(
+            scope["path"].encode() + b"\0" + scope.get("query_string", b"") + b"\0" + body
+        ).digest()
+
+        state, entry = self.store.begin(key, fingerprint)
+
+        if state == IdempotencyStore.REPLAY:
+            await send({
+                "type": "http.response.start",
+                "status": entry.status,
+                "headers": entry.headers + [(REPLAYED_HEADER, b"true")],
+            })
+            await send({"type": "http.response.body", "body": entry.body})
+            return
+
+        if state == IdempotencyStore.CONFLICT:
+            await self._send_json(send, 422, {
+                "detail": "Idempotency-Key ya usada con una solicitud diferente"
+            })
+            return
+
+        if state == IdempotencyStore.IN_PROGRESS:
+            await self._send_json(send, 409, {
+                "detail": "Hay una solicitud en proceso con esta Idempotency-Key"
+            })
+            return
+
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        response = {"status": 500, "headers": [], "body": []}
+        completed = False
+
+        async def capture_send(message):
+            nonlocal completed
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [
+                    (k, v) for k, v in message.get("headers", []) if k == b"content-type"
+                ]
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+                # Errores 5xx no se guardan: el cliente debe poder reintentar
+                if not message.get("more_body", False) and response["status"] < 500:
+                    self.store.complete(
+                        key, response["status"], response["headers"], b"".join(response["body"])
+                    )
+                    completed = True
+            await send(message)
+
+        # try/finally y no `except Exception`: una cancelación (cliente
+        # desconectado, asyncio.CancelledError) también debe liberar la clave,
+        # si no quedaría "en proceso" hasta que venza el TTL.
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        finally:
+            if not completed:
+                self.store.abandon(key)
+
+    @staticmethod
+    async def _send_json(send, status: int, payload: dict) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({"type": "http.response.body", "body": json.dumps(payload).encode()})
@@ -0,0 +1,107 @@
+# backend/app/core/pagination.py
+"""
+Paginación por cursor (keyset).
+
+En lugar de OFFSET (que recorre y descarta todas las filas anteriores),
+cada página continúa después de la última clave vista:
+
+    WHERE (created_at, id) < (:created_at, :id)
+    ORDER BY created_at DESC, id DESC
+    LIMIT :limit + 1
+
+El cursor es opaco para el cliente (base64 de la clave) y se devuelve en
+la cabecera `X-Next-Cursor` para no cambiar el cuerpo de las respuestas.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"uuid": str(value)}
+    return value
+
+
+def _load(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "uuid" in value:
+            return UUID(value["uuid"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_dump(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> Tuple[Any, ...]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError("tamaño de cursor inválido")
+        return tuple(_load(v) for v in values)
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido")
+
+
+def keyset_page(
+    query,
+    columns: Sequence,
+    cursor: Optional[str],
+    limit: Optional[int],
+    descending: bool = True,
+    offset: int = 0,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Aplica orden, filtro de cursor y límite a `query`.
+    Devuelve (filas, siguiente_cursor). `columns` debe identificar cada fila
+    de forma única (p. ej. created_at + id) y tener índice compuesto.
+    `offset` solo existe por compatibilidad con clientes que aún usan skip.
+
+    Sin `limit` ni `cursor` devuelve todas las filas (comportamiento
+    histórico de los listados que no paginaban).
+    """
+    order = [c.desc() if descending else c.asc() for c in columns]
+
+    if limit is None and not cursor:
+        return query.order_by(*order).all(), None
+
+    limit = limit or DEFAULT_PAGE_SIZE
+
+    if cursor:
+        after = decode_cursor(cursor, len(columns))
+        key = tuple_(*columns) if len(columns) > 1 else columns[0]
+        bound = tuple_(*after) if len(columns) > 1 else after[0]
+        query = query.filter(key < bound if descending else key > bound)
+
+    query = query.order_by(*order)
+    if offset and not cursor:
+        query = query.offset(offset)
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+
+    return rows, next_cursor
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
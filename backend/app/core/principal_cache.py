@@ -0,0 +1,91 @@
+# backend/app/core/principal_cache.py
+"""
+Caché del usuario autenticado (get_current_user).
+
+Evita consultar `users` y `revoked_tokens` en cada petición: se guarda una
+instantánea de las columnas del usuario por jti durante un TTL corto.
+En cada acierto se construye un `User` transitorio nuevo, así ninguna
+petición comparte objetos ORM con otra.
+
+Se invalida:
+- por token, en logout
+- por usuario, al eliminarlo o cambiar su contraseña
+
+El índice usuario -> tokens se poda también cuando la LRU desaloja o vence
+una entrada, para que no crezca con tokens que ya no están en caché.
+
+Es por worker: el TTL acota cuánto tarda otro worker en enterarse.
+"""
+import threading
+from typing import Any, Dict, Optional, Set
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.db.models.user import User
+
+# Columnas que no deben viajar en la instantánea
+_EXCLUDED = {"password_hash"}
+
+
+class PrincipalCache:
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.enabled = ttl_seconds > 0
+        self._cache = LRUCache(
+            max_entries=max_entries, ttl_seconds=ttl_seconds, on_evict=self._forget,
+        )
+        self._keys_by_user: Dict[int, Set[str]] = {}
+        # Reentrante: un set() dentro de put() puede desalojar y llamar a _forget
+        self._lock = threading.RLock()
+
+    def _forget(self, key: str, snapshot: Dict[str, Any]) -> None:
+        """Quita `key` del índice del usuario; borra el conjunto si queda vacío"""
+        with self._lock:
+            # Un put() concurrente pudo volver a guardar el mismo token
+            if key in self._cache:
+                return
+            keys = self._keys_by_user.get(snapshot["id"])
+            if keys is None:
+                return
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[snapshot["id"]]
+
+    def get(self, key: str) -> Optional[User]:
+        if not self.enabled:
+            return None
+        snapshot = self._cache.get(key)
+        if snapshot is None:
+            return None
+        return User(**snapshot)
+
+    def put(self, key: str, user: User) -> None:
+        if not self.enabled:
+            return
+        snapshot: Dict[str, Any] = {
+            col.name: getattr(user, col.name)
+            for col in User.__table__.columns
+            if col.name not in _EXCLUDED
+        }
+        with self._lock:
+            self._keys_by_user.setdefault(user.id, set()).add(key)
+            self._cache.set(key, snapshot)
+
+    def invalidate_token(self, key: str) -> None:
+        snapshot = self._cache.pop(key)
+        if snapshot is not None:
+            self._forget(key, snapshot)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            keys = self._keys_by_user.pop(user_id, set())
+        for key in keys:
+            self._cache.pop(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._cache.stats(), "enabled": self.enabled}
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
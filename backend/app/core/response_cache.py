@@ -0,0 +1,346 @@
+# backend/app/core/response_cache.py
+"""
+Caché de respuestas para dashboard y reportes.
+
+Clave = nombre del endpoint + generación de cada tabla de la que depende
++ rol/sucursal del usuario + parámetros de consulta. Cuando se confirma
+una transacción que escribió en `sales`, `payments`, `cash_movements`,
+etc., se incrementa la generación de esas tablas: las claves viejas dejan
+de coincidir y salen por LRU/TTL. No hace falta borrar entradas.
+
+Backends:
+- "memory": LRU por worker. Las invalidaciones solo se ven en el worker
+  que hizo la escritura, así que el TTL es RESPONSE_CACHE_LOCAL_TTL.
+- "redis": compartido entre workers (generaciones con INCR); TTL CACHE_TTL.
+  Si Redis falla se responde sin caché.
+
+Réplicas: si alguna tabla de la clave se escribió hace menos de
+DB_REPLICA_MAX_LAG_SECONDS, el valor se recalcula en el primario. Una
+réplica atrasada devolvería el resultado previo a la escritura y quedaría
+guardado bajo la generación nueva.
+
+Uso en un endpoint (`compute` recibe la sesión con la que calcular):
+
+    key = response_cache.key("dashboard:summary", SUMMARY_TABLES, current_user, request)
+    return response_cache.get_or_set(key, lambda db: calcular(db), db)
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.db.async_base import AsyncSessionLocal, async_engine
+from app.db.base import SessionLocal, engine
+
+try:
+    import redis
+except ImportError:  # dependencia opcional
+    redis = None
+
+logger = logging.getLogger("app.cache")
+
+_MISS = object()
+
+
+# ============================================================
+# BACKENDS
+# ============================================================
+class MemoryBackend:
+    name = "memory"
+    blocking = False
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self._cache = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._generations: Dict[str, int] = {}
+        self._bumped_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        value = self._cache.get(key)
+        return _MISS if value is None else value
+
+    def set(self, key: str, value: Any) -> None:
+        self._cache.set(key, value)
+
+    def generations(self, tables: Sequence[str]) -> Tuple[list, float]:
+        """Generación de cada tabla y el instante de la última escritura (epoch)"""
+        return (
+            [self._generations.get(t, 0) for t in tables],
+            max((self._bumped_at.get(t, 0.0) for t in tables), default=0.0),
+        )
+
+    def bump(self, tables: Iterable[str]) -> None:
+        now = time.time()
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+                self._bumped_at[table] = now
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+class RedisBackend:
+    name = "redis"
+    blocking = True
+
+    def __init__(self, url: str, ttl_seconds: int, prefix: str = "respcache"):
+        self._client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Any:
+        raw = self._client.get(f"{self.prefix}:v:{key}")
+        if raw is None:
+            self.misses += 1
+            return _MISS
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any) -> None:
+        self._client.setex(f"{self.prefix}:v:{key}", self.ttl_seconds, json.dumps(value))
+
+    def generations(self, tables: Sequence[str]) -> Tuple[list, float]:
+        values = self._client.mget(
+            [f"{self.prefix}:gen:{t}" for t in tables] + [f"{self.prefix}:bumped:{t}" for t in tables]
+        )
+        generations, bumped = values[:len(tables)], values[len(tables):]
+        return (
+            [int(v) if v is not None else 0 for v in generations],
+            max((float(v) for v in bumped if v is not None), default=0.0),
+        )
+
+    def bump(self, tables: Iterable[str]) -> None:
+        now = time.time()
+        pipe = self._client.pipeline()
+        for table in tables:
+            pipe.incr(f"{self.prefix}:gen:{table}")
+            pipe.set(f"{self.prefix}:bumped:{table}", now)
+        pipe.execute()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+def _build_backend():
+    if settings.RESPONSE_CACHE_BACKEND == "redis":
+        if redis is None:
+            logger.warning("RESPONSE_CACHE_BACKEND=redis pero el paquete redis no está instalado; se usa memoria")
+        else:
+            return RedisBackend(settings.REDIS_URL, ttl_seconds=settings.CACHE_TTL)
+    return MemoryBackend(
+        max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.RESPONSE_CACHE_LOCAL_TTL,
+    )
+
+
+# ============================================================
+# CACHÉ
+# ============================================================
+@dataclass(frozen=True)
+class CacheKey:
+    value: str
+    # Alguna tabla se escribió hace menos que el retraso tolerado de réplicas
+    recent_write: bool = False
+
+
+def _on_replica(db) -> bool:
+    if isinstance(db, AsyncSession):
+        return db.bind is not None and db.bind is not async_engine
+    return db.bind is not None and db.bind is not engine
+
+
+class ResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.enabled = settings.RESPONSE_CACHE_ENABLED
+        self.errors = 0
+        self.invalidations = 0
+        self.primary_reads = 0
+
+    @staticmethod
+    def scope(user) -> str:
+        """Rol y sucursal: respuestas distintas por permisos o sucursal"""
+        if user is None:
+            return "anon"
+        role = getattr(user, "role", None)
+        role = role.value if hasattr(role, "value") else role
+        return f"{role}:{getattr(user, 'branch_id', None) or 0}"
+
+    def key(
+        self,
+        name: str,
+        tables: Sequence[str],
+        user=None,
+        request=None,
+        extra: Sequence = (),
+    ) -> Optional[CacheKey]:
+        """`extra`: valores implícitos del resultado que no vienen en el request (p. ej. el día)"""
+        if not self.enabled:
+            return None
+        try:
+            generations, bumped_at = self.backend.generations(tables)
+        except Exception:
+            self.errors += 1
+            logger.exception("Caché de respuestas no disponible")
+            return None
+
+        params = sorted(request.query_params.multi_items()) if request is not None else []
+        raw = json.dumps([generations, self.scope(user), params, list(extra)], separators=(",", ":"), default=str)
+        return CacheKey(
+            value=f"{name}:{hashlib.sha256(raw.encode()).hexdigest()[:32]}",
+            recent_write=time.time() - bumped_at < settings.DB_REPLICA_MAX_LAG_SECONDS,
+        )
+
+    def get(self, key: Optional[CacheKey]) -> Any:
+        if key is None:
+            return None
+        try:
+            value = self.backend.get(key.value)
+        except Exception:
+            self.errors += 1
+            logger.exception("Error leyendo caché de respuestas")
+            return None
+        return None if value is _MISS else value
+
+    def set(self, key: Optional[CacheKey], value: Any) -> Any:
+        """Guarda la versión serializable y la devuelve"""
+        encoded = jsonable_encoder(value)
+        if key is not None:
+            try:
+                self.backend.set(key.value, encoded)
+            except Exception:
+                self.errors += 1
+                logger.exception("Error escribiendo caché de respuestas")
+        return encoded
+
+    def get_or_set(self, key: Optional[CacheKey], compute: Callable[[Session], Any], db: Session) -> Any:
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        if key is not None and key.recent_write and _on_replica(db):
+            self.primary_reads += 1
+            with SessionLocal() as primary:
+                return self.set(key, compute(primary))
+        return self.set(key, compute(db))
+
+    # ------------------------------
+    # Endpoints async
+    # ------------------------------
+    async def _call(self, fn, *args, **kwargs):
+        # Redis es síncrono: fuera del event loop
+        if self.backend.blocking:
+            return await run_in_threadpool(fn, *args, **kwargs)
+        return fn(*args, **kwargs)
+
+    async def akey(self, *args, **kwargs) -> Optional[CacheKey]:
+        return await self._call(self.key, *args, **kwargs)
+
+    async def aget_or_set(
+        self,
+        key: Optional[CacheKey],
+        compute: Callable[[Session], Any],
+        db: AsyncSession,
+    ) -> Any:
+        """Como get_or_set; `compute` es síncrono y corre con run_sync"""
+        cached = await self._call(self.get, key)
+        if cached is not None:
+            return cached
+
+        if key is not None and key.recent_write and _on_replica(db):
+            self.primary_reads += 1
+            async with AsyncSessionLocal() as primary:
+                value = await primary.run_sync(compute)
+        else:
+            value = await db.run_sync(compute)
+        return await self._call(self.set, key, value)
+
+    def invalidate_tables(self, tables: Iterable[str]) -> None:
+        tables = set(tables)
+        if not tables:
+            return
+        try:
+            self.backend.bump(tables)
+            self.invalidations += 1
+        except Exception:
+            self.errors += 1
+            logger.exception("Error invalidando caché de respuestas")
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "enabled": self.enabled,
+            "invalidations": self.invalidations,
+            "primary_reads": self.primary_reads,
+            "errors": self.errors,
+            **self.backend.stats(),
+        }
+
+
+response_cache = ResponseCache(_build_backend())
+
+
+# ============================================================
+# INVALIDACIÓN POR EVENTOS DE SESIÓN
+# ============================================================
+# Tablas cuyas escrituras invalidan respuestas cacheadas
+TRACKED_TABLES = {
+    "sales", "sale_details", "payments", "daily_sales_rollup",
+    "cash_movements", "cash_registers", "expenses",
+    "clients", "products",
+}
+
+_WRITTEN_KEY = "response_cache_written_tables"
+
+
+def _mark(session: Session, tables: Iterable[str]) -> None:
+    tracked = TRACKED_TABLES.intersection(tables)
+    if tracked:
+        session.info.setdefault(_WRITTEN_KEY, set()).update(tracked)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    _mark(session, (
+        getattr(obj, "__tablename__", None)
+        for obj in (*session.new, *session.dirty, *session.deleted)
+    ))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk(orm_execute_state) -> None:
+    # INSERT/UPDATE/DELETE en bloque (db.execute(insert(...))) no pasan por flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _mark(orm_execute_state.session, [table.name])
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    response_cache.invalidate_tables(session.info.pop(_WRITTEN_KEY, ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    session.info.pop(_WRITTEN_KEY, None)
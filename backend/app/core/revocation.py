@@ -0,0 +1,182 @@
+# backend/app/core/revocation.py
+"""
+Registro en memoria de tokens revocados (logout).
+
+Los tokens llevan `jti`; la revocación se guarda por jti en
+`revoked_tokens` con su `expires_at`. Cada worker mantiene el conjunto de
+jti revocados vigentes:
+
+- se carga completo al iniciar (`load`)
+- logout en este worker lo agrega al instante (`add`)
+- una tarea en segundo plano lee las filas nuevas de otros workers
+  (`sync`, por id) y borra las vencidas de la tabla (`sweep`)
+
+Un token vencido ya es rechazado por `jwt.decode`, así que las filas
+vencidas no aportan nada y se eliminan para que la tabla no crezca.
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+def token_jti(payload: dict, token: str) -> str:
+    """jti del token; los tokens antiguos sin jti usan sha256(token)"""
+    jti = payload.get("jti")
+    if jti:
+        return str(jti)
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _epoch(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class RevocationRegistry:
+    def __init__(self):
+        # jti -> expiración (epoch) o None si no vence
+        self._revoked: Dict[str, Optional[float]] = {}
+        self._last_id = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._revoked
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def add(self, jti: str, expires_at: Optional[datetime]) -> None:
+        with self._lock:
+            self._revoked[jti] = _epoch(expires_at)
+
+    # ------------------------------------------------------------
+    # Sincronización con la BD
+    # ------------------------------------------------------------
+    def load(self, db: Session) -> None:
+        now = datetime.now(timezone.utc)
+        rows = db.execute(
+            select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+            .where((RevokedToken.expires_at.is_(None)) | (RevokedToken.expires_at > now))
+        ).all()
+
+        last_id = db.scalar(select(func.max(RevokedToken.id))) or 0
+
+        with self._lock:
+            self._revoked = {jti: _epoch(expires_at) for _, jti, expires_at in rows}
+            self._last_id = last_id
+            self._loaded = True
+
+        logger.info("Tokens revocados cargados: %s", len(self._revoked))
+
+    def sync(self, db: Session) -> int:
+        rows = db.execute(
+            select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+            .where(RevokedToken.id > self._last_id)
+            .order_by(RevokedToken.id)
+        ).all()
+
+        with self._lock:
+            for row_id, jti, expires_at in rows:
+                self._revoked[jti] = _epoch(expires_at)
+                self._last_id = max(self._last_id, row_id)
+        return len(rows)
+
+    def sweep(self, db: Session) -> int:
+        """Borra revocaciones vencidas de la tabla y de memoria"""
+        result = db.execute(
+            delete(RevokedToken).where(RevokedToken.expires_at < func.now())
+        )
+        db.commit()
+
+        now = time.time()
+        with self._lock:
+            self._revoked = {
+                jti: exp for jti, exp in self._revoked.items()
+                if exp is None or exp > now
+            }
+        return result.rowcount or 0
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "revoked": len(self._revoked),
+            "last_id": self._last_id,
+        }
+
+
+revocation_registry = RevocationRegistry()
+
+
+def revoke_token(db: Session, jti: str, expires_at: Optional[datetime]) -> None:
+    """Registra la revocación (idempotente) y la aplica en este worker"""
+    db.execute(
+        pg_insert(RevokedToken)
+        .values(jti=jti, expires_at=expires_at)
+        .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+    )
+    db.commit()
+    revocation_registry.add(jti, expires_at)
+
+
+# ============================================================
+# TAREA EN SEGUNDO PLANO
+# ============================================================
+def _load_registry() -> None:
+    db = SessionLocal()
+    try:
+        revocation_registry.load(db)
+    finally:
+        db.close()
+
+
+def _sync_registry(sweep: bool) -> None:
+    db = SessionLocal()
+    try:
+        revocation_registry.sync(db)
+        if sweep:
+            deleted = revocation_registry.sweep(db)
+            if deleted:
+                logger.info("Revocaciones vencidas eliminadas: %s", deleted)
+    finally:
+        db.close()
+
+
+async def revocation_worker() -> None:
+    """Carga el registro y lo mantiene sincronizado mientras corre la app"""
+    loop = asyncio.get_running_loop()
+    last_sweep = 0.0
+
+    while True:
+        try:
+            if not revocation_registry.loaded:
+                await loop.run_in_executor(None, _load_registry)
+            else:
+                sweep = time.monotonic() - last_sweep >= settings.REVOCATION_SWEEP_SECONDS
+                await loop.run_in_executor(None, _sync_registry, sweep)
+                if sweep:
+                    last_sweep = time.monotonic()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Error sincronizando tokens revocados")
+
+        await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
@@ -1,15 +1,22 @@
 # backend/app/core/security.py
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
+from uuid import uuid4
 from jose import jwt, JWTError
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.db.models.user import User
-from app.db.base import SessionLocal
+from app.db.base import get_db
 import os
 import logging
 from app.db import models
+from app.core.principal_cache import principal_cache
+from app.core.revocation import revocation_registry, token_jti
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -29,15 +36,69 @@ oauth2_scheme = OAuth2PasswordBearer(
 # ==============================
 # 🔑 FUNCIONES DE CONTRASEÑA (bcrypt)
 # ==============================
-def get_password_hash(password: str) -> str:
-    """Hashea contraseña usando bcrypt compatible con Python 3.12"""
+# bcrypt cuesta ~250 ms de CPU por llamada. Se ejecuta en un pool de
+# tamaño fijo para que una ráfaga de logins (cambio de turno) no ocupe
+# todos los hilos del worker; las peticiones extra esperan en cola.
+class _PasswordPool:
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.completed = 0
+
+    def _done(self, _future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            self._in_flight += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - self.max_workers),
+                "completed": self.completed,
+            }
+
+
+password_pool = _PasswordPool(max_workers=settings.PASSWORD_HASH_WORKERS)
+
+
+def _hash(password: str) -> str:
     hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
     return hashed.decode("utf-8")
 
 
+def _check(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+def get_password_hash(password: str) -> str:
+    """Hashea contraseña usando bcrypt compatible con Python 3.12"""
+    return password_pool.submit(_hash, password).result()
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica si la contraseña coincide"""
-    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+    return password_pool.submit(_check, plain_password, hashed_password).result()
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Igual que get_password_hash, sin bloquear el event loop"""
+    return await asyncio.wrap_future(password_pool.submit(_hash, password))
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Igual que verify_password, sin bloquear el event loop"""
+    return await asyncio.wrap_future(password_pool.submit(_check, plain_password, hashed_password))
 
 
 # ==============================
@@ -47,23 +108,11 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     """Genera un token JWT con expiración"""
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
-# ==============================
-# 🧩 DEPENDENCIA DE BASE DE DATOS
-# ==============================
-def get_db():
-    """Obtiene sesión de BD"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 # ==============================
 # 👤 USUARIO ACTUAL DESDE TOKEN
 # ==============================
@@ -85,6 +134,18 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
+    jti = token_jti(payload, token)
+
+    # -----------------------
+    # REVOCACIÓN EN MEMORIA + CACHÉ DE USUARIO (sin consultas)
+    # -----------------------
+    if revocation_registry.is_revoked(jti):
+        raise credentials_exception
+
+    cached = principal_cache.get(jti)
+    if cached is not None:
+        return cached
+
     user = db.query(User).filter(
         User.email == email,
         User.is_active == True
@@ -94,19 +155,22 @@ def get_current_user(
         raise credentials_exception
 
     # -----------------------
-    # REVOCACIÓN DE TOKEN
+    # REVOCACIÓN DE TOKEN (revocaciones de otros workers aún no sincronizadas)
     # -----------------------
     try:
         from app.db.models.revoked_token import RevokedToken
-        revoked = db.query(RevokedToken).filter(
-            RevokedToken.token == token
+        revoked = db.query(RevokedToken.id).filter(
+            RevokedToken.jti == jti
         ).first()
-        if revoked:
-            raise credentials_exception
     except Exception:
         # Si la tabla no existe aún, no rompemos la app
-        pass
+        db.rollback()
+        revoked = None
+
+    if revoked:
+        raise credentials_exception
 
+    principal_cache.put(jti, user)
     return user
 
 # ==============================
@@ -1,8 +1,9 @@
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional, Tuple
 from app.db.models.movement import Movement, MovementType
 from app.db.schemas.movement import MovementCreate
 from datetime import datetime
+from app.core.pagination import keyset_page
 
 
 def create_movement(db: Session, data: MovementCreate) -> Movement:
@@ -15,22 +16,33 @@ def create_movement(db: Session, data: MovementCreate) -> Movement:
 
 def get_movements(
     db: Session,
-    skip: int,
     limit: int,
     movement_type: MovementType | None,
     user_id: int | None,
     branch_id: int,
     date_from: datetime | None,
     date_to: datetime | None,
-):
+    cursor: Optional[str] = None,
+    skip: int = 0,
+) -> Tuple[List[Movement], Optional[str]]:
 
     query = db.query(Movement)
 
-    if type:
-        query = query.filter(Movement.type == type)
+    if movement_type:
+        query = query.filter(Movement.type == movement_type)
     if user_id:
         query = query.filter(Movement.user_id == user_id)
     if branch_id:
         query = query.filter(Movement.branch_id == branch_id)
+    if date_from:
+        query = query.filter(Movement.created_at >= date_from)
+    if date_to:
+        query = query.filter(Movement.created_at <= date_to)
 
-    return query.order_by(Movement.created_at.desc()).offset(skip).limit(limit).all()
+    return keyset_page(
+        query,
+        [Movement.created_at, Movement.id],
+        cursor,
+        limit,
+        offset=skip,
+    )
@@ -0,0 +1,57 @@
+# app/db/async_base.py
+"""
+Pila asíncrona de base de datos (asyncpg), junto a la síncrona de base.py.
+
+Los módulos migran de a uno: un endpoint `async def` usa `get_async_db`
+y puede reutilizar los servicios síncronos existentes con
+
+    await db.run_sync(servicio, arg1, arg2)
+
+que ejecuta el servicio con una `Session` normal sobre la misma conexión
+asyncpg, sin ocupar un hilo del threadpool. Los callbacks post-commit
+(app.db.hooks) siguen funcionando porque escuchan en `Session`.
+"""
+from typing import AsyncIterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.base import DATABASE_URL, application_name, pool_options
+from app.db.pool_stats import TimedAsyncAdaptedQueuePool
+
+
+def to_async_url(url: str) -> str:
+    """postgresql:// o postgresql+psycopg2:// -> postgresql+asyncpg://"""
+    scheme, _, rest = url.partition("://")
+    return f"postgresql+asyncpg://{rest}" if scheme.startswith("postgresql") else url
+
+
+def create_async_db_engine(url: str = DATABASE_URL, **overrides) -> AsyncEngine:
+    """Engine asyncpg con las mismas opciones de pool que el síncrono"""
+    options = {**pool_options(), "poolclass": TimedAsyncAdaptedQueuePool, **overrides}
+    db_engine = create_async_engine(to_async_url(url), **options)
+
+    @event.listens_for(db_engine.sync_engine, "do_connect")
+    def _connect_params(dialect, conn_rec, cargs, cparams):
+        server_settings = cparams.setdefault("server_settings", {})
+        server_settings["application_name"] = application_name()
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+
+    return db_engine
+
+
+async_engine = create_async_db_engine()
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
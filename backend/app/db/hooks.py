@@ -0,0 +1,39 @@
+# backend/app/db/hooks.py
+"""
+Callbacks que deben ejecutarse solo si la transacción se confirma
+(actualizar índices/cachés en memoria, invalidaciones, etc.).
+
+    run_after_commit(db, lambda: index.update_stock(nuevos))
+
+Si la transacción hace rollback, los callbacks pendientes se descartan.
+"""
+import logging
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_CALLBACKS_KEY = "after_commit_callbacks"
+
+
+def run_after_commit(db: Session, callback: Callable[[], None]) -> None:
+    if not db.in_transaction():
+        callback()
+        return
+    db.info.setdefault(_CALLBACKS_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_callbacks(session: Session) -> None:
+    for callback in session.info.pop(_CALLBACKS_KEY, []):
+        try:
+            callback()
+        except Exception:
+            logger.exception("Error ejecutando callback post-commit")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_callbacks(session: Session) -> None:
+    session.info.pop(_CALLBACKS_KEY, None)
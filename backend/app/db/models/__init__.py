@@ -7,9 +7,12 @@ from app.db.models.sale_detail import SaleDetail
 from app.db.models.payment import Payment
 from app.db.models.revoked_token import RevokedToken
 from app.db.models.exchange_rate import ExchangeRate
-from app.db.models.cash_movement import CashMovement, MovementType
+from app.db.models.cash_movement import CashMovement, MovementType, MovementStatus, MovementOrigin
 from app.db.models.expense import Expense
 from app.db.models.provider import Provider 
 from app.db.models.cash_register import CashRegister
+from app.db.models.cash_register_balance import CashRegisterBalance
+from app.db.models.document_sequence import DocumentSequence
+from app.db.models.daily_sales_rollup import DailySalesRollup
 
-__all__ = ["User", "Client", "Product", "Sale", "SaleDetail", "Payment", "RevokedToken", "ExchangeRate", "CashMovement", "Expense", "Provider", "CashRegister"]
\ No newline at end of file
+__all__ = ["User", "Client", "Product", "Sale", "SaleDetail", "Payment", "RevokedToken", "ExchangeRate", "CashMovement", "MovementType", "MovementStatus", "MovementOrigin", "Expense", "Provider", "CashRegister", "CashRegisterBalance", "DocumentSequence", "DailySalesRollup"]
\ No newline at end of file
@@ -9,12 +9,32 @@ class MovementType(str, enum.Enum):
     INGRESO = "INGRESO"
     EGRESO = "EGRESO"
 
+class MovementStatus(str, enum.Enum):
+    CONFIRMADO = "CONFIRMADO"
+    ANULADO = "ANULADO"
+
+class MovementOrigin(str, enum.Enum):
+    VENTA = "VENTA"
+    PROVEEDOR = "PROVEEDOR"
+    NOMINA = "NOMINA"
+    SERVICIO = "SERVICIO"
+    COMPRA_MATERIA_PRIMA = "COMPRA_MATERIA_PRIMA"
+    AJUSTE = "AJUSTE"
+    OTRO = "OTRO"
+
 class CashMovement(Base):
     __tablename__ = "cash_movements"
 
     id = Column(Integer, primary_key=True)
 
     type = Column(SQLEnum(MovementType), nullable=False)
+    origin = Column(SQLEnum(MovementOrigin, native_enum=False, length=30), nullable=True)
+    status = Column(
+        SQLEnum(MovementStatus, native_enum=False, length=20),
+        nullable=False,
+        default=MovementStatus.CONFIRMADO,
+        server_default=MovementStatus.CONFIRMADO.value,
+    )
 
     amount_usd = Column(Float, nullable=False)
     amount = Column(Numeric(12, 2), nullable=False)
@@ -24,9 +44,19 @@ class CashMovement(Base):
 
     payment_id = Column(Integer, ForeignKey("payments.id"))
     description = Column(String(500), nullable=False)
+    category = Column(String(100), nullable=True)
+    notes = Column(String(500), nullable=True)
+
+    # Venta / egreso que originó el movimiento
+    reference_id = Column(String(50), nullable=True)
+    reference_code = Column(String(50), nullable=True)
 
     created_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_by_name = Column(String(255), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Fecha contable (la que usan los reportes de flujo de caja)
+    accounting_date = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     cash_register_id = Column(
         Integer,
@@ -37,6 +67,9 @@ class CashMovement(Base):
         Index("idx_cash_created_at", "created_at"),
         Index("idx_cash_type", "type"),
         Index("idx_cash_method", "payment_method"),
+        # Reportes: status = CONFIRMADO AND accounting_date en [desde, hasta)
+        Index("idx_cash_status_accounting_date", "status", "accounting_date"),
+        Index("idx_cash_updated_at", "updated_at"),
     )
 
     # Relaciones
@@ -0,0 +1,27 @@
+# backend/app/db/models/cash_register_balance.py
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class CashRegisterBalance(Base):
+    """
+    Totales acumulados de cada caja por método de pago.
+    Se actualizan por deltas en la misma transacción que inserta (o anula)
+    el movimiento; el cierre y el estado de caja leen estas filas en vez
+    de sumar todos los movimientos del turno.
+    """
+    __tablename__ = "cash_register_balances"
+
+    cash_register_id = Column(
+        Integer,
+        ForeignKey("cash_registers.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    payment_method = Column(String(50), primary_key=True)
+
+    income_usd = Column(Numeric(14, 2), nullable=False, default=0)
+    expense_usd = Column(Numeric(14, 2), nullable=False, default=0)
+    movements_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
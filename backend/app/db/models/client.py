@@ -0,0 +1,36 @@
+# backend/app/db/models/client.py
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class Client(Base):
+    __tablename__ = "clients"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(255), nullable=False)
+    document = Column(String(64), nullable=True, unique=True)
+    email = Column(String(255), nullable=True)
+    phone = Column(String(64), nullable=True)
+    address = Column(String(255), nullable=True)
+    credit_limit = Column(Float, default=0.0)
+    balance = Column(Float, default=0.0)
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Búsqueda de clientes: full-text en español + trigramas
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('spanish', coalesce(name, '') || ' ' || coalesce(document, '') || ' ' || coalesce(phone, ''))",
+            persisted=True,
+        ),
+    )
+
+    __table_args__ = (
+        Index("idx_clients_search_vector", "search_vector", postgresql_using="gin"),
+        Index("idx_clients_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("idx_clients_document_trgm", "document", postgresql_using="gin", postgresql_ops={"document": "gin_trgm_ops"}),
+        Index("idx_clients_phone_trgm", "phone", postgresql_using="gin", postgresql_ops={"phone": "gin_trgm_ops"}),
+    )
@@ -0,0 +1,26 @@
+# backend/app/db/models/daily_sales_rollup.py
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class DailySalesRollup(Base):
+    """
+    Totales de ventas por día, sucursal, estado y vendedor.
+    Se actualiza por deltas en la misma transacción que el checkout, los
+    abonos y las anulaciones; el dashboard lee unas pocas filas en vez de
+    agregar toda la tabla de ventas.
+    """
+    __tablename__ = "daily_sales_rollup"
+
+    day = Column(Date, primary_key=True)
+    branch_id = Column(Integer, primary_key=True, default=0)  # 0 = sin sucursal
+    status = Column(String(50), primary_key=True)
+    seller_id = Column(Integer, primary_key=True, default=0)  # 0 = sin vendedor
+
+    sales_count = Column(Integer, nullable=False, default=0)
+    total_usd = Column(Float, nullable=False, default=0.0)
+    paid_usd = Column(Float, nullable=False, default=0.0)
+    balance_usd = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,19 @@
+# backend/app/db/models/document_sequence.py
+from sqlalchemy import Column, Integer, String, Date, DateTime
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class DocumentSequence(Base):
+    """
+    Contador por tipo de documento, sucursal y día.
+    Reemplaza el COUNT(*) / FOR UPDATE sobre la tabla de ventas o egresos
+    para generar correlativos (VTA-, VENTA-, EGRESO-).
+    """
+    __tablename__ = "document_sequences"
+
+    prefix = Column(String(20), primary_key=True)
+    branch_id = Column(Integer, primary_key=True, default=0)  # 0 = sin sucursal
+    day = Column(Date, primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
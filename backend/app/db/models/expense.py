@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -36,5 +36,10 @@ class Expense(Base):
     created_by_name = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Reportes por rango de fechas
+        Index("idx_expenses_created_at", "created_at"),
+    )
+
     # Relaciones
     provider = relationship("Provider")
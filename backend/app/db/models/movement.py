@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, Column, Text, String, Enum, DateTime, Numeric, ForeignKey, JSON
+from sqlalchemy import Integer, Column, Text, String, Enum, DateTime, Numeric, ForeignKey, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 import uuid
@@ -41,4 +41,10 @@ class Movement(Base):
     branch_id = Column(UUID(as_uuid=True), nullable=True)  # ✅ SIN FK
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Paginación por cursor (created_at, id)
+        Index("idx_movements_created_at_id", "created_at", "id"),
+    )
+
     user = relationship("User", back_populates="movements")
\ No newline at end of file
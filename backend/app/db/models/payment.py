@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from typing import Optional
@@ -34,6 +34,11 @@ class Payment(Base):
     # Auditoría
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Extracciones por rango / incrementales
+        Index("idx_payments_created_at", "created_at"),
+    )
+
     # Relaciones
     sale = relationship("Sale", back_populates="payments")
     cash_movement = relationship("CashMovement", uselist=False, back_populates="payment")
@@ -1,5 +1,6 @@
 # backend/app/db/models/product.py
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.sql import func
 from app.db.base import Base
 
@@ -20,3 +21,18 @@ class Product(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Búsqueda en BD (SEARCH_BACKEND=postgres): full-text en español + trigramas
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('spanish', coalesce(code, '') || ' ' || coalesce(name, '') || ' ' || coalesce(category, ''))",
+            persisted=True,
+        ),
+    )
+
+    __table_args__ = (
+        Index("idx_products_search_vector", "search_vector", postgresql_using="gin"),
+        Index("idx_products_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("idx_products_code_trgm", "code", postgresql_using="gin", postgresql_ops={"code": "gin_trgm_ops"}),
+    )
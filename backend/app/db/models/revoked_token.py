@@ -7,6 +7,7 @@ class RevokedToken(Base):
     __tablename__ = "revoked_tokens"
 
     id = Column(Integer, primary_key=True, index=True)
-    token = Column(String(2000), unique=True, nullable=False, index=True)
-    expires_at = Column(DateTime(timezone=True), nullable=True)
+    # jti del JWT (tokens antiguos sin jti: sha256 hex del token completo)
+    jti = Column(String(64), unique=True, nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
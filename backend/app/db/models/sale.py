@@ -1,5 +1,5 @@
 # backend/app/db/models/sale.py
-from sqlalchemy import Column, Integer,Enum, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer,Enum, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import Base
@@ -33,7 +33,16 @@ class Sale(Base):
     note = Column(String(500), nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Paginación por cursor (created_at, id)
+        Index("idx_sales_created_at_id", "created_at", "id"),
+        # Reportes por estado y rango de fechas
+        Index("idx_sales_status_created_at", "status", "created_at"),
+        # Extracciones incrementales (updated_since)
+        Index("idx_sales_updated_at", "updated_at"),
+    )
 
     # Relaciones
     client = relationship("Client", backref="sales")
@@ -0,0 +1,205 @@
+# app/db/routing.py
+"""
+Enrutamiento de lecturas a réplicas.
+
+Los endpoints de solo lectura pesados (dashboard, reportes, exportaciones,
+búsqueda) dependen de `get_read_db` / `get_read_async_db` en lugar de
+`get_db`; las escrituras (pos, clientes, productos, caja) siguen en el
+primario.
+
+- Réplicas desde `DB_REPLICA_URLS` (separadas por coma). Sin réplicas,
+  todo va al primario.
+- Cada DB_REPLICA_LAG_CHECK_SECONDS se mide el retraso de cada réplica
+  (`now() - pg_last_xact_replay_timestamp()`). Si supera
+  DB_REPLICA_MAX_LAG_SECONDS o no responde, se deja de usar hasta la
+  siguiente medición.
+- La medición la hace `replica_lag_worker` (lifespan), fuera del camino
+  de los requests. En procesos sin lifespan (jobs de exportación) se
+  mide en línea, una sola a la vez: los demás usan el último estado.
+  La conexión de la réplica espera como mucho DB_REPLICA_CONNECT_TIMEOUT_SECONDS.
+- Entre las réplicas sanas se reparte en round-robin.
+"""
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterator, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.base import SessionLocal, create_db_engine
+from app.db.async_base import AsyncSessionLocal, create_async_db_engine
+
+logger = logging.getLogger(__name__)
+
+# En el primario pg_is_in_recovery() es falso: retraso 0.
+# En una réplica sin tráfico nuevo las LSN coinciden: retraso 0.
+LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+@dataclass
+class Replica:
+    name: str
+    engine: Engine
+    async_engine: AsyncEngine
+    session_factory: sessionmaker
+    async_session_factory: async_sessionmaker
+    lag_seconds: Optional[float] = None
+    healthy: bool = False
+    checked_at: float = field(default=0.0)
+
+
+def _replica_urls() -> List[str]:
+    return [url.strip() for url in settings.DB_REPLICA_URLS.split(",") if url.strip()]
+
+
+class ReadRouter:
+    def __init__(self, urls: List[str]):
+        self.replicas: List[Replica] = []
+        timeout = settings.DB_REPLICA_CONNECT_TIMEOUT_SECONDS
+        for i, url in enumerate(urls):
+            engine = create_db_engine(url, connect_args={"connect_timeout": timeout})
+            async_engine = create_async_db_engine(url, connect_args={"timeout": timeout})
+            self.replicas.append(Replica(
+                name=f"replica-{i}",
+                engine=engine,
+                async_engine=async_engine,
+                session_factory=sessionmaker(autocommit=False, autoflush=False, bind=engine),
+                async_session_factory=async_sessionmaker(
+                    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False,
+                ),
+            ))
+        self._cycle = itertools.cycle(range(len(self.replicas))) if self.replicas else None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.primary_fallbacks = 0
+        # True mientras replica_lag_worker mide en segundo plano
+        self.background = False
+
+    # ------------------------------------------------------------
+    # Medición de retraso
+    # ------------------------------------------------------------
+    def _check(self, replica: Replica) -> None:
+        try:
+            with replica.engine.connect() as conn:
+                replica.lag_seconds = float(conn.execute(LAG_SQL).scalar() or 0)
+            replica.healthy = replica.lag_seconds <= settings.DB_REPLICA_MAX_LAG_SECONDS
+        except Exception as e:
+            logger.warning("Réplica %s no disponible: %s", replica.name, e)
+            replica.lag_seconds = None
+            replica.healthy = False
+        replica.checked_at = time.monotonic()
+
+    def needs_refresh(self) -> bool:
+        if self.background:
+            return False
+        now = time.monotonic()
+        return any(
+            now - r.checked_at >= settings.DB_REPLICA_LAG_CHECK_SECONDS for r in self.replicas
+        )
+
+    def refresh(self, force: bool = False) -> None:
+        # Una sola medición a la vez: si otro hilo ya está midiendo, no esperar
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            now = time.monotonic()
+            for replica in self.replicas:
+                if force or now - replica.checked_at >= settings.DB_REPLICA_LAG_CHECK_SECONDS:
+                    self._check(replica)
+        finally:
+            self._refresh_lock.release()
+
+    # ------------------------------------------------------------
+    # Selección
+    # ------------------------------------------------------------
+    def pick(self) -> Optional[Replica]:
+        """Siguiente réplica sana, o None para usar el primario"""
+        if not self.replicas:
+            return None
+        with self._lock:
+            for _ in range(len(self.replicas)):
+                replica = self.replicas[next(self._cycle)]
+                if replica.healthy:
+                    return replica
+            self.primary_fallbacks += 1
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "replicas": [
+                {
+                    "name": r.name,
+                    "healthy": r.healthy,
+                    "lag_seconds": r.lag_seconds,
+                    "pool": r.engine.pool.stats.snapshot(r.engine.pool),
+                }
+                for r in self.replicas
+            ],
+            "max_lag_seconds": settings.DB_REPLICA_MAX_LAG_SECONDS,
+            "primary_fallbacks": self.primary_fallbacks,
+        }
+
+
+read_router = ReadRouter(_replica_urls())
+
+
+async def replica_lag_worker() -> None:
+    """Mide el retraso de las réplicas mientras corre la app"""
+    read_router.background = True
+    try:
+        while True:
+            try:
+                await run_in_threadpool(read_router.refresh, True)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Error midiendo retraso de réplicas")
+
+            await asyncio.sleep(settings.DB_REPLICA_LAG_CHECK_SECONDS)
+    finally:
+        read_router.background = False
+
+
+# ==============================
+# 🧩 DEPENDENCIAS DE LECTURA
+# ==============================
+def open_read_session() -> Session:
+    """Sesión de solo lectura: réplica sana o, si no hay, el primario (el llamador la cierra)"""
+    if read_router.needs_refresh():
+        read_router.refresh()
+
+    replica = read_router.pick()
+    return replica.session_factory() if replica else SessionLocal()
+
+
+def get_read_db() -> Iterator[Session]:
+    """Sesión de solo lectura: réplica sana o, si no hay, el primario"""
+    db = open_read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_read_async_db() -> AsyncIterator[AsyncSession]:
+    if read_router.needs_refresh():
+        await run_in_threadpool(read_router.refresh)
+
+    replica = read_router.pick()
+    factory = replica.async_session_factory if replica else AsyncSessionLocal
+    async with factory() as db:
+        yield db
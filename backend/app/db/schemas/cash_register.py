@@ -11,7 +11,8 @@ class CashRegisterOpen(BaseModel):
 
 
 class CashRegisterClose(BaseModel):
-    counted_amount: Decimal = Field(..., ge=0)
+    # Mismo criterio que system_amount: USD
+    counted_amount: Decimal = Field(..., ge=0, description="Monto contado al cierre, en USD")
     notes: Optional[str] = None
 
 
@@ -20,8 +21,10 @@ class CashRegisterOut(BaseModel):
 
     opening_amount: Decimal
     closing_amount: Optional[Decimal]
-    system_amount: Optional[Decimal]
-    difference: Optional[Decimal]
+    system_amount: Optional[Decimal] = Field(
+        description="Ingresos - egresos CONFIRMADOS de la caja en USD (amount_usd); excluye anulados"
+    )
+    difference: Optional[Decimal] = Field(description="counted_amount - system_amount, en USD")
 
     expected_amount_usd: Optional[Decimal]
     notes: Optional[str]
@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from datetime import date
+from typing import Literal, Optional
+
+
+class ExportJobCreate(BaseModel):
+    format: Literal["xlsx", "pdf", "csv"] = "xlsx"
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    # xlsx: incluir hojas de detalle | csv: dataset a exportar
+    detail: bool = True
+    dataset: Literal["sales", "expenses", "cash_movements"] = "sales"
+    force: bool = Field(False, description="Generar de nuevo aunque exista un resultado igual")
+
+
+class ExportJobOut(BaseModel):
+    id: str
+    status: str
+    params: dict
+    cached: bool = False
+    rows_done: int = 0
+    rows_total: int = 0
+    percent: float = 0.0
+    error: Optional[str] = None
+    size_bytes: Optional[int] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    expires_at: Optional[float] = None
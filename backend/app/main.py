@@ -1,15 +1,24 @@
 from fastapi import FastAPI, Request
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+import asyncio
 import logging
 
 from seed import seed_admin
 
-from app.db.base import Base, engine
+from app.db.base import Base, engine, application_name
+from app.db.async_base import async_engine
+from app.db.routing import read_router, replica_lag_worker
 from app.core.config import settings
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.revocation import revocation_worker
+from app.services.cash_balance_service import reconcile_worker
+from app.services.export_jobs import export_jobs
+from app.services.audit_writer import audit_writer
 
 # Routers API v1 (IMPORTS LIMPIOS Y REALES)
 from app.api.v1 import (
@@ -43,9 +52,23 @@ limiter = Limiter(key_func=get_remote_address)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("🟢 Iniciando servidor...")
-    seed_admin()
+    await run_in_threadpool(seed_admin)
+    audit_writer.start()
+    tasks = [asyncio.create_task(revocation_worker())]
+    if read_router.replicas:
+        tasks.append(asyncio.create_task(replica_lag_worker()))
+    if settings.CASH_BALANCE_RECONCILE_SECONDS > 0:
+        tasks.append(asyncio.create_task(reconcile_worker()))
     yield
     logger.info("🔴 Apagando servidor...")
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    export_jobs.shutdown()
+    # Vacía la cola de auditoría antes de cerrar el pool
+    await run_in_threadpool(audit_writer.stop)
+    await async_engine.dispose()
 
 # Crear app
 app = FastAPI(
@@ -59,6 +82,10 @@ app = FastAPI(
 # MIDDLEWARE
 # ==========================================
 
+# Idempotency-Key para ventas y pagos (antes de CORS para que las
+# respuestas repetidas también lleven las cabeceras CORS)
+app.add_middleware(IdempotencyMiddleware)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -66,6 +93,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.state.limiter = limiter
@@ -152,6 +180,21 @@ def root():
         "docs": "/docs"
     }
 
+@app.get("/health/db-pool", tags=["📋 Health"])
+def db_pool_stats():
+    """Checkouts, esperas y ocupación de los pools de conexiones de este worker"""
+    return {
+        "application_name": application_name(),
+        "sync": engine.pool.stats.snapshot(engine.pool),
+        "async": async_engine.sync_engine.pool.stats.snapshot(async_engine.sync_engine.pool),
+        "read_replicas": read_router.stats(),
+    }
+
+@app.get("/health/audit-writer", tags=["📋 Health"])
+def audit_writer_stats():
+    """Cola, lotes escritos y respaldo del registro de auditoría de este worker"""
+    return audit_writer.stats()
+
 @app.get("/health", tags=["📋 Health"])
 def health_check():
     return {
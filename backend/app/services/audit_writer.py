@@ -0,0 +1,314 @@
+# backend/app/services/audit_writer.py
+"""
+Escritura en lote del registro de auditoría (`movements`).
+
+`create_movement` ya no hace commit por evento: arma la fila y la encola.
+Un hilo en segundo plano junta hasta AUDIT_BATCH_SIZE filas (o lo que
+haya cada AUDIT_FLUSH_INTERVAL_SECONDS) y las inserta con un único
+INSERT multi-fila en su propia transacción.
+
+- Contrapresión: la cola tiene AUDIT_QUEUE_MAX lugares. Si está llena, el
+  productor espera hasta AUDIT_ENQUEUE_TIMEOUT_SECONDS y, si sigue llena,
+  la fila va directo al archivo de respaldo.
+- Respaldo durable: si el INSERT falla (BD caída, etc.) el lote se agrega
+  a AUDIT_FALLBACK_PATH (JSONL, con fsync). Al arrancar y tras cada
+  escritura exitosa se reintenta cargar ese archivo. Varios workers
+  comparten el archivo: se protege con un lock de archivo (flock).
+- Una fila que la BD rechaza (o una línea ilegible) no bloquea el resto
+  del respaldo: se aparta en `<AUDIT_FALLBACK_PATH>.dead`.
+- Al apagar (`stop`) se vacía la cola antes de terminar.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError, OperationalError
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo lock entre hilos
+    fcntl = None
+
+from app.core.config import settings
+from app.db.base import engine
+from app.db.models.movement import Movement
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+# ============================================================
+# SERIALIZACIÓN DEL RESPALDO
+# ============================================================
+def _dump(row: dict) -> str:
+    return json.dumps(row, default=str, ensure_ascii=False)
+
+
+def _load(line: str) -> dict:
+    row = json.loads(line)
+    if row.get("id"):
+        row["id"] = uuid.UUID(row["id"])
+    if row.get("entity_id"):
+        row["entity_id"] = uuid.UUID(row["entity_id"])
+    if row.get("branch_id"):
+        row["branch_id"] = uuid.UUID(row["branch_id"])
+    if row.get("created_at"):
+        row["created_at"] = datetime.fromisoformat(row["created_at"])
+    for key in ("amount_usd", "quantity", "amount"):
+        if row.get(key) is not None:
+            row[key] = Decimal(row[key])
+    return row
+
+
+class AuditWriter:
+    def __init__(self):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=settings.AUDIT_QUEUE_MAX)
+        self._thread: Optional[threading.Thread] = None
+        self._fallback_lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.fallback_rows = 0     # filas enviadas al respaldo desde el arranque
+        self.dead_rows = 0
+        self._fallback_pending = os.path.exists(settings.AUDIT_FALLBACK_PATH)
+
+    # ------------------------------
+    # Productores
+    # ------------------------------
+    def enqueue(self, row: dict) -> None:
+        if not self.running:
+            # Sin hilo (scripts, tests, apagado): escritura directa
+            self._write([row])
+            return
+        try:
+            self._queue.put(row, timeout=settings.AUDIT_ENQUEUE_TIMEOUT_SECONDS)
+            self.enqueued += 1
+        except queue.Full:
+            logger.warning("Cola de auditoría llena; evento enviado al respaldo")
+            self._to_fallback([row])
+
+    # ------------------------------
+    # Ciclo de vida
+    # ------------------------------
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Vacía la cola y detiene el hilo"""
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    # ------------------------------
+    # Hilo escritor
+    # ------------------------------
+    def _run(self) -> None:
+        self._replay_safely()
+        batch: List[dict] = []
+        deadline = time.monotonic() + settings.AUDIT_FLUSH_INTERVAL_SECONDS
+
+        # Ningún error puede terminar el hilo: lo encolado se perdería
+        while True:
+            try:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    item = None
+
+                if item is _STOP:
+                    break
+                if item is not None:
+                    batch.append(item)
+
+                if len(batch) >= settings.AUDIT_BATCH_SIZE or time.monotonic() >= deadline:
+                    pending, batch = batch, []
+                    deadline = time.monotonic() + settings.AUDIT_FLUSH_INTERVAL_SECONDS
+                    self._flush(pending)
+            except Exception:
+                logger.exception("Error en el escritor de auditoría")
+
+        self._flush(batch)
+
+    def _flush(self, batch: List[dict]) -> None:
+        if not batch:
+            return
+        if self._write(batch) and self._fallback_pending:
+            # La BD volvió: cargar lo que quedó en el respaldo
+            self._replay_safely()
+
+    def _replay_safely(self) -> None:
+        try:
+            self.replay_fallback()
+        except Exception:
+            logger.exception("Error recuperando el respaldo de auditoría")
+
+    def _write(self, rows: List[dict]) -> bool:
+        try:
+            with engine.begin() as conn:
+                conn.execute(pg_insert(Movement.__table__), rows)
+            self.written += len(rows)
+            self.batches += 1
+            return True
+        except Exception:
+            logger.exception("Error escribiendo %s eventos de auditoría; se envían al respaldo", len(rows))
+            self.failed_batches += 1
+            self._to_fallback(rows)
+            return False
+
+    # ------------------------------
+    # Respaldo JSONL
+    # ------------------------------
+    @contextmanager
+    def _file_lock(self):
+        """Exclusión entre hilos de este worker y entre procesos (flock)"""
+        path = settings.AUDIT_FALLBACK_PATH
+        with self._fallback_lock:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(f"{path}.lock", "a") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _append(path: str, lines: List[str]) -> None:
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write("".join(line + "\n" for line in lines))
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def _to_fallback(self, rows: List[dict]) -> None:
+        try:
+            with self._file_lock():
+                self._append(settings.AUDIT_FALLBACK_PATH, [_dump(row) for row in rows])
+        except OSError:
+            # Último recurso: que los eventos queden al menos en el log
+            logger.exception("No se pudo escribir el respaldo de auditoría")
+            for row in rows:
+                logger.error("Evento de auditoría no guardado: %s", _dump(row))
+            return
+        self.fallback_rows += len(rows)
+        self._fallback_pending = True
+
+    def _to_dead_letter(self, entries: List[dict]) -> None:
+        self._append(f"{settings.AUDIT_FALLBACK_PATH}.dead", [_dump(e) for e in entries])
+        self.dead_rows += len(entries)
+        logger.error("Eventos de auditoría apartados en %s.dead: %s", settings.AUDIT_FALLBACK_PATH, len(entries))
+
+    def _insert_replay_chunk(self, stmt, rows: List[dict]) -> int:
+        """
+        Inserta un lote del respaldo y devuelve las filas aceptadas. Si la BD
+        lo rechaza, reintenta fila por fila y aparta las que fallan. Si la BD
+        no responde, propaga el error.
+        """
+        try:
+            with engine.begin() as conn:
+                conn.execute(stmt, rows)
+            return len(rows)
+        except OperationalError:
+            raise
+        except DBAPIError as exc:
+            if exc.connection_invalidated:
+                raise
+            logger.warning("Lote del respaldo rechazado; se reintenta fila por fila")
+
+        dead = []
+        for row in rows:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(stmt, [row])
+            except OperationalError:
+                raise
+            except DBAPIError as exc:
+                if exc.connection_invalidated:
+                    raise
+                dead.append({"row": row, "error": str(exc.orig)})
+        if dead:
+            self._to_dead_letter(dead)
+        return len(rows) - len(dead)
+
+    def replay_fallback(self) -> int:
+        """Inserta los eventos del respaldo; si la BD no responde, el archivo queda intacto"""
+        path = settings.AUDIT_FALLBACK_PATH
+        replaying = f"{path}.replay"
+
+        with self._file_lock():
+            if not os.path.exists(replaying):
+                if not os.path.exists(path):
+                    self._fallback_pending = False
+                    return 0
+                # Renombrar primero: lo que llegue mientras tanto va a un archivo nuevo
+                os.replace(path, replaying)
+
+            rows, unreadable = [], []
+            with open(replaying, encoding="utf-8") as fh:
+                for line in fh:
+                    if not line.strip():
+                        continue
+                    try:
+                        rows.append(_load(line))
+                    except (ValueError, TypeError, ArithmeticError) as exc:
+                        unreadable.append({"line": line.rstrip("\n"), "error": str(exc)})
+            if unreadable:
+                self._to_dead_letter(unreadable)
+
+            # Los ids son los del evento original: si un reintento repite un
+            # lote que ya había entrado, ON CONFLICT lo ignora
+            stmt = pg_insert(Movement.__table__).on_conflict_do_nothing(index_elements=["id"])
+            inserted = 0
+            try:
+                for i in range(0, len(rows), settings.AUDIT_BATCH_SIZE):
+                    inserted += self._insert_replay_chunk(stmt, rows[i:i + settings.AUDIT_BATCH_SIZE])
+            except DBAPIError:
+                logger.exception("No se pudo recuperar el respaldo de auditoría (%s eventos)", len(rows))
+                return 0
+
+            try:
+                os.remove(replaying)
+            except FileNotFoundError:
+                pass
+            self._fallback_pending = os.path.exists(path)
+
+        self.written += inserted
+        logger.info("Eventos de auditoría recuperados del respaldo: %s", inserted)
+        return inserted
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queue_size": self._queue.qsize(),
+            "queue_max": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "fallback_rows": self.fallback_rows,
+            "fallback_pending": self._fallback_pending,
+            "dead_rows": self.dead_rows,
+        }
+
+
+audit_writer = AuditWriter()
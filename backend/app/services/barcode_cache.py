@@ -0,0 +1,60 @@
+# backend/app/services/barcode_cache.py
+"""
+Caché de lecturas de código de barras (GET /products/barcode/{barcode}).
+
+Guarda el payload ya listo para `ProductOut` por código. Se mantiene un
+mapa id -> código para poder invalidar desde actualizaciones que solo
+conocen el id (editar, desactivar, reabastecer, ventas).
+
+- Editar / desactivar / crear producto: se elimina la entrada.
+- Cambios de stock (ventas, anulaciones, reabastecer): se actualiza el
+  stock en sitio, sin perder el acierto del siguiente escaneo.
+
+El TTL acota cuánto puede tardar un worker en ver cambios hechos por otro.
+"""
+import threading
+from typing import Any, Dict, Mapping, Optional
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+
+class BarcodeCache:
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self._cache = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._codes: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, code: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(code)
+
+    def put(self, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._codes[payload["id"]] = payload["code"]
+        self._cache.set(payload["code"], payload)
+
+    def invalidate(self, product_id: int, code: Optional[str] = None) -> None:
+        with self._lock:
+            cached_code = self._codes.pop(product_id, None)
+        for key in {cached_code, code} - {None}:
+            self._cache.pop(key)
+
+    def update_stock(self, stocks: Mapping[int, int]) -> None:
+        for product_id, stock in stocks.items():
+            code = self._codes.get(product_id)
+            if code is not None:
+                self._cache.update(code, lambda payload, s=stock: {**payload, "stock": s})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._codes.clear()
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+barcode_cache = BarcodeCache(
+    max_entries=settings.BARCODE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.BARCODE_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,307 @@
+# backend/app/services/cash_balance_service.py
+"""
+Saldos acumulados de caja (`cash_register_balances`).
+
+Cada movimiento CONFIRMADO suma a la fila (caja, método de pago) de su
+caja: los ingresos a `income_usd`, los egresos a `expense_usd`. Los
+deltas se aplican con un INSERT ... ON CONFLICT DO UPDATE en la misma
+transacción que escribe el movimiento:
+
+- Movimientos creados/anulados/borrados por el ORM: listener after_flush.
+- Inserciones en bloque (db.execute(insert(CashMovement), filas)) no
+  pasan por el flush; quien las hace llama a `record_movements(db, filas)`.
+
+`reconcile_register` recalcula los totales desde los movimientos y
+corrige las filas que no coinciden; `reconcile_worker` lo ejecuta
+periódicamente para las cajas abiertas.
+
+Ambos lados redondean igual: cada movimiento a centavos (mitad hacia
+arriba, como ROUND(numeric) de PostgreSQL) y se suma en Decimal.
+amount_usd es float; sumar floats y redondear al final puede diferir
+en un centavo de la suma de los montos redondeados.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Numeric, case, cast, event, func, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+from app.db.base import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[int, str]
+Contribution = Tuple[Key, Decimal, Decimal]
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0")
+
+TRACKED_ATTRS = ("cash_register_id", "payment_method", "type", "status", "amount_usd")
+
+
+def _text(value) -> str:
+    return str(getattr(value, "value", value) or "")
+
+
+def _cents(value) -> Decimal:
+    # str(): el float se convierte con su representación corta, igual que ::numeric
+    return Decimal(str(value or 0)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _contribution(values: dict) -> Optional[Contribution]:
+    """(clave, ingreso, egreso) que aporta un movimiento, o None si no cuenta"""
+    register_id = values.get("cash_register_id")
+    if register_id is None:
+        return None
+    if _text(values.get("status")) not in ("", models.cash_movement.MovementStatus.CONFIRMADO.value):
+        return None
+
+    amount = _cents(values.get("amount_usd"))
+    key = (register_id, _text(values.get("payment_method")))
+    if _text(values.get("type")) == models.cash_movement.MovementType.INGRESO.value:
+        return key, amount, ZERO
+    return key, ZERO, amount
+
+
+def _values(obj, old: bool = False) -> dict:
+    """Valores actuales (o previos al flush) de las columnas que afectan el saldo"""
+    state = inspect(obj)
+    values = {}
+    for name in TRACKED_ATTRS:
+        history = state.attrs[name].history
+        if old and history.deleted:
+            values[name] = history.deleted[0]
+        elif old and history.added:
+            values[name] = None  # antes del cambio valía NULL
+        elif history.added:
+            values[name] = history.added[0]
+        elif history.unchanged:
+            values[name] = history.unchanged[0]
+        else:
+            values[name] = state.dict.get(name)
+    return values
+
+
+def apply_balance_deltas(db: Session, contributions: Iterable[Tuple[Contribution, int]]) -> None:
+    """Aplica (aporte, signo) agrupados por caja y método en un solo upsert"""
+    deltas: Dict[Key, list] = defaultdict(lambda: [ZERO, ZERO, 0])
+
+    for contribution, sign in contributions:
+        if contribution is None:
+            continue
+        key, income, expense = contribution
+        d = deltas[key]
+        d[0] += sign * income
+        d[1] += sign * expense
+        d[2] += sign
+
+    rows = [
+        {
+            "cash_register_id": register_id,
+            "payment_method": method,
+            "income_usd": income,
+            "expense_usd": expense,
+            "movements_count": count,
+        }
+        # Orden fijo: dos transacciones sobre la misma caja no se bloquean en cruz
+        for (register_id, method), (income, expense, count) in sorted(deltas.items())
+        if income or expense or count
+    ]
+    if not rows:
+        return
+
+    table = models.cash_register_balance.CashRegisterBalance.__table__
+    stmt = pg_insert(table).values(rows)
+    # Conexión de la sesión: también sirve dentro de after_flush
+    db.connection().execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.cash_register_id, table.c.payment_method],
+            set_={
+                "income_usd": table.c.income_usd + stmt.excluded.income_usd,
+                "expense_usd": table.c.expense_usd + stmt.excluded.expense_usd,
+                "movements_count": table.c.movements_count + stmt.excluded.movements_count,
+                "updated_at": func.now(),
+            },
+        )
+    )
+
+
+def record_movements(db: Session, rows: Iterable[dict]) -> None:
+    """Suma al saldo movimientos insertados en bloque (sin pasar por el ORM)"""
+    apply_balance_deltas(db, ((_contribution(row), 1) for row in rows))
+
+
+@event.listens_for(Session, "after_flush")
+def _track_movements(session: Session, flush_context) -> None:
+    CashMovement = models.cash_movement.CashMovement
+    contributions: List[Tuple[Optional[Contribution], int]] = []
+
+    for obj in session.new:
+        if isinstance(obj, CashMovement):
+            contributions.append((_contribution(_values(obj)), 1))
+
+    for obj in session.dirty:
+        if isinstance(obj, CashMovement) and any(
+            inspect(obj).attrs[name].history.has_changes() for name in TRACKED_ATTRS
+        ):
+            contributions.append((_contribution(_values(obj, old=True)), -1))
+            contributions.append((_contribution(_values(obj)), 1))
+
+    for obj in session.deleted:
+        if isinstance(obj, CashMovement):
+            contributions.append((_contribution(_values(obj, old=True)), -1))
+
+    if contributions:
+        apply_balance_deltas(session, contributions)
+
+
+# ============================================================
+# LECTURAS
+# ============================================================
+def register_balances(db: Session, cash_register_id: int) -> dict:
+    """Totales de la caja por método (lectura de unas pocas filas)"""
+    Balance = models.cash_register_balance.CashRegisterBalance
+    rows = db.query(Balance).filter(
+        Balance.cash_register_id == cash_register_id
+    ).order_by(Balance.payment_method).all()
+
+    by_method = [
+        {
+            "method": row.payment_method,
+            "ingresos": float(row.income_usd),
+            "egresos": float(row.expense_usd),
+            "saldo": round(float(row.income_usd - row.expense_usd), 2),
+            "movements_count": row.movements_count,
+        }
+        for row in rows
+    ]
+    ingresos = round(sum(m["ingresos"] for m in by_method), 2)
+    egresos = round(sum(m["egresos"] for m in by_method), 2)
+
+    return {
+        "ingresos": ingresos,
+        "egresos": egresos,
+        "saldo": round(ingresos - egresos, 2),
+        "by_method": by_method,
+    }
+
+
+# ============================================================
+# VERIFICACIÓN CONTRA LOS MOVIMIENTOS
+# ============================================================
+def _ledger_totals(db: Session, cash_register_id: int) -> Dict[str, tuple]:
+    CashMovement = models.cash_movement.CashMovement
+    is_ingreso = CashMovement.type == models.cash_movement.MovementType.INGRESO
+    # Redondeo por fila en numeric, como los deltas
+    amount = func.round(cast(CashMovement.amount_usd, Numeric), 2)
+
+    rows = db.query(
+        CashMovement.payment_method,
+        func.coalesce(func.sum(case((is_ingreso, amount), else_=0)), 0),
+        func.coalesce(func.sum(case((is_ingreso, 0), else_=amount)), 0),
+        func.count(CashMovement.id),
+    ).filter(
+        CashMovement.cash_register_id == cash_register_id,
+        CashMovement.status == models.cash_movement.MovementStatus.CONFIRMADO,
+    ).group_by(CashMovement.payment_method).all()
+
+    return {
+        method or "": (Decimal(income), Decimal(expense), count)
+        for method, income, expense, count in rows
+    }
+
+
+def reconcile_register(db: Session, cash_register_id: int) -> dict:
+    """
+    Compara los saldos acumulados con la suma de los movimientos y, si
+    difieren, los reemplaza por los valores recalculados.
+    """
+    Balance = models.cash_register_balance.CashRegisterBalance
+
+    # Bloquear las filas de saldo: los movimientos concurrentes de esta
+    # caja esperan y aplican su delta después de la corrección
+    stored = {
+        row.payment_method: (
+            Decimal(row.income_usd),
+            Decimal(row.expense_usd),
+            row.movements_count,
+        )
+        for row in db.query(Balance).filter(
+            Balance.cash_register_id == cash_register_id
+        ).with_for_update().all()
+    }
+    ledger = _ledger_totals(db, cash_register_id)
+
+    mismatches = [
+        {
+            "method": method,
+            "stored": stored.get(method, (ZERO, ZERO, 0)),
+            "ledger": ledger.get(method, (ZERO, ZERO, 0)),
+        }
+        for method in sorted(set(stored) | set(ledger))
+        if stored.get(method, (ZERO, ZERO, 0)) != ledger.get(method, (ZERO, ZERO, 0))
+    ]
+
+    if mismatches:
+        table = Balance.__table__
+        db.execute(table.delete().where(table.c.cash_register_id == cash_register_id))
+        if ledger:
+            db.execute(table.insert(), [
+                {
+                    "cash_register_id": cash_register_id,
+                    "payment_method": method,
+                    "income_usd": income,
+                    "expense_usd": expense,
+                    "movements_count": count,
+                }
+                for method, (income, expense, count) in ledger.items()
+            ])
+        logger.warning(
+            "Saldos de caja %s corregidos desde los movimientos: %s",
+            cash_register_id, mismatches
+        )
+
+    db.commit()
+
+    return {
+        "cash_register_id": cash_register_id,
+        "methods_checked": len(set(stored) | set(ledger)),
+        "mismatches": mismatches,
+        "repaired": bool(mismatches),
+    }
+
+
+def _reconcile_open_registers() -> None:
+    db = SessionLocal()
+    try:
+        register_ids = [
+            register_id
+            for (register_id,) in db.query(models.cash_register.CashRegister.id).filter(
+                models.cash_register.CashRegister.status == "OPEN"
+            ).all()
+        ]
+        db.rollback()
+        for register_id in register_ids:
+            reconcile_register(db, register_id)
+    finally:
+        db.close()
+
+
+async def reconcile_worker() -> None:
+    """Verifica periódicamente los saldos de las cajas abiertas"""
+    loop = asyncio.get_running_loop()
+
+    while True:
+        await asyncio.sleep(settings.CASH_BALANCE_RECONCILE_SECONDS)
+        try:
+            await loop.run_in_executor(None, _reconcile_open_registers)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Error verificando saldos de caja")
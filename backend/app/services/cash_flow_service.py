@@ -4,6 +4,7 @@ Servicio para gestión de flujo de caja
 Maneja la lógica de negocio y eventos automáticos
 """
 from sqlalchemy.orm import Session
+from app.core.dates import date_filters
 from app.db import models
 from typing import List
 
@@ -156,7 +157,7 @@ class CashFlowService:
         """
         Calcula saldo neto por método de pago
         """
-        from sqlalchemy import func, and_
+        from sqlalchemy import func, and_, case
         from datetime import datetime
         
         filters = [
@@ -164,21 +165,22 @@ class CashFlowService:
             models.cash_movement.CashMovement.status == models.cash_movement.MovementStatus.CONFIRMADO
         ]
         
-        if start_date:
-            filters.append(
-                func.date(models.cash_movement.CashMovement.accounting_date) >= 
-                datetime.strptime(start_date, "%Y-%m-%d").date()
-            )
-        
-        if end_date:
-            filters.append(
-                func.date(models.cash_movement.CashMovement.accounting_date) <= 
-                datetime.strptime(end_date, "%Y-%m-%d").date()
-            )
+        filters.extend(date_filters(
+            models.cash_movement.CashMovement.accounting_date,
+            datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None,
+            datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None,
+        ))
         
-        movements = db.query(models.cash_movement.CashMovement).filter(and_(*filters)).all()
+        CashMovement = models.cash_movement.CashMovement
+        MovementType = models.cash_movement.MovementType
         
-        ingresos = sum(m.amount_usd for m in movements if m.type == models.cash_movement.MovementType.INGRESO)
-        egresos = sum(m.amount_usd for m in movements if m.type == models.cash_movement.MovementType.EGRESO)
+        # SUM(CASE ...) en SQL: ingresos suman, egresos restan
+        saldo = db.query(
+            func.coalesce(func.sum(case(
+                (CashMovement.type == MovementType.INGRESO, CashMovement.amount_usd),
+                (CashMovement.type == MovementType.EGRESO, -CashMovement.amount_usd),
+                else_=0
+            )), 0)
+        ).filter(and_(*filters)).scalar()
         
-        return round(ingresos - egresos, 2)
\ No newline at end of file
+        return round(saldo, 2)
\ No newline at end of file
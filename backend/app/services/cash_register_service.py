@@ -86,14 +86,17 @@ def close_cash_register(db: Session, user_id: int) -> CashRegister:
     return cash_register
 
 def calculate_system_amount(db: Session, cash_register_id: int) -> float:
-    ingresos = db.query(func.coalesce(func.sum(CashMovement.amount), 0)).filter(
-        CashMovement.cash_register_id == cash_register_id,
-        CashMovement.type == MovementType.INGRESO
+    """
+    Ingresos - egresos de la caja en USD, desde los saldos acumulados
+    (cash_register_balances): suma amount_usd de los movimientos
+    CONFIRMADOS, así que los anulados no cuentan. El monto contado del
+    cierre (counted_amount) se declara también en USD.
+    """
+    Balance = models.cash_register_balance.CashRegisterBalance
+    saldo = db.query(
+        func.coalesce(func.sum(Balance.income_usd - Balance.expense_usd), 0)
+    ).filter(
+        Balance.cash_register_id == cash_register_id
     ).scalar()
 
-    egresos = db.query(func.coalesce(func.sum(CashMovement.amount), 0)).filter(
-        CashMovement.cash_register_id == cash_register_id,
-        CashMovement.type == MovementType.EGRESO
-    ).scalar()
-
-    return float(ingresos) - float(egresos)
\ No newline at end of file
+    return round(float(saldo), 2)
\ No newline at end of file
@@ -1,22 +1,23 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, case, cast, select, literal_column, Date, DateTime
 from datetime import date, timedelta
 
+from app.core.dates import date_filters, local_date, store_today
 from app.db import models
 
 
 def get_cash_status(db: Session):
-    ingresos = db.query(func.sum(models.cash_movement.CashMovement.amount_usd)).filter(
-        models.cash_movement.CashMovement.type == models.cash_movement.MovementType.INGRESO,
-        models.cash_movement.CashMovement.status == models.cash_movement.MovementStatus.CONFIRMADO
-    ).scalar() or 0
+    CashMovement = models.cash_movement.CashMovement
+    MovementType = models.cash_movement.MovementType
 
-    egresos = db.query(func.sum(models.cash_movement.CashMovement.amount_usd)).filter(
-        models.cash_movement.CashMovement.type == models.cash_movement.MovementType.EGRESO,
-        models.cash_movement.CashMovement.status == models.cash_movement.MovementStatus.CONFIRMADO
-    ).scalar() or 0
+    totals = db.query(
+        func.coalesce(func.sum(case((CashMovement.type == MovementType.INGRESO, CashMovement.amount_usd), else_=0)), 0).label("ingresos"),
+        func.coalesce(func.sum(case((CashMovement.type == MovementType.EGRESO, CashMovement.amount_usd), else_=0)), 0).label("egresos"),
+    ).filter(
+        CashMovement.status == models.cash_movement.MovementStatus.CONFIRMADO
+    ).one()
 
-    return ingresos, egresos
+    return totals.ingresos, totals.egresos
 
 
 def get_by_payment_method(db: Session, start: date, end: date):
@@ -25,7 +26,7 @@ def get_by_payment_method(db: Session, start: date, end: date):
         func.sum(models.cash_movement.CashMovement.amount_usd)
     ).filter(
         models.cash_movement.CashMovement.status == models.cash_movement.MovementStatus.CONFIRMADO,
-        func.date(models.cash_movement.CashMovement.accounting_date).between(start, end)
+        *date_filters(models.cash_movement.CashMovement.accounting_date, start, end)
     ).group_by(
         models.cash_movement.CashMovement.payment_method
     ).all()
@@ -34,33 +35,54 @@ def get_by_payment_method(db: Session, start: date, end: date):
 
 
 def get_daily_evolution(db: Session, days: int = 7):
-    end = date.today()
+    """
+    Ingresos/egresos por día en un solo agregado SQL.
+    generate_series produce todos los días del rango para que los días
+    sin movimientos aparezcan en cero.
+    """
+    end = store_today()
     start = end - timedelta(days=days - 1)
 
-    movements = db.query(models.cash_movement.CashMovement).filter(
-        models.cash_movement.CashMovement.status == models.cash_movement.MovementStatus.CONFIRMADO,
-        func.date(models.cash_movement.CashMovement.accounting_date).between(start, end)
-    ).all()
+    CashMovement = models.cash_movement.CashMovement
+    MovementType = models.cash_movement.MovementType
+    movement_day = local_date(CashMovement.accounting_date)
 
-    daily = {}
-    for i in range(days):
-        d = start + timedelta(days=i)
-        daily[d] = {"ingresos": 0, "egresos": 0}
+    calendar = select(
+        cast(
+            func.generate_series(
+                cast(start, DateTime),
+                cast(end, DateTime),
+                literal_column("interval '1 day'")
+            ),
+            Date
+        ).label("day")
+    ).subquery()
 
-    for m in movements:
-        d = m.accounting_date.date()
-        if m.type == models.cash_movement.MovementType.INGRESO:
-            daily[d]["ingresos"] += m.amount_usd
-        else:
-            daily[d]["egresos"] += m.amount_usd
+    daily = select(
+        movement_day.label("day"),
+        func.sum(case((CashMovement.type == MovementType.INGRESO, CashMovement.amount_usd), else_=0)).label("ingresos"),
+        func.sum(case((CashMovement.type != MovementType.INGRESO, CashMovement.amount_usd), else_=0)).label("egresos"),
+    ).where(
+        CashMovement.status == models.cash_movement.MovementStatus.CONFIRMADO,
+        *date_filters(CashMovement.accounting_date, start, end)
+    ).group_by(movement_day).subquery()
 
-    result = []
-    for d, values in daily.items():
-        result.append({
-            "date": d,
-            "ingresos": round(values["ingresos"], 2),
-            "egresos": round(values["egresos"], 2),
-            "saldo": round(values["ingresos"] - values["egresos"], 2)
-        })
+    rows = db.execute(
+        select(
+            calendar.c.day,
+            func.coalesce(daily.c.ingresos, 0).label("ingresos"),
+            func.coalesce(daily.c.egresos, 0).label("egresos"),
+        ).select_from(
+            calendar.outerjoin(daily, daily.c.day == calendar.c.day)
+        ).order_by(calendar.c.day)
+    ).all()
 
-    return result
+    return [
+        {
+            "date": row.day,
+            "ingresos": round(row.ingresos, 2),
+            "egresos": round(row.egresos, 2),
+            "saldo": round(row.ingresos - row.egresos, 2)
+        }
+        for row in rows
+    ]
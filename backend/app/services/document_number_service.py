@@ -0,0 +1,127 @@
+# backend/app/services/document_number_service.py
+"""
+Numeración de documentos (ventas, egresos) basada en contadores.
+
+Cada (prefijo, sucursal, día) tiene una fila en `document_sequences`. Un
+número se obtiene con un único INSERT ... ON CONFLICT DO UPDATE ...
+RETURNING ejecutado en una transacción propia y corta, de modo que el
+bloqueo del contador no se mantiene durante todo el checkout.
+
+Esa transacción usa un pool propio y pequeño (DOC_SEQUENCE_POOL_SIZE), no
+el de las sesiones: el checkout ya tiene una conexión del pool principal
+y, si esperara una segunda del mismo pool, bajo carga todos los workers
+quedarían esperando conexiones que ninguno libera. Las conexiones del
+pool de contadores no esperan nada más, así que siempre se liberan.
+
+Con DOC_SEQUENCE_BLOCK_SIZE > 1 cada worker reserva un bloque de números
+y los entrega desde memoria hasta agotarlo.
+"""
+import threading
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.dates import store_today
+from app.db.base import create_db_engine
+from app.db.models.document_sequence import DocumentSequence
+
+_BlockKey = Tuple[str, int, date]
+
+_blocks: Dict[_BlockKey, List[int]] = {}   # key -> [siguiente, último reservado]
+_lock = threading.Lock()
+
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+def _sequence_engine(db: Session) -> Engine:
+    """Engine de los contadores: misma base que la sesión, pool aparte"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = create_db_engine(
+                db.get_bind().url,
+                pool_size=max(settings.DOC_SEQUENCE_POOL_SIZE, 1),
+                max_overflow=0,
+            )
+        return _engine
+
+
+def _reserve(db: Session, prefix: str, branch_id: int, day: date, size: int) -> int:
+    """Reserva `size` números y devuelve el último del bloque"""
+    stmt = (
+        pg_insert(DocumentSequence)
+        .values(prefix=prefix, branch_id=branch_id, day=day, last_value=size)
+        .on_conflict_do_update(
+            index_elements=[
+                DocumentSequence.prefix,
+                DocumentSequence.branch_id,
+                DocumentSequence.day,
+            ],
+            set_={
+                "last_value": DocumentSequence.last_value + size,
+                "updated_at": func.now(),
+            },
+        )
+        .returning(DocumentSequence.last_value)
+    )
+
+    # Conexión propia: el contador se confirma de inmediato, aunque la
+    # transacción del llamador (la venta) siga abierta.
+    with _sequence_engine(db).begin() as conn:
+        return conn.execute(stmt).scalar_one()
+
+
+def next_document_number(
+    db: Session,
+    prefix: str,
+    day: Optional[date] = None,
+    branch_id: Optional[int] = None,
+) -> int:
+    """Siguiente correlativo del día para el prefijo/sucursal dados"""
+    day = day or store_today()
+    branch_id = branch_id or 0
+    size = max(settings.DOC_SEQUENCE_BLOCK_SIZE, 1)
+
+    if size == 1:
+        return _reserve(db, prefix, branch_id, day, 1)
+
+    key = (prefix, branch_id, day)
+
+    with _lock:
+        block = _blocks.get(key)
+
+        if not block or block[0] > block[1]:
+            last = _reserve(db, prefix, branch_id, day, size)
+            block = [last - size + 1, last]
+
+            # Descartar bloques de días anteriores
+            for stale in [k for k in _blocks if k[2] != day]:
+                del _blocks[stale]
+            _blocks[key] = block
+
+        number = block[0]
+        block[0] += 1
+        return number
+
+
+def format_document_code(prefix: str, day: date, number: int, width: int = 4) -> str:
+    return f"{prefix}-{day.strftime('%Y%m%d')}-{number:0{width}d}"
+
+
+def next_document_code(
+    db: Session,
+    prefix: str,
+    width: int = 4,
+    day: Optional[date] = None,
+    branch_id: Optional[int] = None,
+) -> str:
+    """Ej: next_document_code(db, "VTA") -> 'VTA-20250107-0001'"""
+    day = day or store_today()
+    number = next_document_number(db, prefix, day=day, branch_id=branch_id)
+    return format_document_code(prefix, day, number, width)
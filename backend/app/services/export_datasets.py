@@ -0,0 +1,262 @@
+# backend/app/services/export_datasets.py
+"""
+Registro de datasets crudos para extracciones (BI / data warehouse).
+
+Cada dataset define sus columnas, la columna del rango de fechas de
+negocio y la columna de marca de agua (`updated_at` donde la fila puede
+cambiar, `created_at` en tablas de solo inserción). Lo usan:
+
+- GET /exports/stream/{dataset}: CSV o NDJSON en streaming.
+- GET /exports/parquet/{dataset}: Parquet particionado por mes (parquet_export).
+
+Las filas se leen con `yield_per` (cursor del lado del servidor), en
+lotes de EXPORT_BATCH_SIZE, ordenadas por (marca de agua, id) para que
+una extracción incremental sea reproducible.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.dates import date_filters
+from app.db import models
+from app.db.routing import open_read_session
+
+CSV_MEDIA_TYPE = "text/csv"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+@dataclass(frozen=True)
+class ExportDataset:
+    name: str
+    base: object                              # tabla/modelo del FROM
+    columns: Sequence[Tuple[str, object]]     # (nombre, columna)
+    date_column: object                       # filtro start/end (días de la tienda)
+    watermark_column: object                  # filtro updated_since
+    id_column: object
+    joins: Sequence[Tuple[object, object]] = ()  # (destino, condición)
+
+    @property
+    def headers(self) -> List[str]:
+        return [name for name, _ in self.columns]
+
+    def query(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        updated_since: Optional[datetime] = None,
+    ):
+        stmt = select(*[column.label(name) for name, column in self.columns]).select_from(self.base)
+        for target, onclause in self.joins:
+            stmt = stmt.join(target, onclause)
+
+        stmt = stmt.where(*date_filters(self.date_column, start, end))
+        if updated_since is not None:
+            stmt = stmt.where(self.watermark_column >= updated_since)
+
+        return stmt.order_by(self.watermark_column, self.id_column)
+
+
+def _datasets() -> Dict[str, ExportDataset]:
+    Sale = models.sale.Sale
+    SaleDetail = models.sale_detail.SaleDetail
+    Payment = models.payment.Payment
+    CashMovement = models.cash_movement.CashMovement
+    Expense = models.expense.Expense
+
+    return {
+        "sales": ExportDataset(
+            name="sales",
+            base=Sale,
+            columns=[
+                ("id", Sale.id),
+                ("code", Sale.code),
+                ("client_id", Sale.client_id),
+                ("seller_id", Sale.seller_id),
+                ("status", Sale.status),
+                ("payment_method", Sale.payment_method),
+                ("subtotal_usd", Sale.subtotal_usd),
+                ("discount_usd", Sale.discount_usd),
+                ("total_usd", Sale.total_usd),
+                ("paid_usd", Sale.paid_usd),
+                ("balance_usd", Sale.balance_usd),
+                ("note", Sale.note),
+                ("created_at", Sale.created_at),
+                ("updated_at", Sale.updated_at),
+            ],
+            date_column=Sale.created_at,
+            watermark_column=Sale.updated_at,
+            id_column=Sale.id,
+        ),
+        # Las líneas no cambian; se re-extraen cuando cambia su venta
+        "sale_details": ExportDataset(
+            name="sale_details",
+            base=SaleDetail,
+            columns=[
+                ("id", SaleDetail.id),
+                ("sale_id", SaleDetail.sale_id),
+                ("sale_code", Sale.code),
+                ("product_id", SaleDetail.product_id),
+                ("quantity", SaleDetail.quantity),
+                ("price_usd", SaleDetail.price_usd),
+                ("subtotal_usd", SaleDetail.subtotal_usd),
+                ("sale_created_at", Sale.created_at),
+                ("sale_updated_at", Sale.updated_at),
+            ],
+            date_column=Sale.created_at,
+            watermark_column=Sale.updated_at,
+            id_column=SaleDetail.id,
+            joins=[(Sale, Sale.id == SaleDetail.sale_id)],
+        ),
+        "payments": ExportDataset(
+            name="payments",
+            base=Payment,
+            columns=[
+                ("id", Payment.id),
+                ("sale_id", Payment.sale_id),
+                ("method", Payment.method),
+                ("currency", Payment.currency),
+                ("amount", Payment.amount),
+                ("amount_usd", Payment.amount_usd),
+                ("reference_number", Payment.reference_number),
+                ("bank_code", Payment.bank_code),
+                ("bank_name", Payment.bank_name),
+                ("digital_platform", Payment.digital_platform),
+                ("created_at", Payment.created_at),
+            ],
+            date_column=Payment.created_at,
+            watermark_column=Payment.created_at,
+            id_column=Payment.id,
+        ),
+        "cash_movements": ExportDataset(
+            name="cash_movements",
+            base=CashMovement,
+            columns=[
+                ("id", CashMovement.id),
+                ("cash_register_id", CashMovement.cash_register_id),
+                ("type", CashMovement.type),
+                ("origin", CashMovement.origin),
+                ("status", CashMovement.status),
+                ("payment_method", CashMovement.payment_method),
+                ("currency", CashMovement.currency),
+                ("amount", CashMovement.amount),
+                ("amount_usd", CashMovement.amount_usd),
+                ("payment_id", CashMovement.payment_id),
+                ("reference_id", CashMovement.reference_id),
+                ("reference_code", CashMovement.reference_code),
+                ("description", CashMovement.description),
+                ("category", CashMovement.category),
+                ("created_by_user_id", CashMovement.created_by_user_id),
+                ("accounting_date", CashMovement.accounting_date),
+                ("created_at", CashMovement.created_at),
+                ("updated_at", CashMovement.updated_at),
+            ],
+            date_column=CashMovement.accounting_date,
+            watermark_column=CashMovement.updated_at,
+            id_column=CashMovement.id,
+        ),
+        "expenses": ExportDataset(
+            name="expenses",
+            base=Expense,
+            columns=[
+                ("id", Expense.id),
+                ("category", Expense.category),
+                ("description", Expense.description),
+                ("provider_id", Expense.provider_id),
+                ("payment_method", Expense.payment_method),
+                ("currency", Expense.currency),
+                ("amount", Expense.amount),
+                ("amount_usd", Expense.amount_usd),
+                ("reference_number", Expense.reference_number),
+                ("created_by_user_id", Expense.created_by_user_id),
+                ("created_by_name", Expense.created_by_name),
+                ("created_at", Expense.created_at),
+            ],
+            date_column=Expense.created_at,
+            watermark_column=Expense.created_at,
+            id_column=Expense.id,
+        ),
+    }
+
+
+DATASETS: Dict[str, ExportDataset] = _datasets()
+
+
+def get_dataset(name: str) -> Optional[ExportDataset]:
+    return DATASETS.get(name)
+
+
+# ============================================================
+# SERIALIZACIÓN
+# ============================================================
+def plain_value(value):
+    """Valor apto para CSV/JSON: fechas ISO 8601 (con zona), enums por su valor"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "value"):  # Enum
+        return value.value
+    return value
+
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([[plain_value(v) for v in row] for row in rows])
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(headers: List[str], rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(headers, (plain_value(v) for v in row))), ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+FORMATS: Dict[str, Tuple[str, Callable]] = {
+    "csv": (CSV_MEDIA_TYPE, lambda headers, rows: _csv_chunk(rows)),
+    "ndjson": (NDJSON_MEDIA_TYPE, _ndjson_chunk),
+}
+
+
+def export_watermark(db: Session) -> datetime:
+    """
+    Valor de `updated_since` para la próxima extracción incremental.
+    Se resta un margen (EXPORT_WATERMARK_OVERLAP_SECONDS) para no perder
+    filas de transacciones que confirmaron después con un timestamp
+    anterior; el destino debe hacer upsert por id.
+    """
+    now = db.execute(select(func.now())).scalar_one()
+    return now - timedelta(seconds=settings.EXPORT_WATERMARK_OVERLAP_SECONDS)
+
+
+def stream_dataset(
+    dataset: ExportDataset,
+    fmt: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    updated_since: Optional[datetime] = None,
+) -> Iterator[str]:
+    """
+    Genera el archivo por lotes. Usa su propia sesión: la del request se
+    cierra antes de que StreamingResponse termine de enviar el cuerpo.
+    """
+    _, render = FORMATS[fmt]
+    db = open_read_session()
+    try:
+        if fmt == "csv":
+            yield _csv_chunk([dataset.headers])
+
+        result = db.execute(
+            dataset.query(start, end, updated_since).execution_options(
+                yield_per=settings.EXPORT_BATCH_SIZE
+            )
+        )
+        for rows in result.partitions():
+            yield render(dataset.headers, rows)
+    finally:
+        db.close()
@@ -0,0 +1,352 @@
+# backend/app/services/export_jobs.py
+"""
+Jobs de exportación en segundo plano.
+
+POST /exports/jobs encola el render (xlsx, pdf o csv) en un pool de
+procesos acotado (EXPORT_JOB_WORKERS) y devuelve un id; el request no
+espera a que termine. Todo el estado vive en disco, en
+<EXPORT_DIR>/export_jobs, para que cualquier worker de la API pueda
+responder por cualquier job:
+
+    <job_id>.json      metadatos y estado (queued, running, done, error)
+    <job_id>.progress  filas escritas / total (lo actualiza el proceso hijo)
+    <job_id>.<ext>     resultado
+    <cache_key>.key    último job para (formato, rango, filtros)
+
+Un pedido idéntico a uno en curso o ya terminado (y no vencido)
+reutiliza ese job. Si el rango llega hasta hoy (o no tiene fin) solo se
+reutiliza un job en curso: un resultado terminado ya no incluye lo
+vendido después. Los resultados se borran EXPORT_JOB_TTL_SECONDS
+después de terminar.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from functools import partial
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.dates import store_today
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+ERROR = "error"
+
+# formato -> extensión
+EXTENSIONS = {"xlsx": ".xlsx", "pdf": ".pdf", "csv": ".csv"}
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+# ============================================================
+# ARCHIVOS
+# ============================================================
+def jobs_dir() -> str:
+    path = os.path.join(settings.EXPORT_DIR or tempfile.gettempdir(), "export_jobs")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _path(name: str) -> str:
+    return os.path.join(jobs_dir(), name)
+
+
+def _write_json(path: str, data: dict) -> None:
+    # Escritura atómica: los lectores nunca ven un JSON a medias
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, default=str)
+    os.replace(tmp, path)
+
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def result_path(job: dict) -> str:
+    return _path(job["id"] + EXTENSIONS[job["params"]["format"]])
+
+
+def cache_key(params: dict) -> str:
+    raw = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def is_open_range(params: dict) -> bool:
+    """El rango incluye hoy: los datos siguen cambiando"""
+    return params["end"] is None or params["end"] >= store_today().isoformat()
+
+
+def job_params(
+    fmt: str,
+    start: Optional[date],
+    end: Optional[date],
+    detail: bool = True,
+    dataset: str = "sales",
+) -> dict:
+    """Parámetros normalizados: solo lo que cambia el resultado entra en la clave"""
+    params = {
+        "format": fmt,
+        "start": start.isoformat() if start else None,
+        "end": end.isoformat() if end else None,
+    }
+    if fmt == "xlsx":
+        params["detail"] = detail
+    if fmt == "csv":
+        params["dataset"] = dataset
+    return params
+
+
+# ============================================================
+# PROCESO HIJO
+# ============================================================
+def _init_worker() -> None:
+    # Las conexiones heredadas del proceso padre no se comparten
+    from app.db.base import engine
+    engine.dispose(close=False)
+
+
+class _ProgressFile:
+    """Callback de avance: acumula filas y escribe el archivo como mucho una vez por segundo"""
+
+    def __init__(self, job_id: str, total: int):
+        self.path = _path(job_id + ".progress")
+        self.total = total
+        self.done = 0
+        self.last = 0.0
+        self.flush()
+
+    def __call__(self, rows: int) -> None:
+        self.done += rows
+        if time.monotonic() - self.last >= 1:
+            self.flush()
+
+    def flush(self) -> None:
+        self.last = time.monotonic()
+        _write_json(self.path, {"rows_done": self.done, "rows_total": self.total})
+
+
+def _render(job_id: str) -> None:
+    from app.db.base import SessionLocal
+    from app.services import export_service
+
+    meta_path = _path(job_id + ".json")
+    job = _read_json(meta_path)
+    if job is None:  # vencido antes de empezar
+        return
+
+    job.update(status=RUNNING, started_at=time.time())
+    _write_json(meta_path, job)
+
+    params = job["params"]
+    start = date.fromisoformat(params["start"]) if params["start"] else None
+    end = date.fromisoformat(params["end"]) if params["end"] else None
+    path = result_path(job)
+    tmp_path = f"{path}.partial"
+
+    db = SessionLocal()
+    try:
+        if params["format"] == "xlsx":
+            total = sum(
+                export_service.count_rows(db, query(start, end))
+                for _, _, _, query in export_service.DETAIL_SHEETS
+            ) if params["detail"] else 0
+            progress = _ProgressFile(job_id, total)
+            export_service.write_financial_workbook(db, tmp_path, start, end, params["detail"], progress)
+        elif params["format"] == "csv":
+            _, _, query = export_service.DETAIL_DATASETS[params["dataset"]]
+            progress = _ProgressFile(job_id, export_service.count_rows(db, query(start, end)))
+            export_service.write_dataset_csv(db, tmp_path, params["dataset"], start, end, progress)
+        else:
+            progress = _ProgressFile(job_id, 0)
+            export_service.write_financial_pdf(db, tmp_path, start, end)
+
+        os.replace(tmp_path, path)
+        progress.flush()
+        job.update(status=DONE, size_bytes=os.path.getsize(path))
+    except Exception as exc:
+        logger.exception("Error generando exportación %s", job_id)
+        _remove(tmp_path)
+        job.update(status=ERROR, error=str(exc))
+    finally:
+        db.close()
+        job["finished_at"] = time.time()
+        _write_json(meta_path, job)
+
+
+# ============================================================
+# COLA (PROCESO DE LA API)
+# ============================================================
+class ExportJobQueue:
+    def __init__(self, max_workers: int, max_pending: int, ttl_seconds: int):
+        self.max_workers = max(max_workers, 1)
+        self.max_pending = max_pending
+        self.ttl = ttl_seconds
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+        # Reentrante: add_done_callback corre en el acto si el future ya terminó
+        self._lock = threading.RLock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker)
+        return self._pool
+
+    def submit(self, params: dict, force: bool = False) -> Tuple[dict, bool]:
+        """
+        Encola el render o devuelve el job equivalente. Retorna (job, reutilizado).
+        `force` ignora el resultado cacheado (p. ej. rangos abiertos "hasta hoy").
+        """
+        self.sweep()
+        key = cache_key(params)
+        key_path = _path(key + ".key")
+
+        with self._lock:
+            ref = _read_json(key_path)
+            existing = self.get(ref["job_id"]) if ref and not force else None
+            if existing and (
+                existing["status"] in (QUEUED, RUNNING)
+                or (
+                    existing["status"] == DONE
+                    and not is_open_range(params)
+                    and os.path.exists(result_path(existing))
+                )
+            ):
+                return existing, True
+
+            if self._pending >= self.max_pending:
+                raise HTTPException(
+                    status_code=429,
+                    detail="Demasiadas exportaciones en cola. Intente más tarde."
+                )
+
+            job = {
+                "id": uuid.uuid4().hex,
+                "cache_key": key,
+                "params": params,
+                "status": QUEUED,
+                "created_at": time.time(),
+            }
+            _write_json(_path(job["id"] + ".json"), job)
+            _write_json(key_path, {"job_id": job["id"]})
+
+            future = self._executor().submit(_render, job["id"])
+            self._pending += 1
+            future.add_done_callback(partial(self._on_done, job["id"]))
+
+        return self.get(job["id"]) or job, False
+
+    def _on_done(self, job_id: str, future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+        exc = future.exception()
+        if exc is None:
+            return
+
+        # El proceso hijo murió (BrokenProcessPool, etc.) sin registrar el error
+        logger.error("Exportación %s falló: %s", job_id, exc)
+        job = _read_json(_path(job_id + ".json"))
+        if job and job["status"] in (QUEUED, RUNNING):
+            job.update(status=ERROR, error=str(exc), finished_at=time.time())
+            _write_json(_path(job_id + ".json"), job)
+        if isinstance(exc, BrokenProcessPool):
+            with self._lock:
+                self._pool = None
+
+    def get(self, job_id: str) -> Optional[dict]:
+        if not _JOB_ID.match(job_id or ""):
+            return None
+        job = _read_json(_path(job_id + ".json"))
+        if job is None:
+            return None
+
+        progress = _read_json(_path(job_id + ".progress")) or {}
+        done = progress.get("rows_done", 0)
+        total = progress.get("rows_total", 0)
+        job["rows_done"] = done
+        job["rows_total"] = total
+        if job["status"] == DONE:
+            job["percent"] = 100.0
+        else:
+            job["percent"] = round(min(done / total, 0.99) * 100, 1) if total else 0.0
+        if job.get("finished_at"):
+            job["expires_at"] = job["finished_at"] + self.ttl
+        return job
+
+    def sweep(self) -> int:
+        """Borra jobs vencidos: terminados hace más de TTL o sin avance desde hace TTL"""
+        now = time.time()
+        removed = 0
+
+        for name in os.listdir(jobs_dir()):
+            if not name.endswith(".json"):
+                continue
+            meta_path = _path(name)
+            job = _read_json(meta_path)
+            if job is None:
+                continue
+
+            if job.get("finished_at"):
+                expired = job["finished_at"] + self.ttl < now
+            else:
+                touched = 0.0
+                for p in (meta_path, _path(job["id"] + ".progress")):
+                    try:
+                        touched = max(touched, os.path.getmtime(p))
+                    except FileNotFoundError:  # otro worker lo barrió
+                        pass
+                if not touched:
+                    continue
+                expired = touched + self.ttl < now
+
+            if not expired:
+                continue
+
+            for suffix in (".progress", EXTENSIONS[job["params"]["format"]]):
+                _remove(_path(job["id"] + suffix))
+            key_path = _path(job["cache_key"] + ".key")
+            if (_read_json(key_path) or {}).get("job_id") == job["id"]:
+                _remove(key_path)
+            _remove(meta_path)
+            removed += 1
+
+        return removed
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+export_jobs = ExportJobQueue(
+    settings.EXPORT_JOB_WORKERS,
+    settings.EXPORT_JOB_MAX_PENDING,
+    settings.EXPORT_JOB_TTL_SECONDS,
+)
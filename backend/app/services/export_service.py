@@ -0,0 +1,340 @@
+# backend/app/services/export_service.py
+"""
+Exportaciones financieras a Excel, PDF y CSV.
+
+El Excel se escribe con hojas write-only de openpyxl: cada fila va
+directo al archivo y no queda en memoria. Las ventas, gastos y
+movimientos de caja se leen con `yield_per` (cursor del lado del
+servidor en PostgreSQL), de a EXPORT_BATCH_SIZE filas, de modo que la
+memoria no crece con el rango de fechas.
+
+El archivo se genera en un temporal (EXPORT_DIR o el tmp del sistema);
+la ruta lo entrega con FileResponse y lo borra al terminar de enviarlo.
+Los escritores aceptan un callback `progress(filas)` que usan los jobs
+de exportación en segundo plano (export_jobs).
+"""
+import csv
+import os
+import tempfile
+from datetime import date, datetime
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Table, TableStyle
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.dates import date_filters, store_tz
+from app.db import models
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+PDF_MEDIA_TYPE = "application/pdf"
+CSV_MEDIA_TYPE = "text/csv"
+
+LOGO_PATH = "/mnt/data/logo.png"
+
+Progress = Optional[Callable[[int], None]]
+
+# Límite de filas de una hoja de Excel (incluye el encabezado)
+MAX_SHEET_ROWS = 1_048_576
+
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_FILL = PatternFill("solid", fgColor="4F81BD")
+
+
+# ============================================================
+# RESUMEN
+# ============================================================
+def get_financial_summary(db: Session, start: Optional[date], end: Optional[date]) -> dict:
+    Sale = models.sale.Sale
+    Expense = models.expense.Expense
+
+    sales = db.query(
+        func.coalesce(func.sum(Sale.total_usd), 0),
+        func.count(Sale.id),
+    ).filter(Sale.status != "ANULADO", *date_filters(Sale.created_at, start, end)).one()
+
+    expenses = db.query(
+        func.coalesce(func.sum(Expense.amount_usd), 0),
+        func.count(Expense.id),
+    ).filter(*date_filters(Expense.created_at, start, end)).one()
+
+    income, sales_count = sales
+    expense, expenses_count = expenses
+
+    return {
+        "income": round(income, 2),
+        "expense": round(expense, 2),
+        "balance": round(income - expense, 2),
+        "sales_count": sales_count,
+        "expenses_count": expenses_count,
+    }
+
+
+# ============================================================
+# DATASETS DETALLADOS
+# ============================================================
+def _sales_query(start: Optional[date], end: Optional[date]):
+    Sale = models.sale.Sale
+    Client = models.client.Client
+    return select(
+        Sale.id, Sale.code, Sale.created_at, Client.name, Sale.seller_id,
+        Sale.status, Sale.payment_method, Sale.total_usd, Sale.paid_usd, Sale.balance_usd,
+    ).outerjoin(
+        Client, Client.id == Sale.client_id
+    ).where(
+        *date_filters(Sale.created_at, start, end)
+    ).order_by(Sale.created_at, Sale.id)
+
+
+def _expenses_query(start: Optional[date], end: Optional[date]):
+    Expense = models.expense.Expense
+    return select(
+        Expense.id, Expense.created_at, Expense.category, Expense.description,
+        Expense.payment_method, Expense.currency, Expense.amount, Expense.amount_usd,
+        Expense.created_by_name,
+    ).where(
+        *date_filters(Expense.created_at, start, end)
+    ).order_by(Expense.created_at, Expense.id)
+
+
+def _cash_movements_query(start: Optional[date], end: Optional[date]):
+    CashMovement = models.cash_movement.CashMovement
+    return select(
+        CashMovement.id, CashMovement.accounting_date, CashMovement.type, CashMovement.origin,
+        CashMovement.payment_method, CashMovement.amount_usd, CashMovement.description,
+        CashMovement.reference_code, CashMovement.status, CashMovement.cash_register_id,
+    ).where(
+        *date_filters(CashMovement.accounting_date, start, end)
+    ).order_by(CashMovement.accounting_date, CashMovement.id)
+
+
+# (clave, título de hoja, encabezados, consulta)
+DETAIL_SHEETS: Sequence[Tuple[str, str, List[str], Callable]] = (
+    ("sales", "Ventas", [
+        "ID", "Código", "Fecha", "Cliente", "Vendedor", "Estado", "Método",
+        "Total (USD)", "Pagado (USD)", "Saldo (USD)",
+    ], _sales_query),
+    ("expenses", "Gastos", [
+        "ID", "Fecha", "Categoría", "Descripción", "Método", "Moneda",
+        "Monto", "Monto (USD)", "Registrado por",
+    ], _expenses_query),
+    ("cash_movements", "Movimientos de caja", [
+        "ID", "Fecha contable", "Tipo", "Origen", "Método", "Monto (USD)",
+        "Descripción", "Referencia", "Estado", "Caja",
+    ], _cash_movements_query),
+)
+
+DETAIL_DATASETS = {key: (title, headers, query) for key, title, headers, query in DETAIL_SHEETS}
+
+
+def count_rows(db: Session, query) -> int:
+    """Total de filas de una consulta de detalle (para el % de avance)"""
+    return db.execute(
+        select(func.count()).select_from(query.order_by(None).subquery())
+    ).scalar_one()
+
+
+def excel_value(value):
+    """Convierte valores de la BD a algo que openpyxl pueda escribir"""
+    if isinstance(value, datetime):
+        # Excel no admite zona horaria: se escribe la hora local de la tienda
+        if value.tzinfo is not None:
+            value = value.astimezone(store_tz()).replace(tzinfo=None)
+        return value
+    if hasattr(value, "value"):  # Enum
+        return value.value
+    return value
+
+
+def stream_rows(db: Session, stmt) -> Iterator[tuple]:
+    """Filas de la consulta en lotes (cursor del lado del servidor)"""
+    result = db.execute(stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+    for row in result:
+        yield tuple(excel_value(v) for v in row)
+
+
+# ============================================================
+# ESCRITURA
+# ============================================================
+def _header(ws, titles: Iterable[str]) -> list:
+    cells = []
+    for title in titles:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.font = HEADER_FONT
+        cell.fill = HEADER_FILL
+        cell.alignment = Alignment(horizontal="center")
+        cells.append(cell)
+    return cells
+
+
+def _report(progress: Progress, written: int) -> None:
+    if progress and written % settings.EXPORT_BATCH_SIZE == 0:
+        progress(settings.EXPORT_BATCH_SIZE)
+
+
+def _write_sheet(
+    wb: Workbook,
+    title: str,
+    headers: List[str],
+    rows: Iterable[tuple],
+    progress: Progress = None,
+) -> int:
+    """Escribe las filas; si superan el límite de Excel continúa en 'Título (2)', ..."""
+    part = 1
+    ws = None
+    used = MAX_SHEET_ROWS
+    written = 0
+
+    for row in rows:
+        if used >= MAX_SHEET_ROWS:
+            ws = wb.create_sheet(title if part == 1 else f"{title} ({part})")
+            ws.freeze_panes = "A2"
+            ws.append(_header(ws, headers))
+            used = 1
+            part += 1
+        ws.append(row)
+        used += 1
+        written += 1
+        _report(progress, written)
+
+    if ws is None:
+        ws = wb.create_sheet(title)
+        ws.append(_header(ws, headers))
+
+    if progress:
+        progress(written % settings.EXPORT_BATCH_SIZE)
+    return written
+
+
+def write_financial_workbook(
+    db: Session,
+    path: str,
+    start: Optional[date],
+    end: Optional[date],
+    detail: bool = True,
+    progress: Progress = None,
+) -> None:
+    wb = Workbook(write_only=True)
+    summary = get_financial_summary(db, start, end)
+
+    ws = wb.create_sheet("Resumen")
+    ws.column_dimensions["A"].width = 30
+    ws.column_dimensions["B"].width = 20
+    ws.append(_header(ws, ["Concepto", "Valor (USD)"]))
+    ws.append(["Período", f"{start or 'Inicio'} → {end or 'Hoy'}"])
+    ws.append(["Ingresos", summary["income"]])
+    ws.append(["Egresos", summary["expense"]])
+    ws.append(["Balance", summary["balance"]])
+    ws.append(["Ventas", summary["sales_count"]])
+    ws.append(["Gastos", summary["expenses_count"]])
+
+    if detail:
+        for _, title, headers, query in DETAIL_SHEETS:
+            _write_sheet(wb, title, headers, stream_rows(db, query(start, end)), progress)
+
+    wb.save(path)
+
+
+def write_financial_pdf(db: Session, path: str, start: Optional[date], end: Optional[date]) -> None:
+    summary = get_financial_summary(db, start, end)
+
+    doc = SimpleDocTemplate(path, pagesize=A4)
+    styles = getSampleStyleSheet()
+    elements = []
+
+    if os.path.exists(LOGO_PATH):
+        elements.append(Image(LOGO_PATH, width=120, height=50))
+
+    elements.append(Paragraph("Reporte Financiero", styles["Title"]))
+    elements.append(Paragraph(
+        f"Período: {start or 'Inicio'} → {end or 'Hoy'}",
+        styles["Normal"]
+    ))
+
+    table = Table([
+        ["Concepto", "Monto (USD)"],
+        ["Ingresos", summary["income"]],
+        ["Egresos", summary["expense"]],
+        ["Balance", summary["balance"]],
+    ])
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#4F81BD")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ]))
+
+    elements.append(table)
+    doc.build(elements)
+
+
+def write_dataset_csv(
+    db: Session,
+    path: str,
+    dataset: str,
+    start: Optional[date],
+    end: Optional[date],
+    progress: Progress = None,
+) -> int:
+    """Un dataset de detalle (sales, expenses, cash_movements) como CSV"""
+    _, headers, query = DETAIL_DATASETS[dataset]
+    written = 0
+
+    # utf-8-sig: Excel reconoce los acentos al abrir el CSV
+    with open(path, "w", newline="", encoding="utf-8-sig") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(headers)
+        for row in stream_rows(db, query(start, end)):
+            writer.writerow(row)
+            written += 1
+            _report(progress, written)
+
+    if progress:
+        progress(written % settings.EXPORT_BATCH_SIZE)
+    return written
+
+
+def temp_export_path(suffix: str) -> str:
+    fd, path = tempfile.mkstemp(prefix="financial_", suffix=suffix, dir=settings.EXPORT_DIR or None)
+    os.close(fd)
+    return path
+
+
+def remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def export_financial_excel(
+    db: Session,
+    start: Optional[date],
+    end: Optional[date],
+    detail: bool = True,
+) -> str:
+    """Genera el Excel en un temporal y devuelve su ruta (el llamador lo borra)"""
+    path = temp_export_path(".xlsx")
+    try:
+        write_financial_workbook(db, path, start, end, detail)
+    except Exception:
+        remove_file(path)
+        raise
+    return path
+
+
+def export_financial_pdf(db: Session, start: Optional[date], end: Optional[date]) -> str:
+    path = temp_export_path(".pdf")
+    try:
+        write_financial_pdf(db, path, start, end)
+    except Exception:
+        remove_file(path)
+        raise
+    return path
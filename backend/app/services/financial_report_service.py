@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, case
 from datetime import date
 
+from app.core.dates import date_filters
 from app.db.models.cash_movement import CashMovement, MovementType
 from app.db.models.payment import Payment
 
@@ -17,7 +18,7 @@ def get_cash_flow_report(
         func.coalesce(func.sum(CashMovement.amount_usd), 0)
     ).filter(
         CashMovement.type == MovementType.INGRESO,
-        CashMovement.created_at.between(start_date, end_date)
+        *date_filters(CashMovement.created_at, start_date, end_date)
     ).scalar()
 
     # EGRESOS
@@ -25,7 +26,7 @@ def get_cash_flow_report(
         func.coalesce(func.sum(CashMovement.amount_usd), 0)
     ).filter(
         CashMovement.type == MovementType.EGRESO,
-        CashMovement.created_at.between(start_date, end_date)
+        *date_filters(CashMovement.created_at, start_date, end_date)
     ).scalar()
 
     # INGRESOS POR MÉTODO DE PAGO
@@ -35,7 +36,7 @@ def get_cash_flow_report(
     ).join(
         CashMovement, CashMovement.payment_id == Payment.id
     ).filter(
-        CashMovement.created_at.between(start_date, end_date)
+        *date_filters(CashMovement.created_at, start_date, end_date)
     ).group_by(
         Payment.method
     ).all()
@@ -46,7 +47,7 @@ def get_cash_flow_report(
         func.sum(CashMovement.amount_usd)
     ).filter(
         CashMovement.type == MovementType.EGRESO,
-        CashMovement.created_at.between(start_date, end_date)
+        *date_filters(CashMovement.created_at, start_date, end_date)
     ).group_by(
         CashMovement.category
     ).all()
@@ -74,7 +75,7 @@ def cash_summary(db: Session, start, end):
             case((CashMovement.type == "EXPENSE", CashMovement.amount), else_=0)
         ).label("expense")
     ).filter(
-        CashMovement.created_at.between(start, end)
+        *date_filters(CashMovement.created_at, start, end)
     ).one()
 
 def cash_by_method(db: Session, start, end):
@@ -82,14 +83,14 @@ def cash_by_method(db: Session, start, end):
         CashMovement.payment_method,
         func.sum(CashMovement.amount).label("total")
     ).filter(
-        CashMovement.created_at.between(start, end)
+        *date_filters(CashMovement.created_at, start, end)
     ).group_by(
         CashMovement.payment_method
     ).all()
 
 def cash_movements(db: Session, start, end):
     return db.query(CashMovement).filter(
-        CashMovement.created_at.between(start, end)
+        *date_filters(CashMovement.created_at, start, end)
     ).order_by(
         CashMovement.created_at.desc()
     ).all()
\ No newline at end of file
@@ -1,11 +1,14 @@
 from sqlalchemy.orm import Session
 from typing import Optional, Any
-from uuid import UUID
+from uuid import UUID, uuid4
 from decimal import Decimal
+from datetime import datetime, timezone
 from app.db.schemas.movement import MovementCreate
 from app.crud.movement import create_movement
 from app.db.models.movement import  Movement, MovementType
 from app.db.models.user import User
+from app.db.hooks import run_after_commit
+from app.services.audit_writer import audit_writer
 
 def log_movement(
     db: Session,
@@ -48,18 +51,30 @@ def create_movement(
     branch_id: int,
     user: User | None = None,
     amount_usd: Decimal | None = None,
+    commit: bool = True,
 ):
-    movement = Movement(
-        type=movement_type,
-        reference=reference,
-        description=description,
-        amount_usd=amount_usd,
-        user_id=user.id if user else None,
-        branch_id=branch_id,
-    )
+    """
+    Registra el evento en la cola de auditoría (se inserta en lote, ver
+    audit_writer): la operación de negocio no espera ese commit.
+    Devuelve el Movement armado, sin asociar a la sesión.
+    """
+    row = {
+        "id": uuid4(),
+        "type": movement_type.value,
+        "action": movement_type.value,
+        "entity": reference.split("-", 1)[0],
+        "reference": reference,
+        "description": description,
+        "amount_usd": amount_usd,
+        "user_id": user.id if user else None,
+        "branch_id": branch_id,
+        "created_at": datetime.now(timezone.utc),
+    }
 
-    db.add(movement)
-    db.commit()
-    db.refresh(movement)
+    # Dentro de una transacción mayor (checkout) se encola solo si confirma
+    if commit:
+        audit_writer.enqueue(row)
+    else:
+        run_after_commit(db, lambda: audit_writer.enqueue(row))
 
-    return movement
+    return Movement(**row)
@@ -6,6 +6,7 @@ from app.db.models.payment import Payment
 from app.db.models.cash_movement import CashMovement, MovementType
 from app.db.schemas.payment import PaymentCreate
 from fastapi import HTTPException, status
+from app.services.sales_rollup_service import apply_sale_change, sale_snapshot
 
 def process_sale_payments(
     *,
@@ -38,6 +39,7 @@ def process_sale_payments(
                     detail="Venta sin cliente no puede ir a crédito"
                 )
 
+    before = sale_snapshot(sale)
     created_payments = []
 
     for p in payments:
@@ -81,6 +83,7 @@ def process_sale_payments(
     else:
         sale.status = "PENDIENTE"
 
+    apply_sale_change(db, before, sale_snapshot(sale))
     db.commit()
     db.refresh(sale)
 
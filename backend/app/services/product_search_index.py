@@ -0,0 +1,272 @@
+# backend/app/services/product_search_index.py
+"""
+Índice de búsqueda de productos en memoria para el buscador del POS.
+
+- Plegado de acentos y mayúsculas ("Jabón" == "jabon").
+- Coincidencia por prefijo (código y palabras del nombre) con búsqueda
+  binaria sobre listas ordenadas; por subcadena solo si faltan resultados.
+- Ranking: código exacto > prefijo de código > prefijo de nombre >
+  prefijo de palabra > subcadena de código > subcadena de nombre > categoría.
+
+Se carga completo la primera vez y luego se mantiene de forma incremental
+desde create/update/delete/restock y los cambios de stock de ventas.
+Cada SEARCH_INDEX_REFRESH_SECONDS se releen los productos modificados
+(updated_at) para recoger cambios hechos por otros workers. La marca de
+agua retrocede SEARCH_INDEX_WATERMARK_OVERLAP_SECONDS: `now()` es el
+inicio de la transacción y una escritura que empezó antes pero confirmó
+después tendría un updated_at anterior a la marca.
+
+Las listas ordenadas solo se reconstruyen si cambia un código o un
+nombre; los cambios de precio o stock no reordenan nada.
+"""
+import bisect
+import logging
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+
+logger = logging.getLogger("app.search")
+
+
+def fold(text: Optional[str]) -> str:
+    """Minúsculas, sin acentos y con espacios normalizados"""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.lower().split())
+
+
+def product_payload(product) -> Dict[str, Any]:
+    """Fila compatible con ProductOut (incluye profit_margin real)"""
+    row = {
+        col.name: getattr(product, col.name)
+        for col in product.__table__.columns
+        if col.name != "search_vector"
+    }
+
+    sale = row.get("sale_price")
+    cost = row.get("cost_price")
+    row["profit_margin"] = (
+        round((1 - (cost / sale)) * 100, 2) if sale and cost and sale > 0 else None
+    )
+    return row
+
+
+@dataclass
+class _Entry:
+    id: int
+    code: str
+    name: str
+    category: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+
+class ProductSearchIndex:
+    # Rangos: menor = mejor
+    EXACT_CODE, CODE_PREFIX, NAME_PREFIX, WORD_PREFIX, CODE_SUBSTR, NAME_SUBSTR, CATEGORY, NO_MATCH = range(8)
+
+    def __init__(self, refresh_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self._entries: Dict[int, _Entry] = {}
+        self._code_keys: List[Tuple[str, int]] = []
+        self._word_keys: List[Tuple[str, int]] = []
+        self._ids: List[int] = []  # ordenados, para recent()
+        self._dirty = True
+        self._loaded = False
+        self._watermark: Optional[datetime] = None
+        self._last_refresh = 0.0
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------
+    # Carga y sincronización
+    # ------------------------------------------------------------
+    def ensure_fresh(self, db: Session) -> None:
+        if self._loaded and time.monotonic() - self._last_refresh < self.refresh_seconds:
+            return
+
+        with self._lock:
+            if not self._loaded:
+                self._load_all(db)
+            elif time.monotonic() - self._last_refresh >= self.refresh_seconds:
+                self._load_changed(db)
+
+    @staticmethod
+    def _watermark_from(db: Session) -> datetime:
+        now = db.scalar(select(func.now()))
+        return now - timedelta(seconds=settings.SEARCH_INDEX_WATERMARK_OVERLAP_SECONDS)
+
+    def _load_all(self, db: Session) -> None:
+        Product = models.product.Product
+        watermark = self._watermark_from(db)
+        products = db.query(Product).filter(Product.is_active == True).all()
+
+        self._entries = {p.id: self._entry(p) for p in products}
+        self._ids = sorted(self._entries)
+        self._dirty = True
+
+        self._watermark = watermark
+        self._loaded = True
+        self._last_refresh = time.monotonic()
+        logger.info("Índice de productos cargado: %s productos", len(self._entries))
+
+    def _load_changed(self, db: Session) -> None:
+        Product = models.product.Product
+        watermark = self._watermark_from(db)
+        changed = db.query(Product).filter(
+            or_(
+                Product.updated_at >= self._watermark,
+                Product.created_at >= self._watermark,
+            )
+        ).all()
+
+        for p in changed:
+            self._put(p)
+
+        self._watermark = watermark
+        self._last_refresh = time.monotonic()
+
+    @staticmethod
+    def _entry(product) -> _Entry:
+        return _Entry(
+            id=product.id,
+            code=fold(product.code),
+            name=fold(product.name),
+            category=fold(product.category),
+            payload=product_payload(product),
+        )
+
+    def _put(self, product) -> None:
+        if not product.is_active:
+            self._drop(product.id)
+            return
+
+        entry = self._entry(product)
+        previous = self._entries.get(product.id)
+        self._entries[product.id] = entry
+
+        if previous is None:
+            bisect.insort(self._ids, product.id)
+            self._dirty = True
+        elif previous.code != entry.code or previous.name != entry.name:
+            # Solo código y nombre forman las claves ordenadas
+            self._dirty = True
+
+    def _drop(self, product_id: int) -> None:
+        if self._entries.pop(product_id, None) is None:
+            return
+        i = bisect.bisect_left(self._ids, product_id)
+        if i < len(self._ids) and self._ids[i] == product_id:
+            del self._ids[i]
+        self._dirty = True
+
+    # ------------------------------------------------------------
+    # Mantenimiento incremental
+    # ------------------------------------------------------------
+    def upsert(self, product) -> None:
+        if not self._loaded:
+            return
+        with self._lock:
+            self._put(product)
+
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            self._drop(product_id)
+
+    def update_stock(self, stocks: Mapping[int, int]) -> None:
+        """El stock no forma parte de las claves: no requiere reordenar"""
+        with self._lock:
+            for product_id, stock in stocks.items():
+                entry = self._entries.get(product_id)
+                if entry is not None:
+                    entry.payload = {**entry.payload, "stock": stock}
+
+    def _rebuild_keys(self) -> None:
+        code_keys = []
+        word_keys = []
+        for entry in self._entries.values():
+            code_keys.append((entry.code, entry.id))
+            for word in set(entry.name.split()):
+                word_keys.append((word, entry.id))
+        code_keys.sort()
+        word_keys.sort()
+        self._code_keys = code_keys
+        self._word_keys = word_keys
+        self._dirty = False
+
+    # ------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------
+    @staticmethod
+    def _prefix_ids(keys: List[Tuple[str, int]], prefix: str):
+        i = bisect.bisect_left(keys, (prefix, -1))
+        while i < len(keys) and keys[i][0].startswith(prefix):
+            yield keys[i][1]
+            i += 1
+
+    def search(self, q: str, limit: int) -> List[Dict[str, Any]]:
+        term = fold(q)
+        if not term:
+            return self.recent(limit)
+
+        with self._lock:
+            if self._dirty:
+                self._rebuild_keys()
+
+            ranks: Dict[int, int] = {}
+
+            def rank(product_id: int, value: int) -> None:
+                if value < ranks.get(product_id, self.NO_MATCH):
+                    ranks[product_id] = value
+
+            for product_id in self._prefix_ids(self._code_keys, term):
+                rank(product_id, self.EXACT_CODE if self._entries[product_id].code == term else self.CODE_PREFIX)
+
+            first_word = term.split()[0]
+            for product_id in self._prefix_ids(self._word_keys, first_word):
+                entry = self._entries[product_id]
+                if entry.name.startswith(term):
+                    rank(product_id, self.NAME_PREFIX)
+                elif term in entry.name:
+                    rank(product_id, self.WORD_PREFIX)
+
+            # Subcadenas: solo si los prefijos no llenan la página
+            if len(ranks) < limit:
+                for entry in self._entries.values():
+                    if entry.id in ranks:
+                        continue
+                    if term in entry.code:
+                        rank(entry.id, self.CODE_SUBSTR)
+                    elif term in entry.name:
+                        rank(entry.id, self.NAME_SUBSTR)
+                    elif term in entry.category:
+                        rank(entry.id, self.CATEGORY)
+
+            ordered = sorted(ranks.items(), key=lambda item: (item[1], self._entries[item[0]].name))
+            return [self._entries[product_id].payload for product_id, _ in ordered[:limit]]
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            ids = self._ids[-limit:][::-1] if limit > 0 else []
+            return [self._entries[product_id].payload for product_id in ids]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self._loaded,
+            "products": len(self._entries),
+            "watermark": self._watermark,
+        }
+
+
+product_search_index = ProductSearchIndex(
+    refresh_seconds=settings.SEARCH_INDEX_REFRESH_SECONDS,
+)
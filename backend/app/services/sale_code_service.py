@@ -1,14 +1,7 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.db import models
-from datetime import datetime
+from app.core.dates import store_today
+from app.services.document_number_service import next_document_code
 
-def generate_sale_code(db: Session) -> str:
-    today = datetime.utcnow().strftime("%Y%m%d")
-
-    last_sale = db.query(models.sale.Sale).filter(
-        func.date(models.sale.Sale.created_at) == datetime.utcnow().date()
-    ).order_by(models.sale.Sale.id.desc()).with_for_update().first()
 
-    last_seq = int(last_sale.code.split("-")[-1]) if last_sale else 0
-    return f"VTA-{today}-{last_seq + 1:04d}"
+def generate_sale_code(db: Session) -> str:
+    return next_document_code(db, "VTA", width=4, day=store_today())
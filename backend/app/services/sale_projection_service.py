@@ -0,0 +1,149 @@
+# backend/app/services/sale_projection_service.py
+"""
+Proyección de ventas a `SaleOut` sin N+1.
+
+En vez de recorrer `sale.details`, `d.product`, `sale.payments` y
+`sale.client` por cada venta (carga perezosa, varias consultas por fila),
+se hacen tres consultas planas para toda la página:
+
+1. ventas + nombre/teléfono del cliente (LEFT JOIN)
+2. detalles + nombre del producto de todas esas ventas
+3. pagos de todas esas ventas
+
+y se arma la respuesta a partir de tuplas.
+"""
+from collections import defaultdict
+from typing import Dict, List, Sequence
+
+from sqlalchemy.orm import Session, Query
+
+from app.db import models
+from app.db.schemas.pos import SaleOut, SaleDetailOut, PaymentOut
+
+
+def _value(v):
+    """Enum -> valor plano (los estados/métodos mezclan Enum y str)"""
+    return v.value if hasattr(v, "value") else v
+
+
+def sale_rows_query(db: Session) -> Query:
+    """
+    Consulta base de columnas de venta. El llamador agrega filtros,
+    orden y límite.
+    """
+    Sale = models.sale.Sale
+    Client = models.client.Client
+
+    return db.query(
+        Sale.id,
+        Sale.code,
+        Sale.client_id,
+        Client.name.label("client_name"),
+        Client.phone.label("client_phone"),
+        Sale.seller_id,
+        Sale.subtotal_usd,
+        Sale.total_usd,
+        Sale.paid_usd,
+        Sale.balance_usd,
+        Sale.payment_method,
+        Sale.status,
+        Sale.created_at,
+    ).outerjoin(Client, Client.id == Sale.client_id)
+
+
+def _details_by_sale(db: Session, sale_ids: Sequence[int]) -> Dict[int, List[SaleDetailOut]]:
+    SaleDetail = models.sale_detail.SaleDetail
+    Product = models.product.Product
+
+    rows = db.query(
+        SaleDetail.sale_id,
+        SaleDetail.id,
+        SaleDetail.product_id,
+        Product.name,
+        SaleDetail.quantity,
+        SaleDetail.price_usd,
+        SaleDetail.subtotal_usd,
+    ).join(
+        Product, Product.id == SaleDetail.product_id
+    ).filter(
+        SaleDetail.sale_id.in_(sale_ids)
+    ).order_by(SaleDetail.sale_id, SaleDetail.id).all()
+
+    grouped: Dict[int, List[SaleDetailOut]] = defaultdict(list)
+    for sale_id, detail_id, product_id, product_name, quantity, price_usd, subtotal_usd in rows:
+        grouped[sale_id].append(SaleDetailOut(
+            id=detail_id,
+            product_id=product_id,
+            product_name=product_name,
+            quantity=quantity,
+            price_usd=price_usd,
+            subtotal_usd=subtotal_usd
+        ))
+    return grouped
+
+
+def _payments_by_sale(db: Session, sale_ids: Sequence[int]) -> Dict[int, List[PaymentOut]]:
+    Payment = models.payment.Payment
+
+    rows = db.query(
+        Payment.sale_id,
+        Payment.id,
+        Payment.method,
+        Payment.amount_usd,
+        Payment.reference_number,
+        Payment.created_at,
+    ).filter(
+        Payment.sale_id.in_(sale_ids)
+    ).order_by(Payment.sale_id, Payment.id).all()
+
+    grouped: Dict[int, List[PaymentOut]] = defaultdict(list)
+    for sale_id, payment_id, method, amount_usd, reference, created_at in rows:
+        grouped[sale_id].append(PaymentOut(
+            id=payment_id,
+            method=_value(method),
+            amount_usd=amount_usd,
+            reference=reference,
+            created_at=created_at
+        ))
+    return grouped
+
+
+def project_sales(db: Session, rows) -> List[SaleOut]:
+    """
+    Convierte filas de `sale_rows_query` en `SaleOut`.
+    Siempre ejecuta como máximo dos consultas adicionales.
+    """
+    if not rows:
+        return []
+
+    sale_ids = [row.id for row in rows]
+    details = _details_by_sale(db, sale_ids)
+    payments = _payments_by_sale(db, sale_ids)
+
+    return [
+        SaleOut(
+            id=row.id,
+            code=row.code,
+            client_id=row.client_id,
+            client_name=row.client_name,
+            client_phone=row.client_phone,
+            seller_id=row.seller_id,
+            subtotal_usd=row.subtotal_usd,
+            total_usd=row.total_usd,
+            paid_usd=row.paid_usd,
+            balance_usd=row.balance_usd,
+            payment_method=row.payment_method,
+            status=_value(row.status),
+            details=details.get(row.id, []),
+            payments=payments.get(row.id, []),
+            created_at=row.created_at
+        )
+        for row in rows
+    ]
+
+
+def get_sale_out(db: Session, sale_id: int) -> SaleOut | None:
+    row = sale_rows_query(db).filter(models.sale.Sale.id == sale_id).first()
+    if not row:
+        return None
+    return project_sales(db, [row])[0]
@@ -0,0 +1,108 @@
+# backend/app/services/sales_rollup_service.py
+"""
+Mantenimiento de `daily_sales_rollup`.
+
+Cada venta aporta a un bucket (día, sucursal, estado, vendedor). Cuando
+una operación cambia la venta se resta la foto anterior y se suma la
+nueva, dentro de la misma transacción. La venta se lee con
+`with_for_update()`: dos pagos (o un pago y una anulación) concurrentes
+que partan de la misma foto aplicarían deltas duplicados.
+
+    sale = db.query(Sale).filter(Sale.id == sale_id).with_for_update().first()
+    before = sale_snapshot(sale)
+    ... modificar venta ...
+    apply_sale_change(db, before, sale_snapshot(sale))
+
+Para una venta nueva `before` es None.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.dates import business_day
+from app.db import models
+
+Key = Tuple[date, int, str, int]
+
+
+@dataclass(frozen=True)
+class SaleSnapshot:
+    day: date
+    branch_id: int
+    status: str
+    seller_id: int
+    total_usd: float
+    paid_usd: float
+    balance_usd: float
+
+
+def rollup_day(created_at: Optional[datetime]) -> date:
+    """Día de negocio (zona de la tienda) al que pertenece la venta"""
+    return business_day(created_at)
+
+
+def sale_snapshot(sale) -> SaleSnapshot:
+    status = sale.status.value if hasattr(sale.status, "value") else sale.status
+    return SaleSnapshot(
+        day=rollup_day(sale.created_at),
+        branch_id=getattr(sale, "branch_id", None) or 0,
+        status=str(status or ""),
+        seller_id=sale.seller_id or 0,
+        total_usd=sale.total_usd or 0.0,
+        paid_usd=sale.paid_usd or 0.0,
+        balance_usd=sale.balance_usd or 0.0,
+    )
+
+
+def apply_sale_change(
+    db: Session,
+    before: Optional[SaleSnapshot],
+    after: Optional[SaleSnapshot],
+) -> None:
+    deltas: Dict[Key, list] = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+
+    for snap, sign in ((before, -1), (after, 1)):
+        if snap is None:
+            continue
+        d = deltas[(snap.day, snap.branch_id, snap.status, snap.seller_id)]
+        d[0] += sign
+        d[1] += sign * snap.total_usd
+        d[2] += sign * snap.paid_usd
+        d[3] += sign * snap.balance_usd
+
+    rows = [
+        {
+            "day": day,
+            "branch_id": branch_id,
+            "status": status,
+            "seller_id": seller_id,
+            "sales_count": count,
+            "total_usd": round(total, 2),
+            "paid_usd": round(paid, 2),
+            "balance_usd": round(balance, 2),
+        }
+        for (day, branch_id, status, seller_id), (count, total, paid, balance) in deltas.items()
+        if count or total or paid or balance
+    ]
+    if not rows:
+        return
+
+    Rollup = models.daily_sales_rollup.DailySalesRollup
+    stmt = pg_insert(Rollup).values(rows)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[Rollup.day, Rollup.branch_id, Rollup.status, Rollup.seller_id],
+            set_={
+                "sales_count": Rollup.sales_count + stmt.excluded.sales_count,
+                "total_usd": Rollup.total_usd + stmt.excluded.total_usd,
+                "paid_usd": Rollup.paid_usd + stmt.excluded.paid_usd,
+                "balance_usd": Rollup.balance_usd + stmt.excluded.balance_usd,
+                "updated_at": func.now(),
+            },
+        )
+    )
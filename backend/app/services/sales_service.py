@@ -1,5 +1,7 @@
 # backend/app/services/sale_service.py
 
+from collections import OrderedDict
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi import HTTPException
@@ -9,9 +11,46 @@ from app.db import models
 from app.services.movement_service import create_movement
 from app.db.models.movement import MovementType
 from app.services.sale_code_service import generate_sale_code
+from app.services.stock_service import decrement_stock
+from app.services.sales_rollup_service import apply_sale_change, sale_snapshot
+from app.services.cash_balance_service import record_movements
 from app.db.models.payment_enums import PaymentMethod, Currency
 
 
+CASH_METHODS = (
+    PaymentMethod.EFECTIVO,
+    PaymentMethod.DIVISA_EFECTIVO,
+)
+
+
+def _cart_quantities(items) -> "OrderedDict[int, int]":
+    """
+    Agrupa las líneas del carrito por producto.
+    Un mismo producto repetido en varias líneas se valida contra el stock
+    con la cantidad total.
+    """
+    quantities: "OrderedDict[int, int]" = OrderedDict()
+    for item in items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    return quantities
+
+
+def _load_cart_products(db: Session, product_ids) -> dict:
+    """
+    Carga precio y nombre de todos los productos del carrito en una sola
+    consulta, sin bloquear filas: el stock se valida y descuenta después
+    con un UPDATE condicional (ver stock_service).
+    """
+    Product = models.product.Product
+
+    products = db.query(Product).filter(
+        Product.id.in_(product_ids),
+        Product.is_active == True
+    ).all()
+
+    return {p.id: p for p in products}
+
+
 def create_sale_service(
     db: Session,
     payload,
@@ -41,23 +80,23 @@ def create_sale_service(
                     raise HTTPException(404, "Cliente no encontrado")
 
             # =====================================================
-            # 3. Productos y subtotal
+            # 3. Productos y subtotal (un solo SELECT, sin bloqueo)
             # =====================================================
-            subtotal = 0.0
-            details_data = []
+            if not payload.items:
+                raise HTTPException(400, "La venta no tiene productos")
 
-            for item in payload.items:
-                product = db.query(models.product.Product).filter(
-                    models.product.Product.id == item.product_id,
-                    models.product.Product.is_active == True
-                ).with_for_update().first()
+            quantities = _cart_quantities(payload.items)
+            products = _load_cart_products(db, list(quantities))
 
-                if not product:
-                    raise HTTPException(404, f"Producto {item.product_id} no encontrado")
+            for product_id in quantities:
+                if product_id not in products:
+                    raise HTTPException(404, f"Producto {product_id} no encontrado")
 
-                if product.stock < item.quantity:
-                    raise HTTPException(400, f"Stock insuficiente para {product.name}")
+            subtotal = 0.0
+            details_data = []
 
+            for item in payload.items:
+                product = products[item.product_id]
                 item_subtotal = round(product.sale_price * item.quantity, 2)
                 subtotal += item_subtotal
                 details_data.append((product, item, item_subtotal))
@@ -69,44 +108,14 @@ def create_sale_service(
                 raise HTTPException(400, "El total de la venta no es válido")
 
             # =====================================================
-            # 4. Crear venta
-            # =====================================================
-            sale = models.sale.Sale(
-                code=generate_sale_code(db),
-                client_id=client.id if client else None,
-                seller_id=current_user.id,
-                subtotal_usd=subtotal,
-                discount_usd=discount,
-                total_usd=total,
-                paid_usd=0.0,
-                balance_usd=total,
-                status=models.sale.SaleStatus.PENDING,
-                created_at=datetime.utcnow()
-            )
-            db.add(sale)
-            db.flush()
-
-            # =====================================================
-            # 5. Detalles y stock
+            # 4. Validar pagos antes de escribir
             # =====================================================
-            for product, item, item_subtotal in details_data:
-                db.add(models.sale_detail.SaleDetail(
-                    sale_id=sale.id,
-                    product_id=product.id,
-                    quantity=item.quantity,
-                    price_usd=product.sale_price,
-                    subtotal_usd=item_subtotal
-                ))
-                product.stock -= item.quantity
+            if not payload.payments:
+                raise HTTPException(400, "Debe registrar al menos un pago")
 
-            # =====================================================
-            # 6. Pagos (OPCIÓN B)
-            # =====================================================
             total_paid = 0.0
             credit_used = 0.0
-
-            if not payload.payments:
-                raise HTTPException(400, "Debe registrar al menos un pago")
+            payments_data = []
 
             for p in payload.payments:
                 amount = round(p.amount_usd, 2)
@@ -116,17 +125,6 @@ def create_sale_service(
 
                 method: PaymentMethod = p.method
 
-                payment = models.payment.Payment(
-                    sale_id=sale.id,
-                    method=method,
-                    currency=Currency.USD,
-                    amount=amount,
-                    amount_usd=amount,
-                    reference_number=p.reference
-                )
-                db.add(payment)
-                db.flush()
-
                 # -------------------------
                 # CRÉDITO
                 # -------------------------
@@ -136,40 +134,39 @@ def create_sale_service(
                     credit_used += amount
 
                 # -------------------------
-                # EFECTIVO (CAJA)
+                # EFECTIVO / BANCOS / DIGITAL
                 # -------------------------
-                elif method in (
-                    PaymentMethod.EFECTIVO,
-                    PaymentMethod.DIVISA_EFECTIVO,
-                ):
+                else:
                     total_paid += amount
 
-                    db.add(models.cash_movement.CashMovement(
-                        type=models.cash_movement.MovementType.INGRESO,
-                        amount=amount,
-                        amount_usd=amount,
-                        currency="USD",
-                        payment_method=method.value,
-                        reference=p.reference,
-                        reference_id=sale.id,
-                        description=f"Venta {sale.code}",
-                        category="VENTA",
-                        created_by_user_id=current_user.id,
-                        cash_register_id=cash_register.id,
-                        created_at=datetime.utcnow()
-                    ))
+                payments_data.append((p, method, amount))
 
-                # -------------------------
-                # NO CAJA (BANCOS / DIGITAL)
-                # -------------------------
-                else:
-                    total_paid += amount
+            # =====================================================
+            # 5. Descontar stock (UPDATE condicional atómico)
+            # =====================================================
+            stock = decrement_stock(db, quantities)
+
+            if not stock.ok:
+                names = ", ".join(products[product_id].name for product_id in stock.short)
+                raise HTTPException(400, f"Stock insuficiente para {names}")
 
             # =====================================================
-            # 7. Estado de la venta
+            # 6. Crear venta
             # =====================================================
-            sale.paid_usd = round(total_paid, 2)
-            sale.balance_usd = round(total - total_paid, 2)
+            now = datetime.utcnow()
+
+            sale = models.sale.Sale(
+                code=generate_sale_code(db),
+                client_id=client.id if client else None,
+                seller_id=current_user.id,
+                subtotal_usd=subtotal,
+                discount_usd=discount,
+                total_usd=total,
+                paid_usd=round(total_paid, 2),
+                balance_usd=round(total - total_paid, 2),
+                status=models.sale.SaleStatus.PENDING,
+                created_at=now
+            )
 
             if sale.balance_usd <= 0:
                 sale.status = models.sale.SaleStatus.PAID
@@ -179,8 +176,74 @@ def create_sale_service(
                 sale.status = models.sale.SaleStatus.CREDIT
                 client.balance = round((client.balance or 0) + credit_used, 2)
 
+            db.add(sale)
+            db.flush()
+            apply_sale_change(db, None, sale_snapshot(sale))
+
+            # =====================================================
+            # 7. Detalles (INSERT en bloque)
+            # =====================================================
+            db.execute(
+                insert(models.sale_detail.SaleDetail),
+                [
+                    {
+                        "sale_id": sale.id,
+                        "product_id": product.id,
+                        "quantity": item.quantity,
+                        "price_usd": product.sale_price,
+                        "subtotal_usd": item_subtotal,
+                    }
+                    for product, item, item_subtotal in details_data
+                ]
+            )
+
+            # =====================================================
+            # 8. Pagos y movimientos de caja (INSERT en bloque)
+            # =====================================================
+            payment_ids = db.scalars(
+                insert(models.payment.Payment).returning(
+                    models.payment.Payment.id,
+                    sort_by_parameter_order=True
+                ),
+                [
+                    {
+                        "sale_id": sale.id,
+                        "method": method,
+                        "currency": Currency.USD,
+                        "amount": amount,
+                        "amount_usd": amount,
+                        "reference_number": p.reference,
+                    }
+                    for p, method, amount in payments_data
+                ]
+            ).all()
+
+            cash_rows = [
+                {
+                    "type": models.cash_movement.MovementType.INGRESO,
+                    "amount": amount,
+                    "amount_usd": amount,
+                    "currency": "USD",
+                    "payment_method": method.value,
+                    "reference": p.reference,
+                    "payment_id": payment_id,
+                    "reference_id": sale.id,
+                    "description": f"Venta {sale.code}",
+                    "category": "VENTA",
+                    "created_by_user_id": current_user.id,
+                    "cash_register_id": cash_register.id,
+                    "created_at": now,
+                }
+                for (p, method, amount), payment_id in zip(payments_data, payment_ids)
+                if method in CASH_METHODS
+            ]
+
+            if cash_rows:
+                db.execute(insert(models.cash_movement.CashMovement), cash_rows)
+                record_movements(db, cash_rows)
+
             # =====================================================
-            # 8. Movimiento general
+            # 9. Movimiento general (mismo commit que la venta)
             # =====================================================
             create_movement(
                 db=db,
@@ -189,7 +252,9 @@ def create_sale_service(
                 description=f"Venta {sale.code} registrada por {current_user.name}",
                 amount_usd=sale.total_usd,
                 user=current_user,
-                branch_id=current_user.branch_id,
+                # User no tiene sucursal (ni la caja): el evento queda sin branch_id
+                branch_id=None,
+                commit=False,
             )
 
             return sale
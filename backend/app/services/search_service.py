@@ -0,0 +1,84 @@
+# backend/app/services/search_service.py
+"""
+Búsqueda en PostgreSQL (SEARCH_BACKEND=postgres).
+
+Alternativa al índice en memoria cuando hay varios workers o catálogos
+muy grandes. Usa:
+- `search_vector` (tsvector 'spanish', columna generada) con índice GIN
+- índices GIN `gin_trgm_ops` para similitud y ILIKE '%q%'
+
+Los resultados se ordenan por relevancia: coincidencia exacta de código,
+luego ts_rank + similitud de trigramas.
+"""
+from typing import Any, Dict, List
+
+from sqlalchemy import case, func, literal_column, or_
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.services.product_search_index import product_payload
+
+SPANISH = literal_column("'spanish'::regconfig")
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_products_db(db: Session, q: str, limit: int) -> List[Dict[str, Any]]:
+    Product = models.product.Product
+    term = q.strip()
+    pattern = _like_pattern(term)
+    tsquery = func.websearch_to_tsquery(SPANISH, term)
+
+    relevance = (
+        case((func.lower(Product.code) == term.lower(), 10.0), else_=0.0)
+        + func.ts_rank(Product.search_vector, tsquery)
+        + func.greatest(
+            func.similarity(Product.name, term),
+            func.similarity(Product.code, term),
+        )
+    )
+
+    products = db.query(Product).filter(
+        Product.is_active == True,
+        or_(
+            Product.search_vector.op("@@")(tsquery),
+            Product.name.op("%")(term),
+            Product.code.ilike(pattern),
+            Product.name.ilike(pattern),
+        )
+    ).order_by(
+        relevance.desc(),
+        Product.name
+    ).limit(limit).all()
+
+    return [product_payload(p) for p in products]
+
+
+def search_clients_db(db: Session, q: str, limit: int):
+    Client = models.client.Client
+    term = q.strip()
+    pattern = _like_pattern(term)
+    tsquery = func.websearch_to_tsquery(SPANISH, term)
+
+    relevance = (
+        case((Client.document == term, 10.0), else_=0.0)
+        + func.ts_rank(Client.search_vector, tsquery)
+        + func.similarity(Client.name, term)
+    )
+
+    return db.query(Client).filter(
+        Client.is_active == True,
+        or_(
+            Client.search_vector.op("@@")(tsquery),
+            Client.name.op("%")(term),
+            Client.name.ilike(pattern),
+            Client.document.ilike(pattern),
+            Client.phone.ilike(pattern),
+        )
+    ).order_by(
+        relevance.desc(),
+        Client.name
+    ).limit(limit).all()
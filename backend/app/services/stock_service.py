@@ -0,0 +1,140 @@
+# backend/app/services/stock_service.py
+"""
+Mutaciones de stock atómicas.
+
+En lugar de leer el producto con FOR UPDATE y luego escribir
+`product.stock -= qty`, cada lote de cambios se aplica con un único
+UPDATE ... FROM (VALUES ...) condicional. El bloqueo de fila dura lo que
+dura la transacción corta que lo ejecuta y no toda la petición.
+
+El UPDATE bloquea las filas en el orden en que el plan recorre el join,
+no en el del carrito. Antes de cada lote se bloquean las filas con un
+SELECT ... ORDER BY id FOR UPDATE: dos ventas con los mismos productos en
+distinto orden esperan una a la otra en vez de bloquearse en cruz.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping
+
+from sqlalchemy import Integer, column, func, select, update, values
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.hooks import run_after_commit
+from app.services.product_search_index import product_search_index
+from app.services.barcode_cache import barcode_cache
+
+
+@dataclass
+class StockResult:
+    """Resultado de un lote de cambios de stock"""
+    updated: Dict[int, int] = field(default_factory=dict)   # product_id -> stock nuevo
+    short: List[int] = field(default_factory=list)          # product_id sin stock suficiente
+
+    @property
+    def ok(self) -> bool:
+        return not self.short
+
+
+def _quantities_table(quantities: Mapping[int, int]):
+    return values(
+        column("product_id", Integer),
+        column("qty", Integer),
+        name="stock_changes",
+    ).data([(product_id, quantities[product_id]) for product_id in sorted(quantities)])
+
+
+def _lock_rows(db: Session, product_ids) -> None:
+    """Bloquea las filas de productos en orden de id"""
+    Product = models.product.Product
+    db.execute(
+        select(Product.id)
+        .where(Product.id.in_(sorted(product_ids)))
+        .order_by(Product.id)
+        .with_for_update()
+    )
+
+
+def decrement_stock(db: Session, quantities: Mapping[int, int]) -> StockResult:
+    """
+    Bloquea las filas en orden de id y descuenta stock en un solo UPDATE:
+
+        UPDATE products SET stock = stock - v.qty
+        FROM (VALUES ...) v
+        WHERE products.id = v.product_id AND products.stock >= v.qty
+        RETURNING products.id, products.stock
+
+    Las líneas que no aparecen en el RETURNING quedaron cortas (o el
+    producto no existe / está inactivo). El llamador decide si aborta la
+    transacción.
+    """
+    if not quantities:
+        return StockResult()
+
+    Product = models.product.Product
+    changes = _quantities_table(quantities)
+    _lock_rows(db, quantities)
+
+    rows = db.execute(
+        update(Product)
+        .where(
+            Product.id == changes.c.product_id,
+            Product.is_active == True,
+            Product.stock >= changes.c.qty,
+        )
+        .values(stock=Product.stock - changes.c.qty)
+        .returning(Product.id, Product.stock)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    updated = {product_id: stock for product_id, stock in rows}
+    short = [product_id for product_id in quantities if product_id not in updated]
+    _after_stock_change(db, updated)
+
+    return StockResult(updated=updated, short=short)
+
+
+def increment_stock(db: Session, quantities: Mapping[int, int]) -> StockResult:
+    """
+    Repone stock (anulaciones, reabastecimiento) en un solo UPDATE.
+    Los productos inexistentes se reportan en `short`.
+    """
+    if not quantities:
+        return StockResult()
+
+    Product = models.product.Product
+    changes = _quantities_table(quantities)
+    _lock_rows(db, quantities)
+
+    rows = db.execute(
+        update(Product)
+        .where(Product.id == changes.c.product_id)
+        .values(stock=Product.stock + changes.c.qty)
+        .returning(Product.id, Product.stock)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    updated = {product_id: stock for product_id, stock in rows}
+    short = [product_id for product_id in quantities if product_id not in updated]
+    _after_stock_change(db, updated)
+
+    return StockResult(updated=updated, short=short)
+
+
+def _after_stock_change(db: Session, updated: Dict[int, int]) -> None:
+    """Refleja el stock nuevo en el buscador y la caché de escaneo al confirmar"""
+    if updated:
+        run_after_commit(db, lambda: product_search_index.update_stock(updated))
+        run_after_commit(db, lambda: barcode_cache.update_stock(updated))
+
+
+def sale_quantities(db: Session, sale_id: int) -> Dict[int, int]:
+    """Cantidades por producto de una venta (para reponer al anular)"""
+    SaleDetail = models.sale_detail.SaleDetail
+
+    rows = db.execute(
+        select(SaleDetail.product_id, func.sum(SaleDetail.quantity))
+        .where(SaleDetail.sale_id == sale_id)
+        .group_by(SaleDetail.product_id)
+    ).all()
+
+    return {product_id: int(qty) for product_id, qty in rows}
@@ -0,0 +1,60 @@
+"""add document sequences
+
+Revision ID: 5b2e8c1f9a47
+Revises: ac39a83deb73
+Create Date: 2026-10-17 09:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e8c1f9a47'
+down_revision: Union[str, None] = 'ac39a83deb73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('document_sequences',
+    sa.Column('prefix', sa.String(length=20), nullable=False),
+    sa.Column('branch_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('last_value', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('prefix', 'branch_id', 'day')
+    )
+
+    # Continuar la numeración de los códigos ya emitidos (VTA- y VENTA-)
+    op.execute("""
+        INSERT INTO document_sequences (prefix, branch_id, day, last_value)
+        SELECT split_part(code, '-', 1),
+               0,
+               to_date(split_part(code, '-', 2), 'YYYYMMDD'),
+               max(substring(code from '[0-9]+$')::int)
+        FROM sales
+        WHERE code ~ '^(VTA|VENTA)-[0-9]{8}-[0-9]+$'
+        GROUP BY 1, 2, 3
+    """)
+
+    # ... y la de los egresos (EGRESO-). expenses.code no es único: sin
+    # esto, el día del despliegue se repetirían los códigos del día
+    expense_columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("expenses")}
+    if "code" in expense_columns:
+        op.execute("""
+            INSERT INTO document_sequences (prefix, branch_id, day, last_value)
+            SELECT 'EGRESO',
+                   0,
+                   to_date(split_part(code, '-', 2), 'YYYYMMDD'),
+                   max(substring(code from '[0-9]+$')::int)
+            FROM expenses
+            WHERE code ~ '^EGRESO-[0-9]{8}-[0-9]+$'
+            GROUP BY 1, 2, 3
+        """)
+
+
+def downgrade() -> None:
+    op.drop_table('document_sequences')
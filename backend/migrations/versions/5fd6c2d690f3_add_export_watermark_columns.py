@@ -0,0 +1,39 @@
+"""add export watermark columns
+
+Revision ID: 5fd6c2d690f3
+Revises: da64c78e6fd1
+Create Date: 2026-10-17 17:05:12.604331
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5fd6c2d690f3'
+down_revision: Union[str, None] = 'da64c78e6fd1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # sales.updated_at quedaba NULL hasta la primera modificación
+    op.execute("UPDATE sales SET updated_at = created_at WHERE updated_at IS NULL")
+    op.alter_column('sales', 'updated_at', server_default=sa.text('now()'))
+
+    op.add_column('cash_movements', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.execute("UPDATE cash_movements SET updated_at = created_at WHERE created_at IS NOT NULL")
+
+    op.create_index('idx_sales_updated_at', 'sales', ['updated_at'], unique=False)
+    op.create_index('idx_cash_updated_at', 'cash_movements', ['updated_at'], unique=False)
+    op.create_index('idx_payments_created_at', 'payments', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_payments_created_at', table_name='payments')
+    op.drop_index('idx_cash_updated_at', table_name='cash_movements')
+    op.drop_index('idx_sales_updated_at', table_name='sales')
+    op.drop_column('cash_movements', 'updated_at')
+    op.alter_column('sales', 'updated_at', server_default=None)
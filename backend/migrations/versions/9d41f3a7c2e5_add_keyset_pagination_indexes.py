@@ -0,0 +1,27 @@
+"""add keyset pagination indexes
+
+Revision ID: 9d41f3a7c2e5
+Revises: 5b2e8c1f9a47
+Create Date: 2026-10-17 10:03:48.215904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d41f3a7c2e5'
+down_revision: Union[str, None] = '5b2e8c1f9a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_sales_created_at_id', 'sales', ['created_at', 'id'], unique=False)
+    op.create_index('idx_movements_created_at_id', 'movements', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_movements_created_at_id', table_name='movements')
+    op.drop_index('idx_sales_created_at_id', table_name='sales')
@@ -0,0 +1,63 @@
+"""add trigram and full-text search
+
+Revision ID: c7a09e64b1d3
+Revises: 9d41f3a7c2e5
+Create Date: 2026-10-17 11:27:05.661390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a09e64b1d3'
+down_revision: Union[str, None] = '9d41f3a7c2e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column('products', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "to_tsvector('spanish', coalesce(code, '') || ' ' || coalesce(name, '') || ' ' || coalesce(category, ''))",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index('idx_products_search_vector', 'products', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('idx_products_name_trgm', 'products', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('idx_products_code_trgm', 'products', ['code'], unique=False, postgresql_using='gin', postgresql_ops={'code': 'gin_trgm_ops'})
+
+    op.add_column('clients', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "to_tsvector('spanish', coalesce(name, '') || ' ' || coalesce(document, '') || ' ' || coalesce(phone, ''))",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index('idx_clients_search_vector', 'clients', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('idx_clients_name_trgm', 'clients', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('idx_clients_document_trgm', 'clients', ['document'], unique=False, postgresql_using='gin', postgresql_ops={'document': 'gin_trgm_ops'})
+    op.create_index('idx_clients_phone_trgm', 'clients', ['phone'], unique=False, postgresql_using='gin', postgresql_ops={'phone': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('idx_clients_phone_trgm', table_name='clients')
+    op.drop_index('idx_clients_document_trgm', table_name='clients')
+    op.drop_index('idx_clients_name_trgm', table_name='clients')
+    op.drop_index('idx_clients_search_vector', table_name='clients')
+    op.drop_column('clients', 'search_vector')
+
+    op.drop_index('idx_products_code_trgm', table_name='products')
+    op.drop_index('idx_products_name_trgm', table_name='products')
+    op.drop_index('idx_products_search_vector', table_name='products')
+    op.drop_column('products', 'search_vector')
@@ -0,0 +1,52 @@
+"""add cash register balances
+
+Revision ID: da64c78e6fd1
+Revises: fa55fe8e13ad
+Create Date: 2026-10-17 16:20:34.118905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'da64c78e6fd1'
+down_revision: Union[str, None] = 'fa55fe8e13ad'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'cash_register_balances',
+        sa.Column('cash_register_id', sa.Integer(), nullable=False),
+        sa.Column('payment_method', sa.String(length=50), nullable=False),
+        sa.Column('income_usd', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('expense_usd', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('movements_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['cash_register_id'], ['cash_registers.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('cash_register_id', 'payment_method')
+    )
+
+    # Saldos de las cajas existentes (mismo criterio que cash_balance_service)
+    op.execute("""
+        INSERT INTO cash_register_balances
+            (cash_register_id, payment_method, income_usd, expense_usd, movements_count)
+        SELECT
+            cash_register_id,
+            COALESCE(payment_method, ''),
+            ROUND(COALESCE(SUM(CASE WHEN type = 'INGRESO' THEN amount_usd ELSE 0 END), 0)::numeric, 2),
+            ROUND(COALESCE(SUM(CASE WHEN type = 'INGRESO' THEN 0 ELSE amount_usd END), 0)::numeric, 2),
+            COUNT(*)
+        FROM cash_movements
+        WHERE cash_register_id IS NOT NULL
+          AND status = 'CONFIRMADO'
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('cash_register_balances')
@@ -0,0 +1,45 @@
+"""revoked tokens by jti
+
+Revision ID: e3f58a2d90c6
+Revises: c7a09e64b1d3
+Create Date: 2026-10-17 12:14:37.902118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3f58a2d90c6'
+down_revision: Union[str, None] = 'c7a09e64b1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Los tokens emitidos antes de tener jti se identifican por sha256(token)
+    op.execute("DELETE FROM revoked_tokens WHERE expires_at IS NOT NULL AND expires_at < now()")
+
+    op.add_column('revoked_tokens', sa.Column('jti', sa.String(length=64), nullable=True))
+    op.execute("UPDATE revoked_tokens SET jti = encode(sha256(convert_to(token, 'UTF8')), 'hex')")
+    op.alter_column('revoked_tokens', 'jti', nullable=False)
+
+    op.create_index(op.f('ix_revoked_tokens_jti'), 'revoked_tokens', ['jti'], unique=True)
+    op.create_index(op.f('ix_revoked_tokens_expires_at'), 'revoked_tokens', ['expires_at'], unique=False)
+
+    op.execute("DROP INDEX IF EXISTS ix_revoked_tokens_token")
+    op.drop_column('revoked_tokens', 'token')
+
+
+def downgrade() -> None:
+    # El token completo no se puede reconstruir: se conserva el jti
+    op.add_column('revoked_tokens', sa.Column('token', sa.String(length=2000), nullable=True))
+    op.execute("UPDATE revoked_tokens SET token = jti")
+    op.alter_column('revoked_tokens', 'token', nullable=False)
+    op.create_index(op.f('ix_revoked_tokens_token'), 'revoked_tokens', ['token'], unique=True)
+
+    op.drop_index(op.f('ix_revoked_tokens_expires_at'), table_name='revoked_tokens')
+    op.drop_index(op.f('ix_revoked_tokens_jti'), table_name='revoked_tokens')
+    op.drop_column('revoked_tokens', 'jti')
@@ -0,0 +1,56 @@
+"""add daily sales rollup
+
+Revision ID: f1b7c4e2a853
+Revises: e3f58a2d90c6
+Create Date: 2026-10-17 13:02:51.447210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b7c4e2a853'
+down_revision: Union[str, None] = 'e3f58a2d90c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_sales_rollup',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('branch_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('seller_id', sa.Integer(), nullable=False),
+        sa.Column('sales_count', sa.Integer(), nullable=False),
+        sa.Column('total_usd', sa.Float(), nullable=False),
+        sa.Column('paid_usd', sa.Float(), nullable=False),
+        sa.Column('balance_usd', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('day', 'branch_id', 'status', 'seller_id')
+    )
+
+    # Cargar el histórico (mismo criterio de día que sales_rollup_service: UTC)
+    op.execute("""
+        INSERT INTO daily_sales_rollup
+            (day, branch_id, status, seller_id, sales_count, total_usd, paid_usd, balance_usd)
+        SELECT
+            (created_at AT TIME ZONE 'UTC')::date,
+            0,
+            COALESCE(status::text, ''),
+            COALESCE(seller_id, 0),
+            COUNT(*),
+            COALESCE(SUM(total_usd), 0),
+            COALESCE(SUM(paid_usd), 0),
+            COALESCE(SUM(balance_usd), 0)
+        FROM sales
+        WHERE created_at IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('daily_sales_rollup')
@@ -0,0 +1,74 @@
+"""date range report indexes
+
+Revision ID: fa55fe8e13ad
+Revises: f1b7c4e2a853
+Create Date: 2026-10-17 15:41:07.392518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fa55fe8e13ad'
+down_revision: Union[str, None] = 'f1b7c4e2a853'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columnas que CashFlowService ya escribe y que faltaban en el modelo
+CASH_MOVEMENT_COLUMNS = (
+    "origin VARCHAR(30)",
+    "status VARCHAR(20) NOT NULL DEFAULT 'CONFIRMADO'",
+    "category VARCHAR(100)",
+    "notes VARCHAR(500)",
+    "reference_id VARCHAR(50)",
+    "reference_code VARCHAR(50)",
+    "created_by_name VARCHAR(255)",
+    "accounting_date TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()",
+)
+
+
+def upgrade() -> None:
+    for column in CASH_MOVEMENT_COLUMNS:
+        op.execute(f"ALTER TABLE cash_movements ADD COLUMN IF NOT EXISTS {column}")
+
+    # Movimientos previos: la fecha contable es la de creación
+    op.execute("""
+        UPDATE cash_movements
+        SET accounting_date = created_at
+        WHERE created_at IS NOT NULL AND accounting_date > created_at
+    """)
+
+    op.create_index('idx_sales_status_created_at', 'sales', ['status', 'created_at'], unique=False, if_not_exists=True)
+    op.create_index('idx_expenses_created_at', 'expenses', ['created_at'], unique=False, if_not_exists=True)
+    op.create_index('idx_cash_status_accounting_date', 'cash_movements', ['status', 'accounting_date'], unique=False, if_not_exists=True)
+
+    # El rollup pasa de días UTC a días de la tienda: recalcular el histórico
+    op.execute("DELETE FROM daily_sales_rollup")
+    op.execute(sa.text("""
+        INSERT INTO daily_sales_rollup
+            (day, branch_id, status, seller_id, sales_count, total_usd, paid_usd, balance_usd)
+        SELECT
+            (created_at AT TIME ZONE :tz)::date,
+            0,
+            COALESCE(status::text, ''),
+            COALESCE(seller_id, 0),
+            COUNT(*),
+            COALESCE(SUM(total_usd), 0),
+            COALESCE(SUM(paid_usd), 0),
+            COALESCE(SUM(balance_usd), 0)
+        FROM sales
+        WHERE created_at IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    """).bindparams(tz=settings.STORE_TIMEZONE))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_cash_status_accounting_date', table_name='cash_movements')
+    op.drop_index('idx_expenses_created_at', table_name='expenses')
+    op.drop_index('idx_sales_status_created_at', table_name='sales')
+    # Las columnas de cash_movements se conservan: el código de caja las usa
@@ -0,0 +1,144 @@
+# backend/tests/test_audit_writer.py
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.core.config import settings
+from app.services import audit_writer as module
+from app.services.audit_writer import AuditWriter
+
+
+class FakeEngine:
+    """Engine falso: guarda las filas insertadas o falla como la BD real"""
+
+    def __init__(self):
+        self.rows = []
+        self.down = False
+        self.rejected = set()   # referencias que violan una restricción
+
+    @contextmanager
+    def begin(self):
+        yield self
+
+    def execute(self, stmt, rows):
+        if self.down:
+            raise OperationalError("INSERT", {}, Exception("conexión rechazada"))
+        if any(row["reference"] in self.rejected for row in rows):
+            raise IntegrityError("INSERT", {}, Exception("violación de restricción"))
+        self.rows.extend(rows)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = FakeEngine()
+    monkeypatch.setattr(module, "engine", engine)
+    return engine
+
+
+@pytest.fixture
+def fallback(monkeypatch, tmp_path):
+    path = tmp_path / "audit_fallback.jsonl"
+    monkeypatch.setattr(settings, "AUDIT_FALLBACK_PATH", str(path))
+    monkeypatch.setattr(settings, "AUDIT_BATCH_SIZE", 2)
+    return path
+
+
+def _event(reference):
+    return {
+        "id": uuid.uuid4(),
+        "type": "SALE",
+        "reference": reference,
+        "amount_usd": Decimal("10.50"),
+        "created_at": datetime(2026, 1, 5, 15, 0, tzinfo=timezone.utc),
+    }
+
+
+def test_failed_batch_goes_to_fallback(engine, fallback):
+    engine.down = True
+    writer = AuditWriter()
+
+    writer.enqueue(_event("SALE-1"))
+
+    lines = fallback.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["reference"] for line in lines] == ["SALE-1"]
+    stats = writer.stats()
+    assert (stats["failed_batches"], stats["fallback_rows"], stats["fallback_pending"]) == (1, 1, True)
+
+
+def test_replay_restores_original_rows_and_removes_file(engine, fallback):
+    engine.down = True
+    writer = AuditWriter()
+    events = [_event(f"SALE-{i}") for i in range(3)]
+    for event in events:
+        writer.enqueue(event)
+
+    engine.down = False
+    assert writer.replay_fallback() == 3
+
+    # Mismos ids y tipos que el evento original (ON CONFLICT los deduplica)
+    assert engine.rows == events
+    assert not os.path.exists(fallback)
+    assert not os.path.exists(f"{fallback}.replay")
+    assert not writer.stats()["fallback_pending"]
+
+
+def test_replay_keeps_file_while_database_is_down(engine, fallback):
+    engine.down = True
+    writer = AuditWriter()
+    writer.enqueue(_event("SALE-1"))
+
+    assert writer.replay_fallback() == 0
+    assert os.path.exists(f"{fallback}.replay")
+
+    # Lo que llega mientras tanto va a un archivo nuevo y no se pierde
+    writer.enqueue(_event("SALE-2"))
+    engine.down = False
+    assert writer.replay_fallback() == 1
+    assert writer.replay_fallback() == 1
+    assert [row["reference"] for row in engine.rows] == ["SALE-1", "SALE-2"]
+
+
+def test_rejected_row_is_dead_lettered_without_blocking_the_rest(engine, fallback):
+    engine.down = True
+    writer = AuditWriter()
+    for reference in ("SALE-1", "SALE-2", "SALE-3"):
+        writer.enqueue(_event(reference))
+
+    engine.down = False
+    engine.rejected = {"SALE-2"}
+
+    assert writer.replay_fallback() == 2
+    assert [row["reference"] for row in engine.rows] == ["SALE-1", "SALE-3"]
+    [dead] = open(f"{fallback}.dead", encoding="utf-8").read().splitlines()
+    assert json.loads(dead)["row"]["reference"] == "SALE-2"
+    assert writer.stats()["dead_rows"] == 1
+
+
+def test_unreadable_line_is_dead_lettered(engine, fallback):
+    fallback.write_text('{"reference": "SALE-1", "type": "SALE"}\n{no es json\n', encoding="utf-8")
+    writer = AuditWriter()
+
+    assert writer.replay_fallback() == 1
+    [dead] = open(f"{fallback}.dead", encoding="utf-8").read().splitlines()
+    assert json.loads(dead)["line"] == "{no es json"
+
+
+def test_stop_flushes_queued_events(engine, fallback, monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_FLUSH_INTERVAL_SECONDS", 60)
+    monkeypatch.setattr(settings, "AUDIT_BATCH_SIZE", 100)
+    writer = AuditWriter()
+    writer.start()
+
+    writer.enqueue(_event("SALE-1"))
+    writer.enqueue(_event("SALE-2"))
+    writer.stop()
+
+    assert not writer.running
+    assert [row["reference"] for row in engine.rows] == ["SALE-1", "SALE-2"]
+    assert writer.stats()["batches"] == 1
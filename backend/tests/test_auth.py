@@ -1 +1,53 @@
+# backend/tests/test_auth.py
+import time
 
+from app.core.principal_cache import PrincipalCache
+from app.db.models.user import User
+
+
+# ============================================================
+# CACHÉ DEL USUARIO AUTENTICADO
+# ============================================================
+def _user(user_id):
+    return User(id=user_id, name=f"Usuario {user_id}", email=f"u{user_id}@example.com")
+
+
+def test_lru_eviction_prunes_user_index():
+    cache = PrincipalCache(max_entries=2, ttl_seconds=60)
+    cache.put("t1", _user(1))
+    cache.put("t2", _user(1))
+    cache.put("t3", _user(2))
+
+    # t1 salió por LRU; el usuario 1 solo conserva t2
+    assert cache.get("t1") is None
+    assert cache._keys_by_user == {1: {"t2"}, 2: {"t3"}}
+
+    cache.put("t4", _user(3))
+    cache.put("t5", _user(3))
+
+    # Los conjuntos vacíos se borran
+    assert cache._keys_by_user == {3: {"t4", "t5"}}
+
+
+def test_expired_entry_prunes_user_index(monkeypatch):
+    cache = PrincipalCache(max_entries=10, ttl_seconds=30)
+    cache.put("t1", _user(1))
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 31)
+
+    assert cache.get("t1") is None
+    assert cache._keys_by_user == {}
+
+
+def test_invalidate_user_drops_all_their_tokens():
+    cache = PrincipalCache(max_entries=10, ttl_seconds=60)
+    cache.put("t1", _user(1))
+    cache.put("t2", _user(1))
+    cache.put("t3", _user(2))
+
+    cache.invalidate_user(1)
+    cache.invalidate_token("t3")
+
+    assert [cache.get(k) for k in ("t1", "t2", "t3")] == [None, None, None]
+    assert cache._keys_by_user == {}
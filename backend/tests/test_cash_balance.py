@@ -0,0 +1,211 @@
+# backend/tests/test_cash_balance.py
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from app.db.models.cash_movement import MovementStatus, MovementType
+from app.services import cash_balance_service as balances
+from app.services.cash_balance_service import _cents, _contribution, apply_balance_deltas, record_movements
+
+
+def _movement(amount, type=MovementType.INGRESO, method="EFECTIVO", register=1, status=None):
+    return {
+        "cash_register_id": register,
+        "payment_method": method,
+        "type": type,
+        "status": status,
+        "amount_usd": amount,
+    }
+
+
+# ============================================================
+# DELTAS
+# ============================================================
+def test_cents_round_half_up_like_postgres_numeric():
+    assert _cents(0.125) == Decimal("0.13")
+    assert _cents(1.005) == Decimal("1.01")
+    assert _cents(2.675) == Decimal("2.68")
+    assert _cents(None) == Decimal("0.00")
+
+
+def test_contribution_by_movement_type():
+    assert _contribution(_movement(10.0)) == ((1, "EFECTIVO"), Decimal("10.00"), Decimal("0"))
+    assert _contribution(_movement(4.5, type=MovementType.EGRESO)) == (
+        (1, "EFECTIVO"), Decimal("0"), Decimal("4.50")
+    )
+
+
+def test_only_confirmed_movements_of_a_register_count():
+    assert _contribution(_movement(10.0, status=MovementStatus.CONFIRMADO)) is not None
+    assert _contribution(_movement(10.0, status=MovementStatus.ANULADO)) is None
+    assert _contribution(_movement(10.0, register=None)) is None
+
+
+def test_deltas_are_grouped_per_register_and_method(recorder):
+    record_movements(recorder, [
+        _movement(10.0),
+        _movement(5.25),
+        _movement(3.0, type=MovementType.EGRESO),
+        _movement(7.0, method="DIVISA_EFECTIVO"),
+        _movement(1.0, register=2),
+    ])
+
+    rows = [
+        (r["cash_register_id"], r["payment_method"], r["income_usd"], r["expense_usd"], r["movements_count"])
+        for r in recorder.rows()
+    ]
+    # Orden fijo por (caja, método)
+    assert rows == [
+        (1, "DIVISA_EFECTIVO", Decimal("7.00"), Decimal("0"), 1),
+        (1, "EFECTIVO", Decimal("15.25"), Decimal("3.00"), 3),
+        (2, "EFECTIVO", Decimal("1.00"), Decimal("0"), 1),
+    ]
+
+
+def test_annulment_subtracts_the_original_contribution(recorder):
+    confirmed = _movement(10.0, status=MovementStatus.CONFIRMADO)
+    annulled = _movement(10.0, status=MovementStatus.ANULADO)
+
+    apply_balance_deltas(recorder, [(_contribution(confirmed), -1), (_contribution(annulled), 1)])
+
+    [row] = recorder.rows()
+    assert (row["income_usd"], row["movements_count"]) == (Decimal("-10.00"), -1)
+
+
+def test_changes_that_cancel_out_write_nothing(recorder):
+    contribution = _contribution(_movement(10.0))
+
+    apply_balance_deltas(recorder, [(contribution, -1), (contribution, 1), (None, 1)])
+
+    assert recorder.statements == []
+
+
+def test_per_row_rounding_matches_ledger_sum(recorder):
+    # 0.005 x 3: redondear al final daría 0.02, por fila 0.03
+    record_movements(recorder, [_movement(0.005)] * 3)
+
+    assert recorder.rows()[0]["income_usd"] == Decimal("0.03")
+
+
+# ============================================================
+# VERIFICACIÓN
+# ============================================================
+def _reconcile(monkeypatch, stored, ledger):
+    db = MagicMock()
+    db.query.return_value.filter.return_value.with_for_update.return_value.all.return_value = [
+        SimpleNamespace(payment_method=method, income_usd=income, expense_usd=expense, movements_count=count)
+        for method, (income, expense, count) in stored.items()
+    ]
+    monkeypatch.setattr(balances, "_ledger_totals", lambda db, register_id: ledger)
+    return db, balances.reconcile_register(db, 1)
+
+
+def test_reconcile_leaves_matching_balances_alone(monkeypatch):
+    totals = {"EFECTIVO": (Decimal("15.25"), Decimal("3.00"), 3)}
+
+    db, result = _reconcile(monkeypatch, totals, dict(totals))
+
+    assert result["mismatches"] == []
+    assert not result["repaired"]
+    db.execute.assert_not_called()
+    db.commit.assert_called_once()
+
+
+def test_reconcile_rewrites_balances_from_the_ledger(monkeypatch):
+    stored = {"EFECTIVO": (Decimal("15.24"), Decimal("3.00"), 3)}
+    ledger = {
+        "EFECTIVO": (Decimal("15.25"), Decimal("3.00"), 3),
+        "DIVISA_EFECTIVO": (Decimal("7.00"), Decimal("0"), 1),
+    }
+
+    db, result = _reconcile(monkeypatch, stored, ledger)
+
+    assert result["repaired"]
+    assert result["methods_checked"] == 2
+    assert [m["method"] for m in result["mismatches"]] == ["DIVISA_EFECTIVO", "EFECTIVO"]
+    _, insert = db.execute.call_args_list
+    assert {row["payment_method"]: row["income_usd"] for row in insert.args[1]} == {
+        "EFECTIVO": Decimal("15.25"),
+        "DIVISA_EFECTIVO": Decimal("7.00"),
+    }
+
+
+def test_ledger_rounds_each_movement_before_summing():
+    from sqlalchemy.dialects import postgresql
+
+    db = MagicMock()
+    balances._ledger_totals(db, 1)
+
+    income = db.query.call_args.args[1]
+    sql = str(income.compile(dialect=postgresql.dialect()))
+    assert "sum(CASE WHEN" in sql
+    assert "round(CAST(cash_movements.amount_usd AS NUMERIC)" in sql
+
+
+# ============================================================
+# MONTO DEL SISTEMA AL CIERRE (calculate_system_amount)
+# ============================================================
+# Caja con cobros en USD y en bolívares (tasa 36.5) y un ingreso anulado:
+# (tipo, estado, monto en su moneda, moneda, monto en USD)
+MIXED_REGISTER = [
+    (MovementType.INGRESO, MovementStatus.CONFIRMADO, 20.00, "USD", 20.00),
+    (MovementType.INGRESO, MovementStatus.CONFIRMADO, 730.00, "VES", 20.00),
+    (MovementType.INGRESO, MovementStatus.ANULADO, 10.00, "USD", 10.00),
+    (MovementType.EGRESO, MovementStatus.CONFIRMADO, 182.50, "VES", 5.00),
+]
+
+# Antes: SUM(amount) de todos los movimientos, mezclando USD y Bs e
+# incluyendo los anulados: 20 + 730 + 10 - 182.50
+OLD_SYSTEM_AMOUNT = 577.50
+# Ahora: SUM(amount_usd) de los CONFIRMADOS: 20 + 20 - 5
+NEW_SYSTEM_AMOUNT = 35.00
+
+
+def test_system_amount_is_confirmed_usd_not_raw_amounts():
+    old = sum(
+        amount if kind == MovementType.INGRESO else -amount
+        for kind, _, amount, _, _ in MIXED_REGISTER
+    )
+    contributions = [
+        _contribution({
+            "cash_register_id": 1, "payment_method": "EFECTIVO",
+            "type": kind, "status": status, "amount_usd": amount_usd,
+        })
+        for kind, status, _, _, amount_usd in MIXED_REGISTER
+    ]
+    new = sum(income - expense for _, income, expense in filter(None, contributions))
+
+    assert old == OLD_SYSTEM_AMOUNT
+    assert new == Decimal(str(NEW_SYSTEM_AMOUNT))
+
+
+def test_calculate_system_amount_on_mixed_currency_register(pg_db):
+    from sqlalchemy import func
+
+    from app.db import models
+    from app.services.cash_register_service import calculate_system_amount
+
+    CashMovement = models.cash_movement.CashMovement
+    user = models.user.User(email="caja@example.com", password_hash="x")
+    register = models.cash_register.CashRegister(opening_amount=0)
+    pg_db.add_all([user, register])
+    pg_db.flush()
+    for kind, status, amount, currency, amount_usd in MIXED_REGISTER:
+        pg_db.add(CashMovement(
+            type=kind, status=status, amount=amount, currency=currency,
+            amount_usd=amount_usd, payment_method="EFECTIVO",
+            description="test", created_by_user_id=user.id,
+            cash_register_id=register.id,
+        ))
+    pg_db.commit()
+
+    def old_total(kind):
+        return pg_db.query(func.coalesce(func.sum(CashMovement.amount), 0)).filter(
+            CashMovement.cash_register_id == register.id,
+            CashMovement.type == kind,
+        ).scalar()
+
+    old = float(old_total(MovementType.INGRESO)) - float(old_total(MovementType.EGRESO))
+
+    assert old == OLD_SYSTEM_AMOUNT
+    assert calculate_system_amount(pg_db, register.id) == NEW_SYSTEM_AMOUNT
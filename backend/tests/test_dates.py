@@ -0,0 +1,69 @@
+# backend/tests/test_dates.py
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import Column, DateTime, MetaData, Table
+from sqlalchemy.dialects import postgresql
+
+from app.core.dates import business_day, date_filters, day_range
+
+sales = Table("sales", MetaData(), Column("created_at", DateTime(timezone=True)))
+
+
+def _utc(moment: datetime) -> datetime:
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _sql(condition) -> str:
+    return str(condition.compile(dialect=postgresql.dialect()))
+
+
+def test_day_range_is_local_midnight_to_next_midnight(store_timezone):
+    start, end = day_range(date(2026, 1, 31))
+
+    assert _utc(start) == datetime(2026, 1, 31, 4, 0)
+    assert _utc(end) == datetime(2026, 2, 1, 4, 0)
+
+
+def test_day_range_includes_the_whole_last_day(store_timezone):
+    start, end = day_range(date(2026, 1, 1), date(2026, 1, 31))
+
+    assert end - start == timedelta(days=31)
+
+
+def test_day_range_follows_dst_changes(store_timezone):
+    store_timezone("America/New_York")
+
+    # 8 de marzo de 2026: el reloj se adelanta una hora
+    start, end = day_range(date(2026, 3, 8))
+
+    assert _utc(end) - _utc(start) == timedelta(hours=23)
+
+
+def test_late_evening_sale_belongs_to_the_local_day(store_timezone):
+    start, end = day_range(date(2026, 1, 5))
+    # 23:30 en Caracas = 03:30 UTC del día siguiente
+    sale_time = datetime(2026, 1, 6, 3, 30, tzinfo=timezone.utc)
+
+    assert start <= sale_time < end
+    assert business_day(sale_time) == date(2026, 1, 5)
+
+
+def test_naive_timestamps_are_taken_as_utc(store_timezone):
+    assert business_day(datetime(2026, 1, 6, 3, 30)) == date(2026, 1, 5)
+    assert business_day(datetime(2026, 1, 6, 4, 30)) == date(2026, 1, 6)
+
+
+def test_date_filters_are_half_open_and_sargable(store_timezone):
+    lower, upper = date_filters(sales.c.created_at, date(2026, 1, 1), date(2026, 1, 31))
+
+    assert _sql(lower) == "sales.created_at >= %(created_at_1)s"
+    assert _sql(upper) == "sales.created_at < %(created_at_1)s"
+    assert _utc(lower.right.value) == datetime(2026, 1, 1, 4, 0)
+    assert _utc(upper.right.value) == datetime(2026, 2, 1, 4, 0)
+
+
+def test_date_filters_allow_open_ends(store_timezone):
+    assert date_filters(sales.c.created_at) == []
+    assert len(date_filters(sales.c.created_at, start=date(2026, 1, 1))) == 1
+    [only_end] = date_filters(sales.c.created_at, end=date(2026, 1, 31))
+    assert _sql(only_end).startswith("sales.created_at <")
@@ -0,0 +1,137 @@
+# backend/tests/test_idempotency.py
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.idempotency import IdempotencyMiddleware, IdempotencyStore
+
+
+@pytest.fixture
+def pos_app():
+    calls = []
+    app = FastAPI()
+
+    @app.post("/api/v1/pos/sales", status_code=201)
+    def create_sale(payload: dict):
+        calls.append(payload)
+        if payload.get("fail"):
+            raise HTTPException(503, "BD no disponible")
+        return {"id": len(calls), "total_usd": payload["total_usd"]}
+
+    store = IdempotencyStore(ttl_seconds=60, max_entries=100)
+    app.add_middleware(IdempotencyMiddleware, store=store)
+    return TestClient(app, raise_server_exceptions=False), calls, store
+
+
+def _post(client, body, key="abc", token="Bearer caja-1"):
+    headers = {"Authorization": token}
+    if key:
+        headers["Idempotency-Key"] = key
+    return client.post("/api/v1/pos/sales", json=body, headers=headers)
+
+
+def test_retry_with_same_key_replays_stored_response(pos_app):
+    client, calls, store = pos_app
+
+    first = _post(client, {"total_usd": 10})
+    retry = _post(client, {"total_usd": 10})
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json() == {"id": 1, "total_usd": 10}
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert len(calls) == 1
+    assert store.stats()["hits"] == 1
+
+
+def test_same_key_with_different_body_is_rejected(pos_app):
+    client, calls, _ = pos_app
+
+    _post(client, {"total_usd": 10})
+    conflict = _post(client, {"total_usd": 99})
+
+    assert conflict.status_code == 422
+    assert len(calls) == 1
+
+
+def test_keys_are_scoped_per_user(pos_app):
+    client, calls, _ = pos_app
+
+    _post(client, {"total_usd": 10}, token="Bearer caja-1")
+    other = _post(client, {"total_usd": 10}, token="Bearer caja-2")
+
+    assert "idempotent-replayed" not in other.headers
+    assert len(calls) == 2
+
+
+def test_server_errors_are_not_stored(pos_app):
+    client, calls, store = pos_app
+
+    assert _post(client, {"total_usd": 10, "fail": True}).status_code == 503
+    assert _post(client, {"total_usd": 10, "fail": True}).status_code == 503
+
+    assert len(calls) == 2
+    assert store.stats()["entries"] == 0
+
+
+def test_in_progress_key_is_rejected():
+    store = IdempotencyStore(ttl_seconds=60, max_entries=100)
+
+    assert store.begin(b"k", b"f")[0] == IdempotencyStore.NEW
+    assert store.begin(b"k", b"f")[0] == IdempotencyStore.IN_PROGRESS
+
+    store.complete(b"k", 201, [], b"{}")
+    state, entry = store.begin(b"k", b"f")
+    assert state == IdempotencyStore.REPLAY
+    assert entry.status == 201
+
+
+def test_requests_without_key_are_not_deduplicated(pos_app):
+    client, calls, _ = pos_app
+
+    _post(client, {"total_usd": 10}, key=None)
+    _post(client, {"total_usd": 10}, key=None)
+
+    assert len(calls) == 2
+
+
+def test_store_evicts_oldest_entries_over_capacity():
+    store = IdempotencyStore(ttl_seconds=60, max_entries=2)
+    for key in (b"a", b"b", b"c"):
+        store.begin(key, b"f")
+        store.complete(key, 201, [], b"{}")
+
+    store.begin(b"d", b"f")
+
+    assert store.begin(b"a", b"f")[0] == IdempotencyStore.NEW
+
+
+def test_cancelled_request_frees_the_key():
+    import asyncio
+
+    store = IdempotencyStore(ttl_seconds=60, max_entries=100)
+
+    async def cancelled_app(scope, receive, send):
+        await receive()
+        # El cliente se desconectó a mitad del checkout
+        raise asyncio.CancelledError()
+
+    middleware = IdempotencyMiddleware(cancelled_app, store=store)
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/pos/sales",
+        "query_string": b"",
+        "headers": [(b"idempotency-key", b"abc")],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"{}", "more_body": False}
+
+    async def send(message):
+        pass
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(middleware(scope, receive, send))
+
+    assert store.stats()["entries"] == 0
@@ -0,0 +1,93 @@
+# backend/tests/test_pagination.py
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, Integer, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from app.core.pagination import decode_cursor, encode_cursor, keyset_page
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "rows"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    start = datetime(2026, 1, 1, 8, 0)
+    with Session(engine) as session:
+        # Timestamps repetidos: el id desempata
+        session.add_all(
+            Row(id=i, created_at=start + timedelta(minutes=i // 3))
+            for i in range(1, 11)
+        )
+        session.commit()
+        yield session
+
+
+def _all_pages(db, limit):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = keyset_page(db.query(Row), [Row.created_at, Row.id], cursor, limit)
+        pages.append([r.id for r in rows])
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip_keeps_types():
+    moment = datetime(2026, 1, 5, 10, 30, 15, 123456)
+    ident = uuid4()
+
+    assert decode_cursor(encode_cursor([moment, ident, 7]), 3) == (moment, ident, 7)
+
+
+@pytest.mark.parametrize("token", ["no-es-base64!", encode_cursor([1]), encode_cursor({"a": 1})])
+def test_invalid_cursor_is_a_client_error(token):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(token, 2)
+
+    assert exc.value.status_code == 400
+
+
+def test_pages_cover_every_row_once_in_order(db):
+    pages = _all_pages(db, limit=4)
+
+    assert pages == [[10, 9, 8, 7], [6, 5, 4, 3], [2, 1]]
+
+
+def test_last_full_page_has_no_cursor(db):
+    rows, cursor = keyset_page(db.query(Row), [Row.created_at, Row.id], None, 10)
+
+    assert len(rows) == 10
+    assert cursor is None
+
+
+def test_ascending_order(db):
+    rows, cursor = keyset_page(db.query(Row), [Row.id], None, 3, descending=False)
+    rows2, _ = keyset_page(db.query(Row), [Row.id], cursor, 3, descending=False)
+
+    assert [r.id for r in rows] == [1, 2, 3]
+    assert [r.id for r in rows2] == [4, 5, 6]
+
+
+def test_without_limit_or_cursor_returns_everything(db):
+    rows, cursor = keyset_page(db.query(Row), [Row.created_at, Row.id], None, None)
+
+    assert len(rows) == 10
+    assert cursor is None
+
+
+def test_offset_is_ignored_once_a_cursor_is_used(db):
+    _, cursor = keyset_page(db.query(Row), [Row.created_at, Row.id], None, 2)
+    rows, _ = keyset_page(db.query(Row), [Row.created_at, Row.id], cursor, 2, offset=5)
+
+    assert [r.id for r in rows] == [8, 7]
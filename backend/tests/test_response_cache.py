@@ -0,0 +1,124 @@
+# backend/tests/test_response_cache.py
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core import response_cache as module
+from app.core.config import settings
+from app.core.response_cache import MemoryBackend, ResponseCache
+
+TABLES = ("sales", "payments")
+ADMIN = SimpleNamespace(role="ADMIN", branch_id=1)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    cache = ResponseCache(MemoryBackend(max_entries=100, ttl_seconds=60))
+    # Los listeners de sesión invalidan sobre la instancia global
+    monkeypatch.setattr(module, "response_cache", cache)
+    return cache
+
+
+def test_writes_to_a_dependency_change_the_key(cache):
+    before = cache.key("dashboard:summary", TABLES, ADMIN)
+
+    cache.invalidate_tables(["payments"])
+
+    assert cache.key("dashboard:summary", TABLES, ADMIN) != before
+
+
+def test_writes_to_other_tables_keep_the_key(cache):
+    before = cache.key("dashboard:summary", TABLES, ADMIN)
+
+    cache.invalidate_tables(["products"])
+
+    assert cache.key("dashboard:summary", TABLES, ADMIN) == before
+
+
+def test_key_depends_on_scope_and_extra_values(cache):
+    key = cache.key("dashboard:summary", TABLES, ADMIN, extra=("2026-01-05",))
+
+    assert key != cache.key("dashboard:summary", TABLES, SimpleNamespace(role="CAJERO", branch_id=1), extra=("2026-01-05",))
+    assert key != cache.key("dashboard:summary", TABLES, ADMIN, extra=("2026-01-06",))
+
+
+def test_get_or_set_computes_once_per_generation(cache):
+    db = SimpleNamespace(bind=None)
+    calls = []
+
+    def compute(session):
+        calls.append(session)
+        return {"total": len(calls)}
+
+    key = cache.key("dashboard:summary", TABLES, ADMIN)
+    assert cache.get_or_set(key, compute, db) == {"total": 1}
+    assert cache.get_or_set(key, compute, db) == {"total": 1}
+
+    cache.invalidate_tables(["sales"])
+    key = cache.key("dashboard:summary", TABLES, ADMIN)
+    assert cache.get_or_set(key, compute, db) == {"total": 2}
+    assert calls == [db, db]
+
+
+def test_recent_write_is_read_from_primary(cache, monkeypatch):
+    monkeypatch.setattr(settings, "DB_REPLICA_MAX_LAG_SECONDS", 30)
+    replica = SimpleNamespace(bind=object())
+    primary = SimpleNamespace(bind=module.engine)
+
+    @contextmanager
+    def session_local():
+        yield primary
+
+    monkeypatch.setattr(module, "SessionLocal", session_local)
+
+    cache.invalidate_tables(["sales"])
+    key = cache.key("dashboard:summary", TABLES, ADMIN)
+
+    assert key.recent_write
+    assert cache.get_or_set(key, lambda session: session is primary, replica) is True
+    assert cache.stats()["primary_reads"] == 1
+
+
+def test_old_writes_are_read_from_replica(cache, monkeypatch):
+    monkeypatch.setattr(settings, "DB_REPLICA_MAX_LAG_SECONDS", 0)
+    replica = SimpleNamespace(bind=object())
+
+    cache.invalidate_tables(["sales"])
+    key = cache.key("dashboard:summary", TABLES, ADMIN)
+
+    assert not key.recent_write
+    assert cache.get_or_set(key, lambda session: session is replica, replica) is True
+    assert cache.stats()["primary_reads"] == 0
+
+
+def test_commit_invalidates_tracked_tables_written_in_the_session(cache):
+    key = cache.key("dashboard:summary", TABLES, ADMIN)
+    session = Session()
+
+    module._mark(session, ["payments", "users"])
+    session.commit()
+
+    assert cache.key("dashboard:summary", TABLES, ADMIN) != key
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_rollback_discards_pending_invalidation(cache):
+    key = cache.key("dashboard:summary", TABLES, ADMIN)
+    session = Session()
+    session.begin()
+
+    module._mark(session, ["payments"])
+    session.rollback()
+    session.commit()
+
+    assert cache.key("dashboard:summary", TABLES, ADMIN) == key
+
+
+def test_disabled_cache_always_computes(cache):
+    cache.enabled = False
+
+    assert cache.key("dashboard:summary", TABLES, ADMIN) is None
+    assert cache.get_or_set(None, lambda session: 1, SimpleNamespace(bind=None)) == 1
@@ -1 +1,263 @@
+# backend/tests/test_sales.py
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
 
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1 import pos
+from app.db import models
+from app.db.models.payment_enums import PaymentMethod
+from app.db.schemas.pos import SaleOut
+from app.services import sales_service, stock_service
+from app.services.sale_projection_service import project_sales
+from app.services.stock_service import StockResult
+
+
+# ============================================================
+# CHECKOUT
+# ============================================================
+def _product(pid, name="Harina", price=5.0, stock=10):
+    return SimpleNamespace(id=pid, name=name, sale_price=price, stock=stock)
+
+
+def _checkout_db(products):
+    """Sesión falsa: caja abierta y los productos del carrito"""
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = SimpleNamespace(id=7)
+    db.query.return_value.filter.return_value.all.return_value = products
+    db.scalars.return_value.all.return_value = [100]
+
+    added = []
+    db.add.side_effect = added.append
+    # El flush asigna el id de la venta
+    db.flush.side_effect = lambda: setattr(added[-1], "id", 55)
+    return db
+
+
+def _payload(*items, paid=10.0):
+    return SimpleNamespace(
+        client_id=None,
+        discount_usd=0.0,
+        items=[SimpleNamespace(product_id=pid, quantity=qty) for pid, qty in items],
+        payments=[SimpleNamespace(method=PaymentMethod.EFECTIVO, amount_usd=paid, reference=None)],
+    )
+
+
+@pytest.fixture
+def cashier():
+    # Usuario real: cualquier atributo que el modelo no tenga falla aquí
+    return models.user.User(id=3, name="Caja 1", email="caja1@example.com")
+
+
+@pytest.fixture
+def stock(monkeypatch):
+    """Reemplaza el UPDATE condicional; `short` simula líneas sin stock"""
+    state = SimpleNamespace(requested={}, short=[])
+
+    def decrement(db, quantities):
+        state.requested.update(quantities)
+        return StockResult(short=list(state.short))
+
+    monkeypatch.setattr(sales_service, "decrement_stock", decrement)
+    return state
+
+
+@pytest.fixture
+def movements(monkeypatch, stock):
+    calls = []
+    monkeypatch.setattr(sales_service, "create_movement", lambda **kwargs: calls.append(kwargs))
+    monkeypatch.setattr(sales_service, "generate_sale_code", lambda db: "VENTA-20260105-001")
+    return calls
+
+
+def test_cart_quantities_groups_repeated_products():
+    quantities = sales_service._cart_quantities([
+        SimpleNamespace(product_id=1, quantity=2),
+        SimpleNamespace(product_id=2, quantity=1),
+        SimpleNamespace(product_id=1, quantity=3),
+    ])
+
+    assert list(quantities.items()) == [(1, 5), (2, 1)]
+
+
+def test_checkout_writes_sale_and_audit_event_in_one_transaction(cashier, movements):
+    db = _checkout_db([_product(1, price=5.0)])
+
+    sale = sales_service.create_sale_service(db, _payload((1, 2)), cashier)
+
+    assert sale.id == 55
+    assert sale.status == models.sale.SaleStatus.PAID
+    assert (sale.total_usd, sale.paid_usd, sale.balance_usd) == (10.0, 10.0, 0.0)
+    [movement] = movements
+    assert movement["commit"] is False
+    assert movement["branch_id"] is None
+    assert movement["reference"] == "SALE-55"
+    db.commit.assert_not_called()
+
+
+def test_checkout_statement_count_does_not_grow_with_cart_size(cashier, movements):
+    small = _checkout_db([_product(1)])
+    sales_service.create_sale_service(small, _payload((1, 2)), cashier)
+
+    products = [_product(pid, price=1.0) for pid in range(1, 41)]
+    large = _checkout_db(products)
+    sales_service.create_sale_service(large, _payload(*[(pid, 1) for pid in range(1, 41)], paid=40.0), cashier)
+
+    assert large.execute.call_count == small.execute.call_count
+    assert large.query.call_count == small.query.call_count
+
+
+def test_checkout_rejects_oversell_and_rolls_back(cashier, movements, stock):
+    db = _checkout_db([_product(1)])
+    stock.short = [1]
+
+    with pytest.raises(HTTPException) as exc:
+        # Dos líneas del mismo producto: se valida la cantidad total
+        sales_service.create_sale_service(db, _payload((1, 1), (1, 1)), cashier)
+
+    assert exc.value.status_code == 400
+    assert "Harina" in exc.value.detail
+    assert stock.requested == {1: 2}
+    # No se escribió la venta y la transacción salió con la excepción (rollback)
+    db.add.assert_not_called()
+    db.execute.assert_not_called()
+    assert movements == []
+    exc_type = db.begin.return_value.__exit__.call_args[0][0]
+    assert exc_type is HTTPException
+
+
+def test_checkout_rejects_unknown_product_before_touching_stock(cashier, movements, stock):
+    db = _checkout_db([])
+
+    with pytest.raises(HTTPException) as exc:
+        sales_service.create_sale_service(db, _payload((99, 1)), cashier)
+
+    assert exc.value.status_code == 404
+    assert stock.requested == {}
+    db.add.assert_not_called()
+
+
+# ============================================================
+# STOCK
+# ============================================================
+def _sql(stmt) -> str:
+    from sqlalchemy.dialects import postgresql
+
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_decrement_stock_reports_lines_missing_from_returning():
+    db = MagicMock()
+    # El UPDATE condicional solo devolvió el producto 1
+    db.execute.return_value.all.return_value = [(1, 4)]
+
+    result = stock_service.decrement_stock(db, {1: 1, 2: 5})
+
+    assert result.updated == {1: 4}
+    assert result.short == [2]
+    assert not result.ok
+
+
+@pytest.mark.parametrize("mutate", [stock_service.decrement_stock, stock_service.increment_stock])
+def test_rows_are_locked_in_id_order_before_the_update(mutate):
+    db = MagicMock()
+    db.execute.return_value.all.return_value = []
+
+    # Carrito en orden inverso al de los ids
+    mutate(db, {3: 1, 1: 2, 2: 1})
+
+    lock, update = (call.args[0] for call in db.execute.call_args_list)
+    assert "ORDER BY products.id FOR UPDATE" in _sql(lock)
+    assert lock.compile().params["id_1"] == [1, 2, 3]
+    # Filas del VALUES también ordenadas por id: (1, 2), (2, 1), (3, 1)
+    assert "UPDATE products" in _sql(update)
+    assert list(update.compile().params.values()) == [1, 2, 2, 1, 3, 1]
+
+
+def _add_products(db, stock_by_id):
+    Product = models.product.Product
+    for product_id, stock in stock_by_id.items():
+        db.add(Product(
+            id=product_id, code=f"P{product_id}", name=f"Producto {product_id}",
+            cost_price=1.0, sale_price=2.0, profit_margin=1.0, stock=stock,
+        ))
+    db.commit()
+
+
+def test_concurrent_reversed_carts_do_not_deadlock(pg_db):
+    from app.db.base import SessionLocal
+
+    rounds = 20
+    _add_products(pg_db, {1: 2 * rounds, 2: 2 * rounds})
+    start = threading.Barrier(2)
+    errors = []
+
+    def checkout(cart):
+        for _ in range(rounds):
+            db = SessionLocal()
+            try:
+                start.wait(timeout=10)
+                assert stock_service.decrement_stock(db, cart).ok
+                db.commit()
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                db.close()
+
+    tills = [
+        threading.Thread(target=checkout, args=({1: 1, 2: 1},)),
+        threading.Thread(target=checkout, args=({2: 1, 1: 1},)),
+    ]
+    for till in tills:
+        till.start()
+    for till in tills:
+        till.join()
+
+    assert errors == []
+    pg_db.expire_all()
+    Product = models.product.Product
+    assert {p.id: p.stock for p in pg_db.query(Product).all()} == {1: 0, 2: 0}
+
+
+# ============================================================
+# PROYECCIÓN DE VENTAS
+# ============================================================
+def test_project_sales_builds_sale_out_with_details_and_payments():
+    created = datetime(2026, 1, 5, 15, 30)
+    row = SimpleNamespace(
+        id=10, code="VENTA-20260105-001", client_id=None, client_name=None,
+        client_phone=None, seller_id=3, subtotal_usd=12.0, total_usd=12.0,
+        paid_usd=12.0, balance_usd=0.0, payment_method="EFECTIVO",
+        status=SimpleNamespace(value="PAGADO"), created_at=created,
+    )
+    db = MagicMock()
+    db.query.return_value.join.return_value.filter.return_value.order_by.return_value.all.return_value = [
+        (10, 1, 1, "Harina", 2, 5.0, 10.0),
+        (10, 2, 2, "Café", 1, 2.0, 2.0),
+    ]
+    db.query.return_value.filter.return_value.order_by.return_value.all.return_value = [
+        (10, 100, PaymentMethod.EFECTIVO, 12.0, None, created),
+    ]
+
+    [sale] = project_sales(db, [row])
+
+    assert isinstance(sale, SaleOut)
+    assert sale.status == "PAGADO"
+    assert [(d.product_name, d.quantity, d.subtotal_usd) for d in sale.details] == [
+        ("Harina", 2, 10.0),
+        ("Café", 1, 2.0),
+    ]
+    assert [(p.method, p.amount_usd) for p in sale.payments] == [("EFECTIVO", 12.0)]
+
+
+def test_checkout_returns_projection_built_in_the_same_session(monkeypatch):
+    db = object()
+    expected = object()
+    monkeypatch.setattr(pos, "create_sale_service", lambda db, payload, user: SimpleNamespace(id=42))
+    monkeypatch.setattr(pos, "get_sale_out", lambda session, sale_id: (session, sale_id, expected))
+
+    # _checkout corre dentro de run_sync: la respuesta sale de la misma sesión
+    assert pos._checkout(db, payload=None, current_user=None) == (db, 42, expected)
@@ -0,0 +1,70 @@
+# backend/tests/test_sales_rollup.py
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+from app.services.sales_rollup_service import SaleSnapshot, apply_sale_change, sale_snapshot
+
+DAY = date(2026, 1, 5)
+
+
+def _snap(status="PENDIENTE", total=10.0, paid=0.0, day=DAY):
+    return SaleSnapshot(
+        day=day, branch_id=0, status=status, seller_id=3,
+        total_usd=total, paid_usd=paid, balance_usd=round(total - paid, 2),
+    )
+
+
+def _deltas(rows):
+    return {
+        row["status"]: (row["sales_count"], row["total_usd"], row["paid_usd"], row["balance_usd"])
+        for row in rows
+    }
+
+
+def test_new_sale_adds_one_to_its_bucket(recorder):
+    apply_sale_change(recorder, None, _snap(paid=4.0))
+
+    [row] = recorder.rows()
+    assert (row["day"], row["branch_id"], row["seller_id"]) == (DAY, 0, 3)
+    assert _deltas([row]) == {"PENDIENTE": (1, 10.0, 4.0, 6.0)}
+
+
+def test_partial_payment_moves_amounts_without_counting_twice(recorder):
+    apply_sale_change(recorder, _snap(paid=4.0), _snap(paid=7.5))
+
+    assert _deltas(recorder.rows()) == {"PENDIENTE": (0, 0.0, 3.5, -3.5)}
+
+
+def test_status_change_moves_the_sale_between_buckets(recorder):
+    apply_sale_change(recorder, _snap(paid=4.0), _snap(status="PAGADO", paid=10.0))
+
+    assert _deltas(recorder.rows()) == {
+        "PENDIENTE": (-1, -10.0, -4.0, -6.0),
+        "PAGADO": (1, 10.0, 10.0, 0.0),
+    }
+
+
+def test_unchanged_sale_writes_nothing(recorder):
+    apply_sale_change(recorder, _snap(), _snap())
+
+    assert recorder.statements == []
+
+
+def test_deltas_are_rounded_to_cents(recorder):
+    apply_sale_change(recorder, _snap(paid=0.1), _snap(paid=0.3))
+
+    assert _deltas(recorder.rows()) == {"PENDIENTE": (0, 0.0, 0.2, -0.2)}
+
+
+def test_snapshot_uses_the_store_day_not_utc(store_timezone):
+    # 02:30 UTC del 6 de enero sigue siendo 5 de enero en Caracas (UTC-4)
+    sale = SimpleNamespace(
+        created_at=datetime(2026, 1, 6, 2, 30, tzinfo=timezone.utc),
+        status=SimpleNamespace(value="PAGADO"),
+        seller_id=None, total_usd=10.0, paid_usd=10.0, balance_usd=0.0,
+    )
+
+    snap = sale_snapshot(sale)
+
+    assert snap.day == DAY
+    assert (snap.status, snap.branch_id, snap.seller_id) == ("PAGADO", 0, 0)
@@ -170,7 +170,7 @@ export const CashRegister = () => {
               <p className="text-xl font-bold">{formatCurrency(cashRegister.opening_amount)}</p>
             </div>
             <div>
-              <p className="text-green-100 text-xs mb-1">Sistema Actual</p>
+              <p className="text-green-100 text-xs mb-1">Sistema Actual (USD)</p>
               <p className="text-xl font-bold">
                 {cashRegister.system_amount ? formatCurrency(cashRegister.system_amount) : '-'}
               </p>
@@ -211,7 +211,7 @@ export const CashRegister = () => {
                 </p>
               </div>
               <div>
-                <p className="text-orange-100 text-xs mb-1">Sistema</p>
+                <p className="text-orange-100 text-xs mb-1">Sistema (USD)</p>
                 <p className="text-xl font-bold">
                   {cashRegister.system_amount ? formatCurrency(cashRegister.system_amount) : '-'}
                 </p>
@@ -335,7 +335,7 @@ export const CashRegister = () => {
               <div className="p-4 bg-primary-50 border border-primary-200 rounded-lg">
                 <div className="space-y-2 text-sm">
                   <div className="flex justify-between">
-                    <span className="text-gray-700">Sistema calcula:</span>
+                    <span className="text-gray-700">Sistema calcula (USD, sin anulados):</span>
                     <span className="font-bold text-primary-700">
                       {formatCurrency(cashRegister.system_amount || 0)}
                     </span>